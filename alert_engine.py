@@ -0,0 +1,517 @@
+"""Vectorized evaluation of the ``alert_rules.csv`` conditions.
+
+Each ``Condition`` string is compiled once into a Python code object that
+operates on whole NumPy columns, so a rule costs a handful of array ops
+whether it runs over one snapshot or years of history.  The condition
+language is the one used in the rules file:
+
+- comparisons and arithmetic on fields: ``VIX_1M < VIX_Spot``, ``VRP > 4.5``
+- ``and`` / ``or`` / ``not`` and chained comparisons
+- unit suffixes on numbers, which are dropped: ``ETF_Premium > 15 bps``
+- percentiles of a field's own history: ``Var_Swap_Convexity > 80th percentile``
+- label transitions: ``Regime changes to High Vol``
+
+Fields are resolved through ``FIELD_SOURCES`` (history) and
+``SNAPSHOT_FIELDS`` (live snapshot).  A rule fires on the rising edge of its
+condition and is then held back for a cool-down, so a condition that stays
+true produces one alert, not one per row.
+
+Live alerts are evaluated by one ``AlertMonitor`` per server process, on
+the live poller's thread as each new snapshot arrives.  Fired alerts go to
+an ``AlertLog`` in the runtime cache directory; ``alert_history.csv`` is
+the read-only baseline, and pages only ever read baseline plus log.
+"""
+
+import ast
+import logging
+import os
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+from data_store import TableLoadError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_COOLDOWN = pd.Timedelta(hours=6)
+MIN_PERCENTILE_HISTORY = 20
+ALERT_LOG = 'alert_log.csv'
+
+# Rule field -> (table, column) it is read from when building history
+FIELD_SOURCES = {
+    'VIX_Spot': ('vix_term_structure_forecast', 'VIX_Spot'),
+    'VIX_1M': ('vix_term_structure_forecast', 'VIX_1M_Future'),
+    'VIX_2M': ('vix_term_structure_forecast', 'VIX_2M_Future'),
+    'VIX_3M': ('vix_term_structure_forecast', 'VIX_3M_Future'),
+    'Roll_Yield': ('vix_term_structure_forecast', 'Roll_Yield_1M_pct'),
+    'VRP': ('variance_premium', 'Variance_Risk_Premium'),
+    'Cross_Region_Correlation': ('global_equity_dislocations', 'Cross_Region_Correlation'),
+    # The stress grid reads the same column as the US/EU correlation
+    'US_EU_Correlation': ('global_equity_dislocations', 'Cross_Region_Correlation'),
+    'Dislocation_Score': ('global_equity_dislocations', 'Dislocation_Score'),
+    'ETF_Premium': ('etf_arbitrage_microstructure', 'Premium_Discount_bps'),
+    'VPIN': ('order_flow_toxicity', 'VPIN'),
+    'Total_Delta': ('option_greeks_dynamic_hedging', 'Total_Delta'),
+    'Total_Gamma': ('option_greeks_dynamic_hedging', 'Total_Gamma'),
+    'Total_Vega': ('option_greeks_dynamic_hedging', 'Total_Vega'),
+    'Total_Theta': ('option_greeks_dynamic_hedging', 'Total_Theta'),
+    'Var_Swap_Convexity': ('variance_swap_pricing', 'Convexity_Value'),
+    'Regime': ('vol_regime', 'Regime'),
+}
+
+# live_market_snapshot column -> rule field
+SNAPSHOT_FIELDS = {
+    'VIX_Spot': 'VIX_Spot',
+    'VIX_1M_Future': 'VIX_1M',
+    'VIX_2M_Future': 'VIX_2M',
+    'VIX_3M_Future': 'VIX_3M',
+    'VRP_Current': 'VRP',
+    'SPY_Premium_bps': 'ETF_Premium',
+}
+
+# portfolio_greeks column summed across positions -> rule field
+GREEK_FIELDS = {'Vega': 'Total_Vega', 'Gamma': 'Total_Gamma', 'Delta': 'Total_Delta',
+                'Theta': 'Total_Theta'}
+
+HISTORY_COLUMNS = ['Timestamp', 'Alert_ID', 'Alert_Name', 'Priority', 'Triggered_Value',
+                   'Status', 'Action_Taken']
+
+
+class RuleCompileError(ValueError):
+    """A condition string is outside the supported rule language."""
+
+
+# ==========================================
+# CONDITION COMPILER
+# ==========================================
+
+_UNIT = re.compile(r'(\d+(?:\.\d+)?)\s*(?:bps\b|%)', re.IGNORECASE)
+_PERCENTILE = re.compile(
+    r'([A-Za-z_]\w*)\s*(>=|<=|>|<)\s*(\d+(?:\.\d+)?)(?:st|nd|rd|th)?\s+percentile\b', re.IGNORECASE)
+_CHANGES_TO = re.compile(r'([A-Za-z_]\w*)\s+changes\s+to\s+(.+?)\s*$', re.IGNORECASE)
+_LOGIC = re.compile(r'\b(AND|OR|NOT)\b')
+
+_COMPARE_OPS = (ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.Eq, ast.NotEq)
+_ARITH_OPS = (ast.Add, ast.Sub, ast.Mult, ast.Div)
+FUNCTIONS = ('percentile', 'changes_to')
+
+
+class _Vectorize(ast.NodeTransformer):
+    """Rewrite boolean syntax into element-wise NumPy operators."""
+
+    def visit_BoolOp(self, node):
+        self.generic_visit(node)
+        op = ast.BitAnd() if isinstance(node.op, ast.And) else ast.BitOr()
+        result = node.values[0]
+        for value in node.values[1:]:
+            result = ast.BinOp(left=result, op=op, right=value)
+        return result
+
+    def visit_UnaryOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Not):
+            return ast.UnaryOp(op=ast.Invert(), operand=node.operand)
+        return node
+
+    def visit_Compare(self, node):
+        self.generic_visit(node)
+        # a < b < c  ->  (a < b) & (b < c)
+        operands = [node.left] + node.comparators
+        parts = [ast.Compare(left=operands[i], ops=[op], comparators=[operands[i + 1]])
+                 for i, op in enumerate(node.ops)]
+        result = parts[0]
+        for part in parts[1:]:
+            result = ast.BinOp(left=result, op=ast.BitAnd(), right=part)
+        return result
+
+
+def _normalize(condition):
+    text = _UNIT.sub(r'\1', condition.strip())
+    text = _PERCENTILE.sub(lambda m: f"{m[1]} {m[2]} percentile({m[1]}, {m[3]}, '{m[1]}:{m[3]}')", text)
+    text = _CHANGES_TO.sub(lambda m: f"changes_to({m[1]}, {m[2].strip()!r})", text)
+    return _LOGIC.sub(lambda m: m[1].lower(), text)
+
+
+def _check(tree, condition):
+    fields = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name):
+            if node.id not in FUNCTIONS:
+                fields.add(node.id)
+        elif isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS or node.keywords:
+                raise RuleCompileError(f"unsupported call in '{condition}'")
+        elif isinstance(node, ast.Constant):
+            if not isinstance(node.value, (int, float, str)):
+                raise RuleCompileError(f"unsupported literal in '{condition}'")
+        elif isinstance(node, (ast.BinOp, ast.BoolOp, ast.UnaryOp, ast.Compare)):
+            op = getattr(node, 'op', None)
+            if isinstance(node, ast.BinOp) and not isinstance(op, _ARITH_OPS):
+                raise RuleCompileError(f"unsupported operator in '{condition}'")
+            if isinstance(node, ast.UnaryOp) and not isinstance(op, (ast.USub, ast.UAdd, ast.Not)):
+                raise RuleCompileError(f"unsupported operator in '{condition}'")
+            if isinstance(node, ast.Compare) and not all(isinstance(o, _COMPARE_OPS) for o in node.ops):
+                raise RuleCompileError(f"unsupported comparison in '{condition}'")
+        elif not isinstance(node, (ast.Expression, ast.Load, ast.boolop, ast.operator,
+                                   ast.unaryop, ast.cmpop)):
+            raise RuleCompileError(f"unsupported syntax in '{condition}'")
+    return fields
+
+
+def compile_condition(condition):
+    """Compile a condition string to ``(code, fields, trigger_field)``.
+
+    ``trigger_field`` is the first field in the condition; its value is the
+    one recorded as ``Triggered_Value`` when the rule fires.
+    """
+    if not isinstance(condition, str) or not condition.strip():
+        raise RuleCompileError("empty condition")
+    text = _normalize(condition)
+    try:
+        tree = ast.parse(text, mode='eval')
+    except SyntaxError as exc:
+        raise RuleCompileError(f"cannot parse '{condition}'") from exc
+    fields = _check(tree, condition)
+    if not fields:
+        raise RuleCompileError(f"'{condition}' references no fields")
+    trigger = next(n.id for n in ast.walk(tree) if isinstance(n, ast.Name) and n.id in fields)
+    tree = ast.fix_missing_locations(_Vectorize().visit(tree))
+    return compile(tree, f'<rule: {condition}>', 'eval'), frozenset(fields), trigger
+
+
+# ==========================================
+# RULE FUNCTIONS
+# ==========================================
+
+def _changes_to(values, label):
+    values = np.asarray(values, dtype=object)
+    hit = values == label
+    hit[1:] &= values[:-1] != label
+    if len(hit):
+        hit[0] = False
+    return hit
+
+
+def _history_percentile(thresholds):
+    def percentile(values, q, key):
+        # Expanding quantile: each row only sees the history before it
+        series = pd.Series(np.asarray(values, dtype='float64'))
+        level = series.expanding(min_periods=MIN_PERCENTILE_HISTORY).quantile(q / 100).shift()
+        thresholds[key] = series.quantile(q / 100)
+        return level.to_numpy()
+    return percentile
+
+
+def _snapshot_percentile(thresholds):
+    def percentile(values, q, key):
+        return thresholds.get(key, np.nan)
+    return percentile
+
+
+# ==========================================
+# ENGINE
+# ==========================================
+
+class AlertEngine:
+    """Compiled ``alert_rules`` evaluated over history or one snapshot at a time."""
+
+    def __init__(self, rules, cooldown=DEFAULT_COOLDOWN):
+        self.cooldown = pd.Timedelta(cooldown)
+        self.rules = []
+        self.errors = {}
+        for rule in rules.to_dict('records'):
+            if not _enabled(rule.get('Enabled', True)):
+                continue
+            try:
+                code, fields, trigger = compile_condition(rule['Condition'])
+            except RuleCompileError as exc:
+                self.errors[rule['Alert_ID']] = str(exc)
+                continue
+            self.rules.append({**rule, 'code': code, 'fields': fields, 'trigger': trigger})
+        self._thresholds = {}
+        self._last_row = None
+        self._active = {}
+        self._last_fired = {}
+        self._lock = threading.Lock()
+
+    def status(self, available_fields):
+        """One row per rule: compiled / missing fields / compile error."""
+        rows = []
+        for rule in self.rules:
+            missing = sorted(rule['fields'] - set(available_fields))
+            rows.append({'Alert_ID': rule['Alert_ID'], 'Alert_Name': rule['Alert_Name'],
+                         'Fields': ', '.join(sorted(rule['fields'])),
+                         'Status': f"missing {', '.join(missing)}" if missing else 'compiled'})
+        for alert_id, error in self.errors.items():
+            rows.append({'Alert_ID': alert_id, 'Alert_Name': None, 'Fields': '', 'Status': error})
+        return pd.DataFrame(rows)
+
+    def seed_history(self, history):
+        """Start cool-downs from the last logged firing of each rule."""
+        if history.empty:
+            return
+        last = history.groupby('Alert_ID', observed=True)['Timestamp'].max()
+        with self._lock:
+            for alert_id, ts in last.items():
+                self._last_fired[alert_id] = max(ts, self._last_fired.get(alert_id, ts))
+
+    def evaluate(self, features):
+        """Boolean condition state for every rule over a feature frame.
+
+        Returns a frame aligned with ``features`` with one column per
+        ``Alert_ID``; rules with missing fields are omitted.
+        """
+        columns = {name: features[name].to_numpy() for name in features.columns}
+        # Thresholds are collected locally and published under the lock: the
+        # monitor reads them from the poller thread while a page evaluates
+        thresholds = {}
+        namespace = {'percentile': _history_percentile(thresholds), 'changes_to': _changes_to}
+        states = {}
+        for rule in self.rules:
+            if rule['fields'] <= columns.keys():
+                hit = eval(rule['code'], namespace, columns)
+                states[rule['Alert_ID']] = np.broadcast_to(np.asarray(hit, dtype=bool), len(features))
+        with self._lock:
+            self._thresholds.update(thresholds)
+        return pd.DataFrame(states, index=features.index)
+
+    def evaluate_history(self, features):
+        """Alerts that would have fired over ``features`` (indexed by time)."""
+        states = self.evaluate(features)
+        if states.empty:
+            return pd.DataFrame(columns=HISTORY_COLUMNS)
+        values = states.to_numpy()
+        rising = values & ~np.vstack([np.zeros((1, values.shape[1]), bool), values[:-1]])
+        times = features.index
+        fired = []
+        for col, rule in enumerate(r for r in self.rules if r['Alert_ID'] in states.columns):
+            # Only the (few) rising edges are walked to apply the cool-down
+            last = None
+            trigger = features[rule['trigger']]
+            for row in np.flatnonzero(rising[:, col]):
+                if last is not None and times[row] - last < self.cooldown:
+                    continue
+                last = times[row]
+                fired.append(self._alert(rule, times[row], trigger.iloc[row]))
+        return pd.DataFrame(fired, columns=HISTORY_COLUMNS).sort_values('Timestamp', ascending=False)
+
+    def evaluate_snapshot(self, row, timestamp):
+        """Update with one snapshot and return the alerts that newly fired.
+
+        ``row`` maps field names to scalars.  Work is O(rules): each compiled
+        condition runs over a two-element [previous, current] column so edge
+        rules such as ``changes to`` behave exactly as they do in history.
+        """
+        timestamp = pd.Timestamp(timestamp)
+        with self._lock:
+            previous = self._last_row or row
+            columns = {name: np.array([previous.get(name, np.nan), value], dtype=object
+                                      if isinstance(value, str) else None)
+                       for name, value in row.items()}
+            namespace = {'percentile': _snapshot_percentile(self._thresholds),
+                         'changes_to': _changes_to}
+            fired = []
+            for rule in self.rules:
+                if not rule['fields'] <= columns.keys():
+                    continue
+                hit = bool(np.asarray(eval(rule['code'], namespace, columns))[-1])
+                was_active = self._active.get(rule['Alert_ID'], False)
+                self._active[rule['Alert_ID']] = hit
+                if not hit or was_active:
+                    continue
+                last = self._last_fired.get(rule['Alert_ID'])
+                if last is not None and timestamp - last < self.cooldown:
+                    continue
+                self._last_fired[rule['Alert_ID']] = timestamp
+                fired.append(self._alert(rule, timestamp, row[rule['trigger']]))
+            self._last_row = dict(row)
+        return pd.DataFrame(fired, columns=HISTORY_COLUMNS)
+
+    def active(self):
+        """Alert_IDs whose condition held on the latest snapshot."""
+        return [alert_id for alert_id, hit in self._active.items() if hit]
+
+    def _alert(self, rule, timestamp, value):
+        value = float(value) if isinstance(value, (int, float, np.number)) else np.nan
+        return {'Timestamp': timestamp, 'Alert_ID': rule['Alert_ID'],
+                'Alert_Name': rule['Alert_Name'], 'Priority': rule['Priority'],
+                'Triggered_Value': value, 'Status': 'Active', 'Action_Taken': 'Pending'}
+
+
+def _enabled(flag):
+    if isinstance(flag, str):
+        return flag.strip().lower() not in ('false', '0', 'no')
+    return bool(flag) if not pd.isna(flag) else True
+
+
+# ==========================================
+# INPUTS AND HISTORY
+# ==========================================
+
+def build_features(tables):
+    """Daily feature frame for rule evaluation from the source tables.
+
+    ``tables`` maps table names to frames (``data`` in the app).  Intraday
+    sources are reduced to their last value per day, then every field is
+    forward-filled so a rule always sees the latest known value.
+    """
+    by_table = {}
+    for field, (table, column) in FIELD_SOURCES.items():
+        by_table.setdefault(table, {})[column] = field
+    parts = []
+    for table, columns in by_table.items():
+        frame = tables[table]
+        if frame.empty or not isinstance(frame.index, pd.DatetimeIndex):
+            continue
+        present = {c: f for c, f in columns.items() if c in frame}
+        if present:
+            daily = frame[list(present)].rename(columns=present)
+            parts.append(daily.groupby(daily.index.normalize()).last())
+    if not parts:
+        return pd.DataFrame()
+    return pd.concat(parts, axis=1).sort_index().ffill()
+
+
+def snapshot_row(latest, greeks=None):
+    """Rule fields for one ``live_market_snapshot`` row plus book greeks."""
+    row = {}
+    if latest is not None:
+        row.update({field: latest[col] for col, field in SNAPSHOT_FIELDS.items() if col in latest})
+    if greeks is not None and not greeks.empty:
+        row.update({field: greeks[col].sum() for col, field in GREEK_FIELDS.items() if col in greeks})
+    return row
+
+
+def combined_history(baseline, logged):
+    """The baseline ``alert_history`` table followed by the runtime log."""
+    parts = [frame for frame in (baseline, logged) if not frame.empty]
+    if not parts:
+        return pd.DataFrame(columns=HISTORY_COLUMNS)
+    return pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0]
+
+
+class AlertLog:
+    """Fired live alerts, appended to a runtime CSV kept out of the source data."""
+
+    def __init__(self, path):
+        self.path = path
+        self._frame = (None, pd.DataFrame(columns=HISTORY_COLUMNS))
+        self._lock = threading.Lock()
+
+    def read(self):
+        """Every logged alert; the file is re-read only when it changes."""
+        try:
+            info = os.stat(self.path)
+        except FileNotFoundError:
+            return pd.DataFrame(columns=HISTORY_COLUMNS)
+        signature = (info.st_size, info.st_mtime_ns)
+        with self._lock:
+            if self._frame[0] != signature:
+                frame = pd.read_csv(self.path)
+                frame['Timestamp'] = pd.to_datetime(frame['Timestamp'], format='ISO8601')
+                self._frame = (signature, frame)
+            return self._frame[1]
+
+    def append(self, fired):
+        """Append ``fired`` alerts, skipping duplicates; returns the rows written.
+
+        A row is a duplicate when the same Alert_ID is already logged at the
+        same timestamp, so re-evaluating an unchanged snapshot is idempotent.
+        """
+        if fired.empty:
+            return fired
+        logged = self.read()
+        if not logged.empty:
+            seen = set(zip(logged['Alert_ID'], logged['Timestamp']))
+            fired = fired[[(a, t) not in seen for a, t in zip(fired['Alert_ID'], fired['Timestamp'])]]
+        if not fired.empty:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            fired[HISTORY_COLUMNS].to_csv(self.path, mode='a', header=not os.path.exists(self.path),
+                                          index=False, date_format='%Y-%m-%d %H:%M:%S.%f')
+        return fired
+
+
+class AlertMonitor:
+    """The single writer of live alerts: evaluates each new snapshot off the page.
+
+    ``fields`` maps the latest snapshot (a dict) to rule fields, e.g.
+    ``snapshot_row`` with the book's greeks.  The engine is rebuilt when
+    ``alert_rules.csv`` changes, seeded with the logged cool-downs and the
+    history percentiles.
+    """
+
+    def __init__(self, store, log, fields=snapshot_row):
+        self.store = store
+        self.log = log
+        self.fields = fields
+        self.fired = pd.DataFrame(columns=HISTORY_COLUMNS)
+        self.error = None
+        self._engine = (None, None)
+        self._poller = None
+        self._lock = threading.Lock()
+
+    def attach(self, poller):
+        """Evaluate ``poller``'s latest snapshot now and every new one after."""
+        self.detach()
+        self._poller = poller
+        poller.subscribe(self.on_snapshots)
+        latest = poller.latest()
+        if latest is not None:
+            self.on_snapshots([latest])
+        return self
+
+    def detach(self):
+        """Stop receiving snapshots from the attached poller."""
+        if self._poller is not None:
+            self._poller.unsubscribe(self.on_snapshots)
+            self._poller = None
+
+    def history(self):
+        """Baseline alert history plus everything logged at runtime."""
+        return combined_history(self.store['alert_history'], self.log.read())
+
+    def engine(self):
+        """The ``AlertEngine`` for the current rules file."""
+        signature = self.store.signature('alert_rules')
+        with self._lock:
+            if self._engine[0] != signature:
+                engine = AlertEngine(self.store['alert_rules'])
+                engine.seed_history(self.history())
+                # Percentile rules need their thresholds before the first snapshot
+                engine.evaluate_history(build_features(_Tables(self.store)))
+                self._engine = (signature, engine)
+            return self._engine[1]
+
+    def on_snapshots(self, rows):
+        """Poller callback: only the newest of a batch of rows is evaluated."""
+        latest = rows[-1]
+        if 'Timestamp' not in latest:
+            return
+        try:
+            fired = self.engine().evaluate_snapshot(self.fields(latest), latest['Timestamp'])
+        except TableLoadError as exc:
+            # No rules to evaluate; the next snapshot tries again
+            self.error = exc
+            logger.warning("Alert rules unavailable: %s", exc)
+            return
+        try:
+            self.fired = self.log.append(fired)
+            self.error = None
+        except OSError as exc:
+            self.fired, self.error = fired, exc
+            logger.warning("Could not log fired alerts to %s: %s", self.log.path, exc)
+
+
+class _Tables:
+    # ``build_features`` input over a store: unloadable tables read as empty
+    def __init__(self, store):
+        self.store = store
+
+    def __getitem__(self, name):
+        try:
+            return self.store[name]
+        except TableLoadError as exc:
+            logger.warning("Alert features skip %s: %s", name, exc)
+            return pd.DataFrame()
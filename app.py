@@ -26,6 +26,8 @@ st.markdown("---")
 # Then continue with your regular content
 
 
+import os
+import threading
 import streamlit as st
 import pandas as pd
 import numpy as np
@@ -35,6 +37,27 @@ from datetime import datetime, timedelta
 import warnings
 warnings.filterwarnings('ignore')
 
+import charts
+import figures
+import profiling
+
+from data_store import DataStore, TableLoadError
+from timeseries_store import TimeSeriesStore
+from alert_engine import ALERT_LOG, AlertLog, AlertMonitor, build_features, combined_history, snapshot_row
+from greeks_engine import book_greeks, summarize_book
+from stress_engine import DEFAULT_BOOK, DEFAULT_MARKET as STRESS_MARKET, option_book, run_grid
+from forecast_engine import VolForecaster
+from live_feed import LivePoller
+from correlation_engine import CorrelationEngine, pairs
+from ml_engine import FAILED, MODELS, TRAINING, ModelTrainer
+from optimizer_engine import OBJECTIVES, TRADING_DAYS, RiskBudgetOptimizer, fundamental_ir
+from performance_engine import STRATEGY_COLUMNS, TOTAL, PerformanceEngine
+from varswap_engine import price_history
+from svi_engine import SurfaceFitter
+from etf_engine import EtfNavEngine
+from vix_engine import TermStructureEngine
+from vpin_engine import HIGH_TOXICITY, TOXICITY_BINS, toxicity_regime
+
 # ==========================================
 # PAGE CONFIGURATION
 # ==========================================
@@ -46,6 +69,13 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Opt-in profiling (sidebar panel or ?profile=1); off, it costs a lookup per render call
+profiling.install()
+st.session_state.setdefault('profiling', st.query_params.get('profile') == '1')
+profiler = profiling.start(st.session_state['profiling'],
+                           cprofile=st.session_state.get('profiling_cprofile', False),
+                           state=st.session_state)
+
 # ==========================================
 # LIGHT THEME
 # ==========================================
@@ -70,30 +100,371 @@ st.markdown("""
 # DATA LOADING
 # ==========================================
 
-@st.cache_data
-def load_all_data():
-    data = {}
-    files = [
-        'vix_term_structure', 'volatility_surface', 'barra_factors', 'variance_premium',
-        'factor_attribution', 'vol_regime', 'trade_signals', 'portfolio_greeks',
-        'etf_arbitrage_microstructure', 'grinold_kahn_strategies', 'alpha_factors_ml',
-        'order_flow_toxicity', 'etf_basket_composition', 'risk_budgeting_optimization',
-        'ml_feature_importance', 'global_equity_dislocations', 'variance_swap_pricing',
-        'dividend_futures_arbitrage', 'vix_term_structure_forecast', 'option_greeks_dynamic_hedging',
-        'volatility_forecasting_models', 'live_market_snapshot', 'trade_execution_journal',
-        'alert_rules', 'alert_history', 'scenario_analysis', 'research_daily_notes',
-        'performance_attribution_daily', 'economic_calendar', 'correlation_network'
-    ]
-    
-    for file in files:
+@st.cache_resource
+def get_data_store():
+    # One store per server process, shared by every session and rerun
+    return DataStore(os.path.dirname(os.path.abspath(__file__)))
+
+@st.cache_resource
+def get_series_store():
+    return TimeSeriesStore(get_data_store())
+
+def live_alert_fields(latest):
+    # Rule fields of one live snapshot, with the option book revalued at its
+    # spot (the static greeks table when there is no book)
+    store = get_data_store()
+    try:
+        positions = store['option_positions']
+        if positions.empty:
+            greeks = store['portfolio_greeks']
+        else:
+            greeks = summarize_book(book_greeks(positions, store['volatility_surface'],
+                                                float(latest['SPX_Price'])))
+    except (TableLoadError, KeyError, ValueError):
+        greeks = None
+    return snapshot_row(latest, greeks)
+
+@st.cache_resource(max_entries=1, hash_funcs={LivePoller: id},
+                   on_release=lambda monitor: monitor.detach())
+def get_alert_monitor(poller):
+    # The one writer of fired alerts, driven by the live poller's thread:
+    # page renders only read. Alerts are logged under the runtime cache
+    # (ALERT_LOG_PATH overrides), never into alert_history.csv.
+    # Keyed by the poller, so a restarted poller gets a fresh monitor.
+    store = get_data_store()
+    log = AlertLog(os.environ.get('ALERT_LOG_PATH') or os.path.join(store.cache_dir, ALERT_LOG))
+    return AlertMonitor(store, log, live_alert_fields).attach(poller)
+
+@st.cache_resource
+def get_vol_forecaster():
+    # Shared by every session: new bars are folded in with O(1) updates and
+    # GARCH is refitted (warm-started) only every few weeks of data.
+    return VolForecaster(), threading.Lock()
+
+@st.cache_resource
+def get_performance_engine():
+    # Prefix sums shared by every session; new days are appended, not recomputed.
+    # It holds the selected range plus its lookback, so a new range refits it.
+    return PerformanceEngine(), threading.Lock()
+
+@st.cache_resource(max_entries=8)
+def get_correlation_engine(window, halflife):
+    # One engine per window setting, moved forward a day at a time as P&L arrives
+    return CorrelationEngine(window=window, halflife=halflife), threading.Lock()
+
+@st.cache_resource
+def get_term_structure_engine():
+    # Constant-maturity curves for the whole history, extended a day at a time
+    return TermStructureEngine(), threading.Lock()
+
+@st.cache_resource
+def get_risk_optimizer():
+    # Holds the warm starts and the per-constraint-set result cache
+    return RiskBudgetOptimizer()
+
+@st.cache_resource(on_release=lambda poller: poller.stop())
+def get_live_poller():
+    # One poller thread for every session; live widgets read its ring buffer.
+    # Clearing the cache stops and joins the thread.
+    return LivePoller(get_data_store()).start()
+
+@st.cache_resource
+def get_ml_trainer():
+    # Background training pool plus the trained-model cache, shared by every session
+    return ModelTrainer()
+
+@st.cache_resource
+def get_surface_fitter():
+    # Keeps the last SVI parameters for warm starts and caches fitted grids by surface hash
+    return SurfaceFitter()
+
+@st.cache_resource
+def get_figure_cache():
+    # Built figures keyed by (page, figure, table versions, parameters), so
+    # returning to a page already viewed only costs the lookup
+    return charts.FigureCache()
+
+class PageData:
+    """Per-rerun view of the shared stores that reports load failures on the page."""
+
+    def __init__(self, store, series_store, profiler):
+        self.store = store
+        self.series_store = series_store
+        self.profiler = profiler
+        self.errors = {}
+
+    def __getitem__(self, name):
+        return self._guard(name, lambda: self.store[name], pd.DataFrame())
+
+    def series(self, name, start=None, end=None):
+        """Rows of a partitioned time series inside ``[start, end]``."""
+        return self._guard(name, lambda: self.series_store.query(name, start, end), pd.DataFrame())
+
+    def bounds(self, name):
+        return self._guard(name, lambda: self.series_store.bounds(name), None)
+
+    def version(self, *names):
+        """Signatures of the named tables, the data part of a figure cache key."""
+        return tuple(self._guard(name, lambda: self.store.signature(name), None) for name in names)
+
+    def _guard(self, name, load, fallback):
         try:
-            data[file] = pd.read_csv(f'{file}.csv')
-        except:
-            data[file] = pd.DataFrame()
-    
-    return data
+            with self.profiler.span(f"load {name}", 'load'):
+                return load()
+        except TableLoadError as exc:
+            if name not in self.errors:
+                self.errors[name] = exc
+                st.error(f"⚠️ Could not load **{exc.name}**: {exc.reason}")
+            return fallback
 
-data = load_all_data()
+data = PageData(get_data_store(), get_series_store(), profiler)
+figures_cache = get_figure_cache()
+poller = get_live_poller()
+alert_monitor = get_alert_monitor(poller)
+
+# ==========================================
+# ANALYTICS ENGINES
+# ==========================================
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def compute_book_greeks(positions, surface, spot):
+    # Cached by a hash of the book, the surface and spot
+    lines = book_greeks(positions, surface, spot)
+    return lines, summarize_book(lines)
+
+@st.cache_data(max_entries=32, show_spinner="Revaluing stress grid...")
+def compute_stress_grid(spx_moves, vix_levels, correlations, market, positions, surface, workers=1):
+    # Cached by option book + surface + grid + market, so revisiting a grid is a lookup
+    options = None if positions.empty or surface.empty else option_book(positions, surface)
+    return run_grid(spx_moves, vix_levels, correlations, book=DEFAULT_BOOK, market=market,
+                    options=options, workers=workers)
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def compute_variance_strikes(history, surface):
+    # Whole window repriced in one pass; cached by the window and the surface
+    return price_history(history, surface)
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def compute_etf_nav(composition, ticks):
+    # Bulk replay of the tick file; a live feed would keep streaming into the engine
+    return EtfNavEngine.from_ticks(composition, ticks).replay(ticks)
+
+def stress_market():
+    """Today's market state for the stress engine, from the live tables."""
+    market = dict(STRESS_MARKET)
+    snapshot = data['live_market_snapshot']
+    if not snapshot.empty:
+        live = snapshot.iloc[-1]
+        market.update(spx=float(live['SPX_Price']), vix=float(live['VIX_Spot']),
+                      vix_future=float(live['VIX_1M_Future']))
+    dislocations = data['global_equity_dislocations']
+    if not dislocations.empty:
+        market['correlation'] = float(dislocations['Cross_Region_Correlation'].iloc[-1])
+    return market
+
+def volatility_forecasts():
+    """EWMA/GARCH forecasts and vol cones for SPX, fitted from vol_regime returns.
+
+    Falls back to the offline ``volatility_forecasting_models`` table when the
+    return series is unavailable.
+    """
+    regime = data['vol_regime']
+    if regime.empty or 'SPX_Return' not in regime:
+        return data['volatility_forecasting_models'], None
+    returns = regime[['SPX_Return']].rename(columns={'SPX_Return': 'SPX'}).sort_index()
+    forecaster, lock = get_vol_forecaster()
+    with lock:
+        forecaster.sync(returns)
+        return forecaster.table('SPX'), forecaster.summary().loc['SPX']
+
+def lookback_series(name, start, end, rows):
+    """A partitioned table over ``[start, end]`` plus ``rows`` days of history before it.
+
+    Trailing windows reach back before ``start``; twice ``rows`` calendar
+    days covers that on a trading-day calendar.
+    """
+    if start is not None:
+        start = pd.Timestamp(start) - pd.Timedelta(days=2 * rows)
+    return data.series(name, start, end)
+
+def performance_stats(window, start, end):
+    """Rolling and period Sharpe/Sortino/win rate from the per-strategy P&L."""
+    history = lookback_series('performance_attribution_daily', start, end, window)
+    strategies = [c for c in STRATEGY_COLUMNS if c in history]
+    if not strategies:
+        return None, None
+    engine, lock = get_performance_engine()
+    with lock:
+        engine.sync(history[strategies])
+        return engine.rolling(window, start, end), engine.period(start, end)
+
+def strategy_correlations(window, halflife, start, end):
+    """Correlation matrix and pair table from strategy P&L as of ``end``.
+
+    Falls back to the static ``correlation_network`` pairs without P&L.
+    """
+    # EWMA weights older than ten half-lives are below 0.1%
+    history = lookback_series('performance_attribution_daily', start, end, window or 10 * halflife)
+    strategies = [c for c in STRATEGY_COLUMNS if c in history]
+    if len(strategies) < 2:
+        return None, data['correlation_network']
+    pnl = history[strategies].rename(columns=lambda c: c.removesuffix('_PnL').replace('_', ' '))
+    engine, lock = get_correlation_engine(window, halflife)
+    with lock:
+        engine.sync(pnl)
+        matrix = engine.matrix(end)
+    return matrix, pairs(matrix)
+
+def vix_term_structure():
+    """Constant-maturity curve table from the futures history, or None."""
+    history = data['vix_term_structure_forecast']
+    if history.empty:
+        return None
+    engine, lock = get_term_structure_engine()
+    with lock:
+        engine.sync(history)
+        return engine.table()
+
+@st.fragment
+def vix_curve_scrubber(first, last):
+    """Date slider and curve; moving the slider reruns only this block."""
+    picked = st.slider("Curve Date:", first, last, last, timedelta(days=1), format="YYYY-MM-DD",
+                       key='vix_curve_date')
+    engine, lock = get_term_structure_engine()
+    with lock:
+        date, curve = engine.snapshot(picked)
+    if date is not None:
+        st.plotly_chart(figures.term_structure_curve(curve, date), use_container_width=True)
+
+# Risk-budget strategies and the P&L column that tracks each of them
+BUDGET_PNL = {
+    'VIX Futures Carry': 'VIX_Products_PnL',
+    'Vol Surface Arb': 'Skew_Trading_PnL',
+    'Variance Swaps': 'Variance_Swap_PnL',
+    'ETF-NAV Arb': 'ETF_Arb_PnL',
+}
+COVARIANCE_LOOKBACK = 252
+
+def optimizer_inputs():
+    """Names, fundamental-law IRs, P&L covariance and vol exposures, or None."""
+    budget = data['risk_budgeting_optimization']
+    history = data['performance_attribution_daily']
+    if budget.empty or history.empty:
+        return None
+    budget = budget[budget['Strategy'].map(BUDGET_PNL).isin(history.columns)]
+    if len(budget) < 2:
+        return None
+    pnl = history[budget['Strategy'].map(BUDGET_PNL)].iloc[-COVARIANCE_LOOKBACK:]
+    cov = pnl.cov().to_numpy() * TRADING_DAYS
+    ir = fundamental_ir(budget['Expected_IC'], budget['Annual_Breadth'], budget['Transfer_Coef'])
+    return budget, ir, cov, budget['Barra_Vol_Exposure'].to_numpy('float64')
+
+@st.fragment(run_every=1)
+def await_training(factors, model, params, splits):
+    """Polls a background training run; reruns the page once it has finished."""
+    status, _ = get_ml_trainer().request(factors, model, params, splits)
+    if status != TRAINING:
+        st.rerun()
+    st.info(f"⏳ Training {model} walk-forward in the background...")
+
+def live_snapshot():
+    """Newest buffered snapshot and the one before it (None when missing)."""
+    live = poller.latest()
+    if live is None and poller.error is not None:
+        st.error(f"⚠️ Live feed unavailable: {poller.error.reason}")
+    return live, poller.latest(1)
+
+def live_delta(live, previous, column, fmt="{:+.2f}"):
+    """Change of a snapshot field since the previous snapshot, or None."""
+    if live is None or previous is None:
+        return None
+    return fmt.format(live[column] - previous[column])
+
+def live_status_bar():
+    live, _ = live_snapshot()
+    col1, col2, col3, col4 = st.columns(4)
+    if live is not None:
+        market = str(live['Market_Status'])
+        with col1:
+            st.markdown(f"{'🟢' if market.endswith('OPEN') else '🔴'} **Market:** {market.removeprefix('US_')}")
+        with col2:
+            st.markdown(f"📊 **VIX:** {live['VIX_Spot']:.2f}")
+        with col3:
+            st.markdown(f"⏰ **FOMC:** {int(live['Next_FOMC_Days'])} days")
+    with col4:
+        st.markdown(f"📅 **{datetime.now().strftime('%I:%M:%S %p')}**")
+
+def live_command_metrics():
+    live, previous = live_snapshot()
+    col1, col2, col3, col4, col5 = st.columns(5)
+    if live is not None:
+        with col1:
+            st.metric("VIX Spot", f"{live['VIX_Spot']:.2f}", live_delta(live, previous, 'VIX_Spot'))
+        with col2:
+            st.metric("S&P 500", f"{live['SPX_Price']:,.0f}", live_delta(live, previous, 'SPX_Price', "{:+,.1f}"))
+        with col3:
+            st.metric("VRP", f"{live['VRP_Current']:.2f}", live_delta(live, previous, 'VRP_Current'))
+        with col4:
+            st.metric("SPY Premium", f"{live['SPY_Premium_bps']:.1f} bps",
+                      live_delta(live, previous, 'SPY_Premium_bps', "{:+.1f} bps"))
+    perf = data['performance_attribution_daily']
+    if not perf.empty:
+        with col5:
+            st.metric("Portfolio P&L", f"${perf['Cumulative_PnL'].iloc[-1] / 1e6:.1f}M",
+                      f"{perf['Total_Daily_PnL'].iloc[-1]:+,.0f}")
+
+def live_market_panel():
+    live, previous = live_snapshot()
+    if live is None:
+        return
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("VIX Spot", f"{live['VIX_Spot']:.2f}", live_delta(live, previous, 'VIX_Spot'))
+    with col2:
+        st.metric("SPX", f"${live['SPX_Price']:.2f}", live_delta(live, previous, 'SPX_Price'))
+    with col3:
+        st.metric("VRP", f"{live['VRP_Current']:.2f}", live_delta(live, previous, 'VRP_Current'))
+    with col4:
+        st.metric("Market", f"🟢 {live['Market_Status']}")
+
+    history = poller.history()
+    if len(history) > 1:
+        st.plotly_chart(figures.series_line(history, 'VIX_Spot', '#1E3A8A',
+                                            f"Intraday VIX ({len(history)} snapshots)"),
+                        use_container_width=True)
+
+    st.markdown("---")
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.subheader("VIX Futures Curve")
+        curve_data = pd.DataFrame({
+            'Tenor': ['Spot', '1M', '2M', '3M'],
+            'Level': [live['VIX_Spot'], live['VIX_1M_Future'],
+                     live['VIX_2M_Future'], live['VIX_3M_Future']]
+        })
+        fig = px.line(curve_data, x='Tenor', y='Level', markers=True)
+        fig.update_traces(line_color='#1E3A8A')
+        fig.update_layout(height=400, plot_bgcolor='white')
+        st.plotly_chart(fig, use_container_width=True)
+
+    with col2:
+        st.subheader("ETF Flow")
+        st.metric("SPY Price", f"${live['SPY_Price']:.2f}")
+        st.metric("Premium", f"{live['SPY_Premium_bps']:.2f} bps")
+        st.metric("Creations", live['SPY_Creation_Units_Today'])
+        st.metric("Redemptions", live['SPY_Redemption_Units_Today'])
+
+def portfolio_greeks():
+    """Per-position greeks priced from the option book, else the static table."""
+    positions = data['option_positions']
+    surface = data['volatility_surface']
+    snapshot = data['live_market_snapshot']
+    if positions.empty or surface.empty or snapshot.empty:
+        return data['portfolio_greeks'], False
+    spot = float(snapshot['SPX_Price'].iloc[-1])
+    return compute_book_greeks(positions, surface, spot)[1], True
 
 # ==========================================
 # SIDEBAR NAVIGATION (SOLUTION TO TAB LIMIT)
@@ -129,6 +500,38 @@ page = st.sidebar.radio(
     ]
 )
 
+st.sidebar.markdown("---")
+live_mode = st.sidebar.toggle("🔴 Live Mode", key='live_mode')
+cadence = st.sidebar.select_slider("Refresh every (s):", [1, 2, 5, 10, 30], 2, key='live_cadence',
+                                   disabled=not live_mode)
+# Live widgets rerun as fragments on their own cadence; the rest of the page stays put
+live_fragment = st.fragment(run_every=cadence if live_mode else None)
+
+# Time-series pages read only the selected window from the partitioned store;
+# the default window is the page's lookback (days) before the latest row.
+PAGE_SERIES = {
+    "📊 Performance": ('performance_attribution_daily', 365),
+    "🌍 Global Markets": ('global_equity_dislocations', 145),
+    "💎 Variance Swaps": ('variance_swap_pricing', 365),
+    "🏪 ETF Flow": ('etf_arbitrage_microstructure', 5),
+    "🌊 Order Flow": ('order_flow_toxicity', 365),
+    "🎲 Greeks": ('option_greeks_dynamic_hedging', 90),
+    "🎨 3D Analytics": ('option_greeks_dynamic_hedging', 145),
+}
+
+date_range = (None, None)
+if page in PAGE_SERIES:
+    series_name, lookback_days = PAGE_SERIES[page]
+    bounds = data.bounds(series_name)
+    if bounds is not None:
+        first, last = bounds[0].date(), bounds[1].date()
+        default_range = (max(first, last - timedelta(days=lookback_days)), last)
+        st.sidebar.markdown("---")
+        picked = st.sidebar.date_input("Date Range:", value=default_range,
+                                       min_value=first, max_value=last, key=f"date_range_{page}")
+        # A half-picked range (single click) keeps the default until completed
+        date_range = tuple(picked) if len(picked) == 2 else default_range
+
 # ==========================================
 # HEADER
 # ==========================================
@@ -138,15 +541,7 @@ st.markdown("**Institutional-Grade Market Intelligence with Advanced 3D Visualiz
 st.markdown("---")
 
 # Status bar
-col1, col2, col3, col4 = st.columns(4)
-with col1:
-    st.markdown("🟢 **Market:** OPEN")
-with col2:
-    st.markdown("📊 **VIX:** 18.45")
-with col3:
-    st.markdown("⏰ **FOMC:** 12 days")
-with col4:
-    st.markdown(f"📅 **{datetime.now().strftime('%I:%M %p')}**")
+live_fragment(live_status_bar)()
 
 st.markdown("---")
 
@@ -154,426 +549,715 @@ st.markdown("---")
 # PAGE ROUTING
 # ==========================================
 
-if page == "🎯 Command Center":
-    st.header("🎯 Executive Command Center")
-    
-    col1, col2, col3, col4, col5 = st.columns(5)
-    with col1:
-        st.metric("VIX Spot", "18.45", "+1.2")
-    with col2:
-        st.metric("S&P 500", "5,847", "+12.5")
-    with col3:
-        st.metric("VRP", "3.45", "+0.3")
-    with col4:
-        st.metric("SPY Premium", "2.6 bps")
-    with col5:
-        st.metric("Portfolio P&L", "$6.2M", "+2.3%")
-    
-    st.markdown("---")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.subheader("📊 Top Strategies by IR")
-        if not data['grinold_kahn_strategies'].empty:
-            gk = data['grinold_kahn_strategies'].sort_values('Expected_IR', ascending=False)
-            st.dataframe(gk[['Strategy', 'Expected_IR', 'Expected_Alpha']], 
-                        use_container_width=True, hide_index=True)
-    
-    with col2:
-        st.subheader("🎯 Portfolio Greeks")
-        if not data['portfolio_greeks'].empty:
-            greeks = data['portfolio_greeks']
-            st.metric("Total Vega", f"{greeks['Vega'].sum():,.0f}")
-            st.metric("Total Gamma", f"{greeks['Gamma'].sum():,.2f}")
-            st.metric("Total Delta", f"{greeks['Delta'].sum():,.0f}")
-
-elif page == "📊 Live Market":
-    st.header("📊 Live Market Dashboard")
-    
-    if not data['live_market_snapshot'].empty:
-        live = data['live_market_snapshot'].iloc[0]
-        
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            st.metric("VIX Spot", f"{live['VIX_Spot']:.2f}")
-        with col2:
-            st.metric("SPX", f"${live['SPX_Price']:.2f}")
-        with col3:
-            st.metric("VRP", f"{live['VRP_Current']:.2f}")
-        with col4:
-            st.metric("Market", f"🟢 {live['Market_Status']}")
+# Finished even when the page raises or reruns: an unfinished run would
+# leave process-wide tracemalloc on for every session
+try:
+    profiler.page = page
+    profiler.begin(page, 'page')
+
+    if page == "🎯 Command Center":
+        st.header("🎯 Executive Command Center")
+        
+        live_fragment(live_command_metrics)()
         
         st.markdown("---")
         
         col1, col2 = st.columns(2)
         
         with col1:
-            st.subheader("VIX Futures Curve")
-            curve_data = pd.DataFrame({
-                'Tenor': ['Spot', '1M', '2M', '3M'],
-                'Level': [live['VIX_Spot'], live['VIX_1M_Future'], 
-                         live['VIX_2M_Future'], live['VIX_3M_Future']]
-            })
-            fig = px.line(curve_data, x='Tenor', y='Level', markers=True)
-            fig.update_traces(line_color='#1E3A8A')
-            fig.update_layout(height=400, plot_bgcolor='white')
-            st.plotly_chart(fig, use_container_width=True)
+            st.subheader("📊 Top Strategies by IR")
+            if not data['grinold_kahn_strategies'].empty:
+                gk = data['grinold_kahn_strategies'].sort_values('Expected_IR', ascending=False)
+                st.dataframe(gk[['Strategy', 'Expected_IR', 'Expected_Alpha']], 
+                            use_container_width=True, hide_index=True)
         
         with col2:
-            st.subheader("ETF Flow")
-            st.metric("SPY Price", f"${live['SPY_Price']:.2f}")
-            st.metric("Premium", f"{live['SPY_Premium_bps']:.2f} bps")
-            st.metric("Creations", live['SPY_Creation_Units_Today'])
-            st.metric("Redemptions", live['SPY_Redemption_Units_Today'])
+            st.subheader("🎯 Portfolio Greeks")
+            greeks, priced = portfolio_greeks()
+            if not greeks.empty:
+                st.metric("Total Vega", f"{greeks['Vega'].sum():,.0f}")
+                st.metric("Total Gamma", f"{greeks['Gamma'].sum():,.2f}")
+                st.metric("Total Delta", f"{greeks['Delta'].sum():,.0f}")
+                if priced:
+                    st.caption("Priced from the option book off the live surface")
+
+    elif page == "📊 Live Market":
+        st.header("📊 Live Market Dashboard")
+        live_fragment(live_market_panel)()
+
+    elif page == "💼 Trade Journal":
+        st.header("💼 Trade Execution & Journal")
+        
+        if not data['trade_execution_journal'].empty:
+            trades = data['trade_execution_journal']
+            
+            col1, col2, col3, col4 = st.columns(4)
+            closed = trades[trades['Status'] == 'Closed']
+            
+            with col1:
+                st.metric("Total Trades", len(trades))
+            with col2:
+                st.metric("Open", len(trades[trades['Status'] == 'Open']))
+            with col3:
+                if not closed.empty:
+                    st.metric("Total P&L", f"${closed['PnL_USD'].sum():,.0f}")
+            with col4:
+                if not closed.empty and len(closed) > 0:
+                    win_rate = (closed['PnL_USD'] > 0).sum() / len(closed)
+                    st.metric("Win Rate", f"{win_rate:.1%}")
+            
+            st.markdown("---")
+            st.dataframe(trades[['Entry_Date', 'Strategy', 'Direction', 'Status']].head(20),
+                        use_container_width=True, hide_index=True)
 
-elif page == "💼 Trade Journal":
-    st.header("💼 Trade Execution & Journal")
-    
-    if not data['trade_execution_journal'].empty:
-        trades = data['trade_execution_journal']
+    elif page == "🚨 Alert Center":
+        st.header("🚨 Alert Center")
         
-        col1, col2, col3, col4 = st.columns(4)
-        closed = trades[trades['Status'] == 'Closed']
+        rules = data['alert_rules']
+        history = combined_history(data['alert_history'], alert_monitor.log.read())
         
-        with col1:
-            st.metric("Total Trades", len(trades))
-        with col2:
-            st.metric("Open", len(trades[trades['Status'] == 'Open']))
-        with col3:
-            if not closed.empty:
-                st.metric("Total P&L", f"${closed['PnL_USD'].sum():,.0f}")
-        with col4:
-            if not closed.empty and len(closed) > 0:
-                win_rate = (closed['PnL_USD'] > 0).sum() / len(closed)
-                st.metric("Win Rate", f"{win_rate:.1%}")
+        if not rules.empty:
+            engine = alert_monitor.engine()
+            features = build_features(data)
+            backtest = engine.evaluate_history(features)
+            live = snapshot_row(poller.latest(), portfolio_greeks()[0])
+            
+            # Live alerts are evaluated and logged by the shared monitor, not here
+            if alert_monitor.error is not None:
+                st.error(f"⚠️ Live alerts are not being logged: {alert_monitor.error}")
+            for alert in alert_monitor.fired.itertuples():
+                st.warning(f"🚨 **{alert.Alert_Name}** fired ({alert.Priority})")
+            
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Rules Evaluated", len(engine.rules))
+            with col2:
+                st.metric("Active Now", len(engine.active()))
+            with col3:
+                st.metric("Fired over History", len(backtest))
+            
+            st.subheader("Alert Rules")
+            status = engine.status(set(features.columns) | set(live))
+            rule_view = rules[['Alert_ID', 'Alert_Name', 'Condition', 'Priority']].merge(
+                status[['Alert_ID', 'Status']], on='Alert_ID', how='left')
+            rule_view['Active'] = rule_view['Alert_ID'].isin(engine.active()).map({True: '🔴', False: ''})
+            st.dataframe(rule_view.drop(columns='Alert_ID'), use_container_width=True, hide_index=True)
+            
+            if not backtest.empty:
+                st.markdown("---")
+                st.subheader("Fired over History")
+                counts = backtest.groupby('Alert_Name', observed=True).size().reset_index(name='Alerts')
+                fig = px.bar(counts, x='Alert_Name', y='Alerts', color_discrete_sequence=['#1E3A8A'])
+                fig.update_layout(height=350, plot_bgcolor='white')
+                st.plotly_chart(fig, use_container_width=True)
         
-        st.markdown("---")
-        st.dataframe(trades[['Entry_Date', 'Strategy', 'Direction', 'Status']].head(20),
-                    use_container_width=True, hide_index=True)
-
-elif page == "🚨 Alert Center":
-    st.header("🚨 Alert Center")
-    
-    if not data['alert_rules'].empty:
-        st.subheader("Alert Rules")
-        st.dataframe(data['alert_rules'][['Alert_Name', 'Condition', 'Priority']],
-                    use_container_width=True, hide_index=True)
-    
-    if not data['alert_history'].empty:
-        st.markdown("---")
-        st.subheader("Recent Alerts")
-        st.dataframe(data['alert_history'][['Timestamp', 'Alert_Name', 'Priority']].head(15),
-                    use_container_width=True, hide_index=True)
+        if not history.empty:
+            st.markdown("---")
+            st.subheader("Recent Alerts")
+            recent = history.sort_values('Timestamp', ascending=False)
+            st.dataframe(recent[['Timestamp', 'Alert_Name', 'Priority']].head(15),
+                        use_container_width=True, hide_index=True)
 
-elif page == "📉 Stress Tests":
-    st.header("📉 Scenario Analysis")
-    
-    if not data['scenario_analysis'].empty:
-        scenarios = data['scenario_analysis']
+    elif page == "📉 Stress Tests":
+        st.header("📉 Scenario Analysis")
+        
+        if not data['scenario_analysis'].empty:
+            scenarios = data['scenario_analysis']
+            
+            selected = st.selectbox("Select Scenario:", scenarios['Scenario_Name'].tolist())
+            scenario = scenarios[scenarios['Scenario_Name'] == selected].iloc[0]
+            
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("SPX Move", f"{scenario['SPX_Move_Pct']:.1f}%")
+            with col2:
+                st.metric("VIX", f"{scenario['VIX_Level']:.1f}")
+            with col3:
+                st.metric("Total P&L", f"${scenario['Total_Portfolio_PnL']:,.0f}")
+            with col4:
+                st.metric("Max DD", f"{scenario['Max_Drawdown_Pct']:.1f}%")
+            
+            st.markdown("---")
+            
+            pnl_data = pd.DataFrame({
+                'Strategy': ['Variance Swaps', 'VIX Calls', 'ETF Arb'],
+                'P&L': [scenario['Variance_Swap_PnL'], 
+                       scenario['VIX_Call_Spread_PnL'],
+                       scenario['ETF_NAV_Arb_PnL']]
+            })
+            fig = px.bar(pnl_data, x='Strategy', y='P&L', color_discrete_sequence=['#1E3A8A'])
+            fig.update_layout(height=400, plot_bgcolor='white')
+            st.plotly_chart(fig, use_container_width=True)
         
-        selected = st.selectbox("Select Scenario:", scenarios['Scenario_Name'].tolist())
-        scenario = scenarios[scenarios['Scenario_Name'] == selected].iloc[0]
+        st.markdown("---")
+        st.subheader("Full-Revaluation Stress Grid")
         
-        col1, col2, col3, col4 = st.columns(4)
+        col1, col2, col3 = st.columns(3)
         with col1:
-            st.metric("SPX Move", f"{scenario['SPX_Move_Pct']:.1f}%")
+            spx_range = st.slider("SPX Move (%)", -40, 20, (-25, 10))
+            spx_steps = st.slider("SPX Steps", 5, 50, 25)
         with col2:
-            st.metric("VIX", f"{scenario['VIX_Level']:.1f}")
+            vix_range = st.slider("VIX Level", 9, 90, (10, 80))
+            vix_steps = st.slider("VIX Steps", 5, 50, 25)
         with col3:
-            st.metric("Total P&L", f"${scenario['Total_Portfolio_PnL']:,.0f}")
-        with col4:
-            st.metric("Max DD", f"{scenario['Max_Drawdown_Pct']:.1f}%")
+            corr_range = st.slider("US/EU Correlation", 0.0, 1.0, (0.3, 1.0), step=0.05)
+            corr_steps = st.slider("Correlation Steps", 1, 10, 5)
+        parallel = st.checkbox("Fan out across CPU cores", value=False)
         
-        st.markdown("---")
+        spx_moves = tuple(np.linspace(spx_range[0], spx_range[1], spx_steps) / 100)
+        vix_levels = tuple(np.linspace(vix_range[0], vix_range[1], vix_steps))
+        correlations = tuple(np.linspace(corr_range[0], corr_range[1], corr_steps))
+        stress = compute_stress_grid(spx_moves, vix_levels, correlations, stress_market(),
+                                     data['option_positions'], data['volatility_surface'],
+                                     workers=None if parallel else 1)
         
-        pnl_data = pd.DataFrame({
-            'Strategy': ['Variance Swaps', 'VIX Calls', 'ETF Arb'],
-            'P&L': [scenario['Variance_Swap_PnL'], 
-                   scenario['VIX_Call_Spread_PnL'],
-                   scenario['ETF_NAV_Arb_PnL']]
-        })
-        fig = px.bar(pnl_data, x='Strategy', y='P&L', color_discrete_sequence=['#1E3A8A'])
-        fig.update_layout(height=400, plot_bgcolor='white')
-        st.plotly_chart(fig, use_container_width=True)
-
-elif page == "📝 Research Notes":
-    st.header("📝 Research Commentary")
-    
-    if not data['research_daily_notes'].empty:
-        notes = data['research_daily_notes']
-        latest = notes.iloc[0]
+        corr_pick = st.select_slider("Correlation Slice", options=[round(c, 3) for c in correlations],
+                                     value=round(correlations[-1], 3))
+        k = [round(c, 3) for c in correlations].index(corr_pick)
+        axis_x = [f"{v:.1f}" for v in vix_levels]
+        axis_y = [f"{m:+.1%}" for m in spx_moves]
         
-        col1, col2, col3 = st.columns(3)
+        col1, col2 = st.columns(2)
         with col1:
-            st.metric("VIX", f"{latest['VIX_Close']:.2f}", f"{latest['VIX_Change']:+.2f}")
+            fig = go.Figure(data=go.Heatmap(z=stress['Total_Portfolio_PnL'][:, :, k], x=axis_x, y=axis_y,
+                                            colorscale='RdYlGn', zmid=0))
+            fig.update_layout(height=450, title="Total P&L", xaxis_title='VIX', yaxis_title='SPX Move')
+            st.plotly_chart(fig, use_container_width=True)
         with col2:
-            st.metric("SPX", f"{latest['SPX_Close']:.2f}")
-        with col3:
-            st.metric("VRP", f"{latest['VRP']:.2f}")
-        
-        st.markdown("---")
-        st.markdown(f"**Summary:** {latest['Market_Summary']}")
-        st.markdown(f"**Observation:** {latest['Key_Observation']}")
-        st.markdown(f"**Trade Idea:** {latest['Trade_Idea']}")
-
-elif page == "📊 Performance":
-    st.header("📊 Performance Attribution")
-    
-    if not data['performance_attribution_daily'].empty:
-        perf = data['performance_attribution_daily']
-        
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(x=perf.index, y=perf['Cumulative_PnL'],
-                                fill='tozeroy', line=dict(color='#1E3A8A')))
-        fig.update_layout(height=400, plot_bgcolor='white', title="Cumulative P&L")
-        st.plotly_chart(fig, use_container_width=True)
+            fig = go.Figure(data=go.Heatmap(z=stress['VaR_95'][:, :, k], x=axis_x, y=axis_y,
+                                            colorscale='Reds'))
+            fig.update_layout(height=450, title="1-Day VaR 95%", xaxis_title='VIX', yaxis_title='SPX Move')
+            st.plotly_chart(fig, use_container_width=True)
         
+        worst = np.unravel_index(np.argmin(stress['Total_Portfolio_PnL']), stress['Total_Portfolio_PnL'].shape)
         col1, col2, col3 = st.columns(3)
         with col1:
-            st.metric("Total P&L", f"${perf['Cumulative_PnL'].iloc[-1]:,.0f}")
+            st.metric("Worst Cell P&L", f"${stress['Total_Portfolio_PnL'][worst]:,.0f}")
         with col2:
-            st.metric("Avg Sharpe", f"{perf['Sharpe_30D'].mean():.2f}")
+            st.metric("Worst Cell", f"SPX {spx_moves[worst[0]]:+.1%} / VIX {vix_levels[worst[1]]:.1f}")
         with col3:
-            st.metric("Win Rate", f"{perf['Win_Rate_30D'].mean():.1%}")
-
-elif page == "🌍 Global Markets":
-    st.header("🌍 Global Markets")
-    
-    if not data['global_equity_dislocations'].empty:
-        global_data = data['global_equity_dislocations'].tail(100)
-        
-        # 3D scatter plot
-        fig = go.Figure(data=[go.Scatter3d(
-            x=global_data['US_RV'],
-            y=global_data['Europe_RV'],
-            z=global_data['Asia_RV'],
-            mode='markers',
-            marker=dict(
-                size=5,
-                color=global_data['Dislocation_Score'],
-                colorscale='RdYlGn_r',
-                showscale=True
-            )
-        )])
-        
-        fig.update_layout(
-            title="3D Volatility Correlation",
-            scene=dict(
-                xaxis_title='US Vol',
-                yaxis_title='Europe Vol',
-                zaxis_title='Asia Vol'
-            ),
-            height=700
-        )
-        st.plotly_chart(fig, use_container_width=True)
+            st.metric("Max VaR 95%", f"${stress['VaR_95'].max():,.0f}")
+
+    elif page == "📝 Research Notes":
+        st.header("📝 Research Commentary")
         
-        arb_opps = global_data[global_data['Arbitrage_Opportunity'] == 'Yes']
-        st.metric("Arbitrage Opportunities", len(arb_opps))
+        if not data['research_daily_notes'].empty:
+            notes = data['research_daily_notes']
+            latest = notes.iloc[0]
+            
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("VIX", f"{latest['VIX_Close']:.2f}", f"{latest['VIX_Change']:+.2f}")
+            with col2:
+                st.metric("SPX", f"{latest['SPX_Close']:.2f}")
+            with col3:
+                st.metric("VRP", f"{latest['VRP']:.2f}")
+            
+            st.markdown("---")
+            st.markdown(f"**Summary:** {latest['Market_Summary']}")
+            st.markdown(f"**Observation:** {latest['Key_Observation']}")
+            st.markdown(f"**Trade Idea:** {latest['Trade_Idea']}")
 
-elif page == "📈 VIX Ecosystem":
-    st.header("📈 VIX Ecosystem")
-    
-    if not data['vix_term_structure'].empty:
-        vix = data['vix_term_structure']
-        fig = px.line(vix, x='Tenor', y='Implied_Vol', markers=True)
-        fig.update_traces(line_color='#1E3A8A')
-        fig.update_layout(height=400, plot_bgcolor='white')
-        st.plotly_chart(fig, use_container_width=True)
+    elif page == "📊 Performance":
+        st.header("📊 Performance Attribution")
         
-        st.dataframe(vix, use_container_width=True, hide_index=True)
-
-elif page == "🔷 3D Vol Surface":
-    st.header("🔷 3D Volatility Surface")
-    
-    if not data['volatility_surface'].empty:
-        vol_surf = data['volatility_surface']
-        
-        # Create 3D surface
-        pivot = vol_surf.pivot(index='Strike', columns='Maturity_Days', values='Implied_Vol')
-        
-        fig = go.Figure(data=[go.Surface(
-            z=pivot.values,
-            x=pivot.columns,
-            y=pivot.index,
-            colorscale='Blues'
-        )])
-        
-        fig.update_layout(
-            title="3D Volatility Surface",
-            scene=dict(
-                xaxis_title='Maturity (Days)',
-                yaxis_title='Strike',
-                zaxis_title='Implied Vol'
-            ),
-            height=700
-        )
+        perf = data.series('performance_attribution_daily', *date_range)
+        if not perf.empty:
+            
+            fig = figures_cache.get(
+                page, 'perf_pnl', data.version('performance_attribution_daily'),
+                (date_range, charts.zoom_window('perf_pnl')),
+                lambda: charts.zoomable(figures.cumulative_pnl(charts.zoomed(perf, 'perf_pnl'))))
+            charts.show(fig, 'perf_pnl')
+            
+            window = st.slider("Rolling Window (days):", 5, 252, 30, key='perf_window')
+            rolling, period = performance_stats(window, *date_range)
+            
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("Total P&L", f"${perf['Cumulative_PnL'].iloc[-1]:,.0f}")
+            if period is not None:
+                # Statistics over the selected range, not averages of rolling values
+                total = period.loc[TOTAL]
+                with col2:
+                    st.metric("Sharpe", f"{total['Sharpe']:.2f}")
+                with col3:
+                    st.metric("Sortino", f"{total['Sortino']:.2f}")
+                with col4:
+                    st.metric("Win Rate", f"{total['Win_Rate']:.1%}")
+                
+                statistic = st.selectbox("Rolling Statistic:", list(rolling), key='perf_statistic')
+                fig = figures_cache.get(
+                    page, 'perf_rolling', data.version('performance_attribution_daily'),
+                    (date_range, window, statistic),
+                    lambda: figures.rolling_statistic(rolling[statistic], f"{window}D Rolling {statistic}"))
+                st.plotly_chart(fig, use_container_width=True)
+                
+                st.dataframe(period.round(3), use_container_width=True)
+            
+            st.subheader("Strategy Correlations")
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                weighting = st.radio("Weighting:", ["Rolling", "EWMA"], horizontal=True, key='corr_weighting')
+            with col2:
+                if weighting == "Rolling":
+                    corr_window = st.slider("Window (days):", 20, 252, 63, key='corr_window')
+                    halflife = None
+                else:
+                    halflife = st.slider("Half-life (days):", 5, 126, 21, key='corr_halflife')
+                    corr_window = None
+            with col3:
+                min_abs = st.slider("Show |corr| ≥", 0.0, 1.0, 0.0, 0.05, key='corr_min_abs')
+            matrix, network = strategy_correlations(corr_window, halflife, *date_range)
+            fig = figures_cache.get(
+                page, 'corr_network', data.version('performance_attribution_daily', 'correlation_network'),
+                (date_range, corr_window, halflife, min_abs),
+                lambda: figures.correlation_network(network, min_abs))
+            st.plotly_chart(fig, use_container_width=True)
+            if matrix is not None:
+                st.dataframe(matrix.round(3), use_container_width=True)
+            st.dataframe(network.round(3), use_container_width=True, hide_index=True)
+
+    elif page == "🌍 Global Markets":
+        st.header("🌍 Global Markets")
         
-        st.plotly_chart(fig, use_container_width=True)
-        st.info("💡 Drag to rotate, scroll to zoom")
+        global_data = data.series('global_equity_dislocations', *date_range)
+        if not global_data.empty:
+            
+            # 3D scatter plot
+            fig = figures_cache.get(
+                page, 'dislocations', data.version('global_equity_dislocations'), date_range,
+                lambda: figures.dislocation_scatter(global_data))
+            st.plotly_chart(fig, use_container_width=True)
+            
+            arb_opps = global_data[global_data['Arbitrage_Opportunity'] == 'Yes']
+            st.metric("Arbitrage Opportunities", len(arb_opps))
 
-# Continue with remaining pages...
-# (Adding more elif statements for each page)
+    elif page == "📈 VIX Ecosystem":
+        st.header("📈 VIX Ecosystem")
+        
+        curves = vix_term_structure()
+        if curves is not None and not curves.empty:
+            latest = curves.iloc[-1]
+            col1, col2, col3, col4, col5 = st.columns(5)
+            with col1:
+                st.metric("CM 30D", f"{latest['CM_30D']:.2f}")
+            with col2:
+                st.metric("Roll Yield 1M", f"{latest['Roll_Yield_1M_pct']:+.2f}%")
+            with col3:
+                st.metric("Slope 90D-30D", f"{latest['Slope']:+.2f}")
+            with col4:
+                st.metric("Regime", latest['Term_Structure_Regime'])
+            with col5:
+                st.metric("Mean Reversion", f"{latest['Mean_Reversion_Signal']:+.2f}σ")
+            
+            vix_curve_scrubber(curves.index[0].date(), curves.index[-1].date())
+            
+            fig = figures_cache.get(page, 'vix_roll_yield', data.version('vix_term_structure_forecast'), (),
+                                    lambda: figures.roll_yield_history(curves))
+            st.plotly_chart(fig, use_container_width=True)
+            st.markdown("---")
+        
+        if not data['vix_term_structure'].empty:
+            st.subheader("Implied Vol Term Structure")
+            vix = data['vix_term_structure']
+            fig = px.line(vix, x='Tenor', y='Implied_Vol', markers=True)
+            fig.update_traces(line_color='#1E3A8A')
+            fig.update_layout(height=400, plot_bgcolor='white')
+            st.plotly_chart(fig, use_container_width=True)
+            
+            st.dataframe(vix, use_container_width=True, hide_index=True)
 
-elif page == "💎 Variance Swaps":
-    st.header("💎 Variance Swaps")
-    
-    if not data['variance_swap_pricing'].empty:
-        var_swap = data['variance_swap_pricing']
+    elif page == "🔷 3D Vol Surface":
+        st.header("🔷 3D Volatility Surface")
         
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.metric("Avg Payoff", f"${var_swap['Payoff_USD'].mean():,.0f}")
-        with col2:
-            st.metric("Avg Vega", f"${var_swap['Vega_Notional'].mean():,.0f}")
-        with col3:
-            st.metric("Convexity", f"${var_swap['Convexity_Value'].mean():,.2f}")
-        
-        st.dataframe(var_swap[['Date', 'Var_Strike', 'Realized_Var', 'Payoff_USD']].head(20),
-                    use_container_width=True, hide_index=True)
-
-elif page == "💰 Dividends":
-    st.header("💰 Dividend Futures")
-    
-    if not data['dividend_futures_arbitrage'].empty:
-        div_fut = data['dividend_futures_arbitrage']
-        fig = px.bar(div_fut, x='Quarter', y='Arb_PnL_Per_1000',
-                    color_discrete_sequence=['#1E3A8A'])
-        fig.update_layout(height=400, plot_bgcolor='white')
-        st.plotly_chart(fig, use_container_width=True)
+        if not data['volatility_surface'].empty:
+            vol_surf = data['volatility_surface']
+            
+            # SVI fit rendered on a fixed-size grid, however many quotes there are
+            svi_params, grid = get_surface_fitter().fit(vol_surf)
+            
+            fig = figures_cache.get(page, 'surface', data.version('volatility_surface'), (),
+                                    lambda: figures.vol_surface(grid))
+            
+            st.plotly_chart(fig, use_container_width=True)
+            st.info("💡 Drag to rotate, scroll to zoom")
+            
+            st.subheader("SVI Slices")
+            st.dataframe(svi_params.round(4), use_container_width=True, hide_index=True)
+
+    # Continue with remaining pages...
+    # (Adding more elif statements for each page)
+
+    elif page == "💎 Variance Swaps":
+        st.header("💎 Variance Swaps")
         
-        st.dataframe(div_fut, use_container_width=True, hide_index=True)
-
-elif page == "🔮 Forecasting":
-    st.header("🔮 Volatility Forecasting")
-    
-    if not data['volatility_forecasting_models'].empty:
-        vol_forecast = data['volatility_forecasting_models']
-        
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(x=vol_forecast.index, y=vol_forecast['Realized_Vol_20D'],
-                                name='Realized', line=dict(color='#1E3A8A')))
-        fig.add_trace(go.Scatter(x=vol_forecast.index, y=vol_forecast['EWMA_Forecast'],
-                                name='EWMA', line=dict(color='#10B981', dash='dash')))
-        fig.add_trace(go.Scatter(x=vol_forecast.index, y=vol_forecast['GARCH_Forecast'],
-                                name='GARCH', line=dict(color='#F59E0B', dash='dot')))
-        fig.update_layout(height=400, plot_bgcolor='white')
-        st.plotly_chart(fig, use_container_width=True)
+        var_swap = data.series('variance_swap_pricing', *date_range)
+        if not var_swap.empty:
+            
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Avg Payoff", f"${var_swap['Payoff_USD'].mean():,.0f}")
+            with col2:
+                st.metric("Avg Vega", f"${var_swap['Vega_Notional'].mean():,.0f}")
+            with col3:
+                st.metric("Convexity", f"${var_swap['Convexity_Value'].mean():,.2f}")
+            
+            surface = data['volatility_surface']
+            table = var_swap.reset_index()[['Date', 'Var_Strike', 'Realized_Var', 'Payoff_USD']]
+            if not surface.empty:
+                days, strikes = compute_variance_strikes(var_swap[['ATM_IV']], surface)
+                tenor = st.selectbox("Swap Tenor (days):", [int(d) for d in days])
+                col = list(days).index(tenor)
+                
+                curves = charts.zoomed(pd.DataFrame({
+                    'Quoted': var_swap['Var_Strike'].to_numpy('float64'),
+                    'Replicated': strikes['Var_Strike'][:, col],
+                    'ATM': strikes['ATM_Vol'][:, col] ** 2,
+                }, index=var_swap.index), 'varswap_strikes')
+                fig = go.Figure()
+                fig.add_trace(charts.line(curves.index, curves['Quoted'],
+                                          name='Quoted Strike', line=dict(color='#1E3A8A')))
+                fig.add_trace(charts.line(curves.index, curves['Replicated'],
+                                          name='Replicated Strike', line=dict(color='#10B981', dash='dash')))
+                fig.add_trace(charts.line(curves.index, curves['ATM'],
+                                          name='ATM Vol²', line=dict(color='#F59E0B', dash='dot')))
+                fig.update_layout(height=400, plot_bgcolor='white', title="Fair Variance Strike (vol pts²)")
+                charts.show(charts.zoomable(fig), 'varswap_strikes')
+                
+                fig = go.Figure()
+                fig.add_trace(go.Bar(x=days, y=strikes['Fair_Vol'][-1], name='Fair Vol',
+                                    marker_color='#1E3A8A'))
+                fig.add_trace(go.Bar(x=days, y=strikes['ATM_Vol'][-1], name='ATM Vol',
+                                    marker_color='#93C5FD'))
+                fig.update_layout(height=350, plot_bgcolor='white', barmode='group',
+                                 title="Latest Strike Term Structure", xaxis_title="Maturity (days)")
+                st.plotly_chart(fig, use_container_width=True)
+                
+                table['Replicated_Strike'] = strikes['Var_Strike'][:, col]
+                table['Convexity_Adj'] = strikes['Convexity_Adj'][:, col]
+            
+            st.dataframe(table.head(20), use_container_width=True, hide_index=True)
 
-elif page == "📐 Factor Analysis":
-    st.header("📐 Factor Risk Attribution")
-    
-    if not data['barra_factors'].empty:
-        factors = data['barra_factors']
-        fig = px.bar(factors, x='Factor', y='Contribution_to_Risk',
-                    color_discrete_sequence=['#1E3A8A'])
-        fig.update_layout(height=400, plot_bgcolor='white')
-        st.plotly_chart(fig, use_container_width=True)
+    elif page == "💰 Dividends":
+        st.header("💰 Dividend Futures")
         
-        st.dataframe(factors, use_container_width=True, hide_index=True)
+        if not data['dividend_futures_arbitrage'].empty:
+            div_fut = data['dividend_futures_arbitrage']
+            fig = px.bar(div_fut, x='Quarter', y='Arb_PnL_Per_1000',
+                        color_discrete_sequence=['#1E3A8A'])
+            fig.update_layout(height=400, plot_bgcolor='white')
+            st.plotly_chart(fig, use_container_width=True)
+            
+            st.dataframe(div_fut, use_container_width=True, hide_index=True)
 
-elif page == "⚖️ Optimization":
-    st.header("⚖️ Portfolio Optimization")
-    
-    if not data['grinold_kahn_strategies'].empty:
-        gk = data['grinold_kahn_strategies']
-        fig = px.bar(gk, x='Strategy', y='Expected_IR',
-                    color_discrete_sequence=['#1E3A8A'])
-        fig.update_layout(height=400, plot_bgcolor='white')
-        st.plotly_chart(fig, use_container_width=True)
+    elif page == "🔮 Forecasting":
+        st.header("🔮 Volatility Forecasting")
         
-        st.dataframe(gk, use_container_width=True, hide_index=True)
-
-elif page == "🏪 ETF Flow":
-    st.header("🏪 ETF Microstructure")
-    
-    if not data['etf_arbitrage_microstructure'].empty:
-        etf = data['etf_arbitrage_microstructure'].tail(100)
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(x=etf.index, y=etf['Premium_Discount_bps'],
-                                line=dict(color='#1E3A8A')))
-        fig.update_layout(height=400, plot_bgcolor='white', title="Premium/Discount")
-        st.plotly_chart(fig, use_container_width=True)
+        vol_forecast, garch_params = volatility_forecasts()
+        if not vol_forecast.empty:
+            if garch_params is not None:
+                col1, col2, col3, col4 = st.columns(4)
+                col1.metric("GARCH α", f"{garch_params['Alpha']:.3f}")
+                col2.metric("GARCH β", f"{garch_params['Beta']:.3f}")
+                col3.metric("Persistence", f"{garch_params['Persistence']:.3f}")
+                col4.metric("Long-Run Vol", f"{garch_params['Long_Run_Vol']:.1%}")
+            
+            view = charts.zoomed(vol_forecast, 'forecast_vol')
+            fig = go.Figure()
+            for cone, shade in [('Vol_Cone_90pct', '#FEE2E2'), ('Vol_Cone_75pct', '#FEF3C7'),
+                                ('Vol_Cone_50pct', '#E5E7EB')]:
+                fig.add_trace(charts.line(view.index, view[cone],
+                                          name=cone.replace('Vol_Cone_', 'Cone ').replace('pct', '%'),
+                                          line=dict(color=shade, width=1)))
+            fig.add_trace(charts.line(view.index, view['Realized_Vol_20D'],
+                                      name='Realized', line=dict(color='#1E3A8A')))
+            fig.add_trace(charts.line(view.index, view['EWMA_Forecast'],
+                                      name='EWMA', line=dict(color='#10B981', dash='dash')))
+            fig.add_trace(charts.line(view.index, view['GARCH_Forecast'],
+                                      name='GARCH', line=dict(color='#F59E0B', dash='dot')))
+            fig.update_layout(height=400, plot_bgcolor='white')
+            charts.show(charts.zoomable(fig), 'forecast_vol')
 
-elif page == "🌊 Order Flow":
-    st.header("🌊 Order Flow Toxicity")
-    
-    if not data['order_flow_toxicity'].empty:
-        toxicity = data['order_flow_toxicity']
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(x=toxicity.index, y=toxicity['VPIN'],
-                                line=dict(color='#1E3A8A')))
-        fig.add_hline(y=0.55, line_dash="dash", line_color="red")
-        fig.update_layout(height=400, plot_bgcolor='white', title="VPIN")
-        st.plotly_chart(fig, use_container_width=True)
+    elif page == "📐 Factor Analysis":
+        st.header("📐 Factor Risk Attribution")
+        
+        if not data['barra_factors'].empty:
+            factors = data['barra_factors']
+            fig = px.bar(factors, x='Factor', y='Contribution_to_Risk',
+                        color_discrete_sequence=['#1E3A8A'])
+            fig.update_layout(height=400, plot_bgcolor='white')
+            st.plotly_chart(fig, use_container_width=True)
+            
+            st.dataframe(factors, use_container_width=True, hide_index=True)
 
-elif page == "🤖 ML Alpha":
-    st.header("🤖 ML Alpha Factors")
-    
-    if not data['ml_feature_importance'].empty:
-        ml_imp = data['ml_feature_importance']
-        fig = px.bar(ml_imp, x='Feature', y='Random_Forest_Importance',
-                    color_discrete_sequence=['#1E3A8A'])
-        fig.update_layout(height=400, plot_bgcolor='white')
-        fig.update_xaxes(tickangle=45)
-        st.plotly_chart(fig, use_container_width=True)
+    elif page == "⚖️ Optimization":
+        st.header("⚖️ Portfolio Optimization")
+        
+        inputs = optimizer_inputs()
+        if inputs is not None:
+            budget, ir, cov, exposure = inputs
+            factors = data['barra_factors']
+            book_exposure = factors.loc[factors['Factor'] == 'Volatility', 'Exposure']
+            default_cap = float(book_exposure.iloc[0]) if len(book_exposure) else float(exposure.max())
+            
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                objective = st.radio("Objective:", OBJECTIVES, horizontal=True, key='opt_objective')
+            with col2:
+                max_exposure = st.slider("Max Vol-Factor Exposure:", 0.0, float(np.ceil(exposure.max() * 4) / 4),
+                                         min(default_cap, float(exposure.max())), 0.05, key='opt_exposure')
+            with col3:
+                max_weight = st.slider("Max Weight per Strategy (%):", 100 // len(budget) + 1, 100, 100, 1,
+                                       key='opt_max_weight')
+            
+            weights, summary = get_risk_optimizer().solve(
+                budget['Strategy'], ir, cov, exposure, objective, max_exposure, max_weight / 100)
+            if summary['status'] == 'infeasible':
+                st.warning("⚠️ No long-only allocation meets these constraints; showing equal weights.")
+            
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("Portfolio IR", f"{summary['portfolio_ir']:.2f}")
+            with col2:
+                st.metric("Vol-Factor Exposure", f"{summary['vol_exposure']:.2f}")
+            with col3:
+                st.metric("Solve", "cached" if summary['cached'] else f"{summary['solve_ms']:.1f} ms")
+            with col4:
+                st.metric("Iterations", summary['iterations'],
+                          "warm start" if summary['warm_start'] else None, delta_color='off')
+            
+            current = budget['Risk_Budget_Pct'].to_numpy('float64')
+            chart = pd.DataFrame({
+                'Strategy': weights['Strategy'],
+                'Current Budget': current / current.sum() * 100,
+                'Optimal Weight': weights['Weight_Pct'],
+                'Risk Contribution': weights['Risk_Contribution_Pct'],
+            }).melt(id_vars='Strategy', var_name='Series', value_name='Pct')
+            fig = px.bar(chart, x='Strategy', y='Pct', color='Series', barmode='group',
+                         color_discrete_sequence=['#94A3B8', '#1E3A8A', '#10B981'])
+            fig.update_layout(height=400, plot_bgcolor='white', title=f"{objective} Allocation")
+            st.plotly_chart(fig, use_container_width=True)
+            st.dataframe(weights.round(3), use_container_width=True, hide_index=True)
+            st.markdown("---")
+        
+        if not data['grinold_kahn_strategies'].empty:
+            st.subheader("Fundamental Law Reference")
+            gk = data['grinold_kahn_strategies']
+            fig = px.bar(gk, x='Strategy', y='Expected_IR',
+                        color_discrete_sequence=['#1E3A8A'])
+            fig.update_layout(height=400, plot_bgcolor='white')
+            st.plotly_chart(fig, use_container_width=True)
+            
+            st.dataframe(gk, use_container_width=True, hide_index=True)
 
-elif page == "🎲 Greeks":
-    st.header("🎲 Dynamic Hedging & Greeks")
-    
-    if not data['option_greeks_dynamic_hedging'].empty:
-        greeks = data['option_greeks_dynamic_hedging'].tail(60)
+    elif page == "🏪 ETF Flow":
+        st.header("🏪 ETF Microstructure")
         
-        col1, col2 = st.columns(2)
-        with col1:
+        etf = data.series('etf_arbitrage_microstructure', *date_range)
+        if not etf.empty:
+            view = charts.zoomed(etf, 'etf_premium')
             fig = go.Figure()
-            fig.add_trace(go.Scatter(x=greeks.index, y=greeks['Total_Vega'],
-                                    line=dict(color='#1E3A8A')))
-            fig.update_layout(height=300, plot_bgcolor='white', title="Vega")
-            st.plotly_chart(fig, use_container_width=True)
+            # min/max keeps the premium spikes that arbitrage trades key off
+            fig.add_trace(charts.line(view.index, view['Premium_Discount_bps'], method='minmax',
+                                      line=dict(color='#1E3A8A')))
+            fig.update_layout(height=400, plot_bgcolor='white', title="Premium/Discount")
+            charts.show(charts.zoomable(fig), 'etf_premium')
         
-        with col2:
+        composition = data['etf_basket_composition']
+        ticks = data['etf_constituent_ticks']
+        if not composition.empty and not ticks.empty:
+            st.subheader("Intraday NAV from Basket")
+            nav = compute_etf_nav(composition, ticks)
+            last = nav.iloc[-1]
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("NAV", f"${last['NAV']:.2f}")
+            col2.metric("Premium (5m avg)", f"{last['Premium_Mean_bps']:.2f} bps",
+                       f"σ {last['Premium_Std_bps']:.2f}")
+            col3.metric("Spread (5m avg)", f"{last['Spread_Mean_bps']:.2f} bps")
+            col4.metric("Net Flow (5m)", f"{last['Net_Flow_Sum']:+.0f} units")
+            
+            view = charts.zoomed(nav, 'etf_nav')
+            fig = go.Figure()
+            fig.add_trace(charts.line(view.index, view['Premium_bps'], method='minmax', name='Premium',
+                                      line=dict(color='#93C5FD', width=1)))
+            fig.add_trace(charts.line(view.index, view['Premium_Mean_bps'], name='5m Mean',
+                                      line=dict(color='#1E3A8A')))
+            for sign in (1, -1):
+                fig.add_trace(charts.line(view.index, view['Premium_Mean_bps'] + sign * 2 * view['Premium_Std_bps'],
+                                          name='±2σ', showlegend=sign == 1,
+                                          line=dict(color='#F59E0B', dash='dot')))
+            fig.update_layout(height=400, plot_bgcolor='white', title="Premium vs Basket NAV (bps)")
+            charts.show(charts.zoomable(fig), 'etf_nav')
+
+    elif page == "🌊 Order Flow":
+        st.header("🌊 Order Flow Toxicity")
+        
+        toxicity = data.series('order_flow_toxicity', *date_range)
+        if not toxicity.empty:
+            # Regimes follow the VPIN engine's thresholds rather than the stored labels
+            regime = toxicity_regime(toxicity['VPIN']).to_numpy()
+            regime_colors = {'Low': '#10B981', 'Normal': '#F59E0B', 'High': '#EF4444'}
+            
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Latest VPIN", f"{toxicity['VPIN'].iloc[-1]:.3f}", str(regime[-1]))
+            col2.metric("High-Toxicity Days", f"{(regime == 'High').sum()}")
+            col3.metric("Avg Imbalance", f"{toxicity['Volume_Imbalance'].mean():+.2f}%")
+            
+            view = charts.zoomed(toxicity.assign(Regime=regime), 'order_flow_vpin')
             fig = go.Figure()
-            fig.add_trace(go.Scatter(x=greeks.index, y=greeks['Total_PnL'],
-                                    line=dict(color='#10B981')))
-            fig.update_layout(height=300, plot_bgcolor='white', title="P&L")
+            fig.add_trace(charts.line(view.index, view['VPIN'], mode='lines+markers',
+                                      line=dict(color='#1E3A8A'), name='VPIN', marker=dict(size=5),
+                                      marker_color=[regime_colors.get(r, '#9CA3AF') for r in view['Regime']]))
+            for threshold in TOXICITY_BINS:
+                fig.add_hline(y=threshold, line_dash="dash",
+                             line_color="red" if threshold == HIGH_TOXICITY else "orange")
+            fig.update_layout(height=400, plot_bgcolor='white', title="VPIN")
+            charts.show(charts.zoomable(fig), 'order_flow_vpin')
+
+    elif page == "🤖 ML Alpha":
+        st.header("🤖 ML Alpha Factors")
+
+        factors = data['alpha_factors_ml']
+        if not factors.empty:
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                model = st.radio("Model:", list(MODELS), horizontal=True, key='ml_model')
+            with col2:
+                splits = st.slider("Walk-Forward Folds:", 3, 10, 5, key='ml_splits')
+            if model == 'Ridge':
+                with col3:
+                    params = {'alpha': st.select_slider("Ridge Alpha:", [0.01, 0.1, 1.0, 10.0, 100.0], 1.0,
+                                                        key='ml_alpha')}
+            else:
+                with col3:
+                    depth = st.slider("Tree Depth:", 1, 6, 3, key='ml_depth')
+                with col4:
+                    trees = st.slider("Trees:", 50, 500, 200, 50, key='ml_trees')
+                params = {'max_depth': depth, 'n_estimators': trees}
+
+            status, result = get_ml_trainer().request(factors, model, params, splits)
+            if status == TRAINING:
+                await_training(factors, model, params, splits)
+            elif status == FAILED:
+                st.error(f"⚠️ Training failed: {result} (retried on the next run after a minute)")
+            else:
+                col1, col2, col3, col4 = st.columns(4)
+                with col1:
+                    st.metric("Out-of-Sample RMSE", f"{result['oos_rmse']:.4f}")
+                with col2:
+                    st.metric("Persistence RMSE", f"{result['folds']['Naive_RMSE'].mean():.4f}")
+                with col3:
+                    st.metric("Out-of-Sample IC", f"{result['oos_ic']:.2f}")
+                with col4:
+                    st.metric("Next-Day Vol Forecast", f"{result['forecast']:.3f}",
+                              f"trained in {result['train_seconds']:.1f}s", delta_color='off')
+
+                run = (model, tuple(sorted(params.items())), splits)
+                fig = figures_cache.get(
+                    page, 'ml_predictions', data.version('alpha_factors_ml'), run,
+                    lambda: figures.vol_predictions(result['predictions'], f"{model}: Next-Day Vol"))
+                st.plotly_chart(fig, use_container_width=True)
+                fig = figures_cache.get(
+                    page, 'ml_importance', data.version('alpha_factors_ml'), run,
+                    lambda: figures.permutation_importance(result['importance'], "Permutation Importance"))
+                st.plotly_chart(fig, use_container_width=True)
+                st.dataframe(result['folds'].round(4), use_container_width=True, hide_index=True)
+            st.markdown("---")
+
+        if not data['ml_feature_importance'].empty:
+            st.subheader("Reference Importance")
+            ml_imp = data['ml_feature_importance']
+            fig = px.bar(ml_imp, x='Feature', y='Random_Forest_Importance',
+                        color_discrete_sequence=['#1E3A8A'])
+            fig.update_layout(height=400, plot_bgcolor='white')
+            fig.update_xaxes(tickangle=45)
             st.plotly_chart(fig, use_container_width=True)
 
-elif page == "📅 Economic Calendar":
-    st.header("📅 Economic Calendar")
-    
-    if not data['economic_calendar'].empty:
-        calendar = data['economic_calendar']
-        st.dataframe(calendar[['Event_Date', 'Event_Name', 'Priority', 
-                              'Days_Until', 'Avg_VIX_Move_Historical']],
-                    use_container_width=True, hide_index=True)
-
-elif page == "🎨 3D Analytics":
-    st.header("🎨 Advanced 3D Analytics")
-    st.markdown("*Showcase of advanced 3D visualizations*")
-    
-    st.subheader("Portfolio Greeks 3D Trajectory")
-    if not data['option_greeks_dynamic_hedging'].empty:
-        greeks = data['option_greeks_dynamic_hedging'].tail(100)
-        
-        fig = go.Figure()
-        fig.add_trace(go.Scatter3d(
-            x=greeks.index,
-            y=greeks['Total_Vega'],
-            z=greeks['Total_Gamma'],
-            mode='lines+markers',
-            marker=dict(size=3, color='#1E3A8A')
-        ))
-        
-        fig.update_layout(
-            scene=dict(
-                xaxis_title='Time',
-                yaxis_title='Vega',
-                zaxis_title='Gamma'
-            ),
-            height=700
-        )
-        st.plotly_chart(fig, use_container_width=True)
+    elif page == "🎲 Greeks":
+        st.header("🎲 Dynamic Hedging & Greeks")
+        
+        book, priced = portfolio_greeks()
+        if priced:
+            st.subheader("Live Book")
+            col1, col2, col3, col4, col5 = st.columns(5)
+            with col1:
+                st.metric("Delta", f"{book['Delta'].sum():,.0f}")
+            with col2:
+                st.metric("Gamma", f"{book['Gamma'].sum():,.2f}")
+            with col3:
+                st.metric("Vega", f"${book['Vega'].sum():,.0f}")
+            with col4:
+                st.metric("Theta", f"${book['Theta'].sum():,.0f}")
+            with col5:
+                st.metric("Hedge Units", f"{book['Hedge_Shares_Needed'].sum():,.0f}")
+            st.dataframe(book.round(2), use_container_width=True, hide_index=True)
+            st.markdown("---")
+        
+        greeks = data.series('option_greeks_dynamic_hedging', *date_range)
+        if not greeks.empty:
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                fig = figures_cache.get(
+                    page, 'greeks_vega', data.version('option_greeks_dynamic_hedging'),
+                    (date_range, charts.zoom_window('greeks_vega')),
+                    lambda: charts.zoomable(figures.series_line(charts.zoomed(greeks, 'greeks_vega'), 'Total_Vega',
+                                                               '#1E3A8A', "Vega")))
+                charts.show(fig, 'greeks_vega')
+            
+            with col2:
+                fig = figures_cache.get(
+                    page, 'greeks_pnl', data.version('option_greeks_dynamic_hedging'),
+                    (date_range, charts.zoom_window('greeks_pnl')),
+                    lambda: charts.zoomable(figures.series_line(charts.zoomed(greeks, 'greeks_pnl'), 'Total_PnL',
+                                                               '#10B981', "P&L")))
+                charts.show(fig, 'greeks_pnl')
+
+    elif page == "📅 Economic Calendar":
+        st.header("📅 Economic Calendar")
+        
+        if not data['economic_calendar'].empty:
+            calendar = data['economic_calendar']
+            st.dataframe(calendar[['Event_Date', 'Event_Name', 'Priority', 
+                                  'Days_Until', 'Avg_VIX_Move_Historical']],
+                        use_container_width=True, hide_index=True)
+
+    elif page == "🎨 3D Analytics":
+        st.header("🎨 Advanced 3D Analytics")
+        st.markdown("*Showcase of advanced 3D visualizations*")
+        
+        st.subheader("Portfolio Greeks 3D Trajectory")
+        greeks = data.series('option_greeks_dynamic_hedging', *date_range)
+        if not greeks.empty:
+            
+            fig = figures_cache.get(
+                page, 'greeks_trajectory', data.version('option_greeks_dynamic_hedging'), date_range,
+                lambda: figures.greeks_trajectory(greeks))
+            st.plotly_chart(fig, use_container_width=True)
+
+    profiler.end()
+finally:
+    profiler.finish()
+
+# ==========================================
+# PROFILING PANEL
+# ==========================================
+
+with st.sidebar.expander("🛠️ Profiling", expanded=st.session_state['profiling']):
+    st.checkbox("Profile reruns", key='profiling')
+    st.checkbox("Save cProfile dump", key='profiling_cprofile', disabled=not st.session_state['profiling'])
+    if profiler.spans:
+        record = profiler.record()
+        col1, col2 = st.columns(2)
+        col1.metric("Rerun", f"{record['total_ms']:,.0f} ms")
+        col2.metric("Peak Memory (run)", f"{record['peak_mb']:,.1f} MB")
+        st.bar_chart(profiler.breakdown(), horizontal=True, height=160)
+        spans = profiler.table()
+        st.dataframe(spans.round(2), use_container_width=True, hide_index=True)
+        if profiler.dump_path:
+            st.caption(f"cProfile: `{profiler.dump_path}`")
+            st.code(profiler.top_functions, language=None)
 
 # ==========================================
 # FOOTER
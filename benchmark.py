@@ -0,0 +1,351 @@
+"""Headless per-page render benchmark on synthetic, scaled-up data.
+
+Every sidebar page of ``app.py`` is rendered with Streamlit's ``AppTest``
+against a synthetic copy of the data directory in which each time-indexed
+CSV holds ``scale`` times its rows: the file is repeated back in time, one
+period per copy, with 1% multiplicative noise on float columns so no two
+copies are identical.  Reference tables (rules, positions, scenarios, a
+one-row snapshot) describe the book rather than its history and keep their
+size.
+
+Each page is timed twice per scale:
+
+- ``cold``: the first render after a server start; in-memory caches
+  (``st.cache_data``/``st.cache_resource``) are cleared, while the on-disk
+  Feather/Parquet copies have been built by a warm-up pass
+- ``warm``: the same page rendered again
+
+Time is split by instrumenting the app's collaborators in process: reads
+through ``DataStore``/``TimeSeriesStore`` count as ``load``, building
+Plotly figures and handing them to ``st.plotly_chart`` as ``figure``, and
+the rest of the script run as ``transform``.  Peak memory is the
+``tracemalloc`` peak of a separate cold render, so tracing does not slow
+the timed runs; memory-mapped Feather reads and other allocations made by
+pyarrow itself are not traced.
+
+The JSON report can be compared with an earlier one::
+
+    python benchmark.py --scales 1 10 100 1000 --out bench_report.json
+    python benchmark.py --compare base.json bench_report.json
+"""
+
+import argparse
+import contextlib
+import functools
+import json
+import logging
+import os
+import platform
+import shutil
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import plotly
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+from streamlit.elements.plotly_chart import PlotlyMixin
+from streamlit.testing.v1 import AppTest
+
+import charts
+import figures
+from data_store import TABLES, DataStore
+from schemas import SCHEMAS
+from timeseries_store import TimeSeriesStore
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+PAGE_RADIO = "Select Analysis"
+DEFAULT_SCALES = [1, 10, 100, 1000]
+DEFAULT_TIMEOUT = 600
+NOISE = 0.01
+REGRESSION_RATIO = 1.25
+REGRESSION_FLOOR_MS = 20.0
+
+PHASES = ['load', 'figure']
+LOAD_CALLS = [(DataStore, '__getitem__'), (DataStore, 'signature'),
+              (TimeSeriesStore, 'query'), (TimeSeriesStore, 'bounds')]
+FIGURE_METHODS = ['__init__', 'add_trace', 'add_traces', 'update_layout', 'update_traces',
+                  'update_xaxes', 'update_yaxes', 'add_hline', 'add_vline', 'add_hrect',
+                  'add_vrect', 'add_shape', 'add_annotation']
+PX_FUNCTIONS = ['line', 'bar', 'scatter', 'area', 'histogram', 'imshow']
+
+
+# ==========================================
+# SYNTHETIC DATA
+# ==========================================
+
+def time_column(name, frame):
+    """The column a table is ordered by in time, or None for reference tables."""
+    for col in (SCHEMAS.get(name, {}).get('index'), 'Date', 'Timestamp'):
+        if col and col in frame and frame[col].nunique() > 1:
+            return col
+    return None
+
+
+def scale_table(name, frame, scale, rng):
+    """``frame`` repeated ``scale`` times back in time; the last copy is the original."""
+    col = time_column(name, frame)
+    if col is None or scale == 1:
+        return frame
+    stamps = pd.to_datetime(frame[col])
+    step = stamps.sort_values().diff().median()
+    if pd.isna(step) or step <= pd.Timedelta(0):
+        step = pd.Timedelta(days=1)
+    period = stamps.max() - stamps.min() + step
+
+    shifted = [c for c in dict.fromkeys([col] + SCHEMAS.get(name, {}).get('dates', [])) if c in frame]
+    stamps = {c: pd.to_datetime(frame[c], errors='coerce') for c in shifted}
+    copies = []
+    for back in range(scale - 1, -1, -1):
+        copies.append(frame.assign(**{c: stamps[c] - back * period for c in shifted}))
+    scaled = pd.concat(copies, ignore_index=True)
+
+    floats = scaled.select_dtypes('float').columns
+    synthetic = len(frame) * (scale - 1)
+    noise = 1 + NOISE * rng.standard_normal((synthetic, len(floats)))
+    scaled.loc[:synthetic - 1, floats] = scaled.loc[:synthetic - 1, floats].to_numpy() * noise
+    return scaled
+
+
+def build_dataset(target, scale, source=APP_DIR, seed=0):
+    """Write ``app.py`` and every table at ``scale`` into ``target``; returns row counts."""
+    os.makedirs(target, exist_ok=True)
+    shutil.copy(os.path.join(source, 'app.py'), target)
+    rng = np.random.default_rng(seed)
+    rows = {}
+    for name in TABLES:
+        path = os.path.join(source, f'{name}.csv')
+        if not os.path.exists(path):
+            continue
+        frame = scale_table(name, pd.read_csv(path), scale, rng)
+        frame.to_csv(os.path.join(target, f'{name}.csv'), index=False)
+        rows[name] = len(frame)
+    return rows
+
+
+# ==========================================
+# INSTRUMENTATION
+# ==========================================
+
+class PhaseTimer:
+    """Wall time spent in instrumented calls, by phase.
+
+    Only the outermost instrumented call is timed, so a figure built from
+    other figure calls (``px.line`` creating a ``go.Figure``) counts once.
+    """
+
+    def __init__(self):
+        self.totals = dict.fromkeys(PHASES, 0.0)
+        self._depth = 0
+
+    def reset(self):
+        self.totals = dict.fromkeys(PHASES, 0.0)
+
+    def wrap(self, phase, fn):
+        @functools.wraps(fn)
+        def timed(*args, **kwargs):
+            if self._depth:
+                return fn(*args, **kwargs)
+            self._depth += 1
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.totals[phase] += time.perf_counter() - start
+                self._depth -= 1
+        return timed
+
+
+def _targets():
+    yield from (('load', owner, attr) for owner, attr in LOAD_CALLS)
+    yield from (('figure', go.Figure, attr) for attr in FIGURE_METHODS if hasattr(go.Figure, attr))
+    yield from (('figure', px, attr) for attr in PX_FUNCTIONS if hasattr(px, attr))
+    yield 'figure', charts, 'line'
+    yield from (('figure', figures, attr) for attr in dir(figures)
+                if not attr.startswith('_') and getattr(getattr(figures, attr), '__module__', None) == 'figures')
+    # ``st.plotly_chart`` is bound to the main container at import time
+    yield 'figure', PlotlyMixin, 'plotly_chart'
+    yield 'figure', st, 'plotly_chart'
+
+
+@contextlib.contextmanager
+def instrumented(timer):
+    """Patch the load and figure entry points with ``timer`` for the block."""
+    saved = []
+    try:
+        for phase, owner, attr in _targets():
+            original = getattr(owner, attr)
+            saved.append((owner, attr, original))
+            setattr(owner, attr, timer.wrap(phase, original))
+        yield timer
+    finally:
+        for owner, attr, original in reversed(saved):
+            setattr(owner, attr, original)
+
+
+# ==========================================
+# PAGE RUNS
+# ==========================================
+
+def _clear_caches():
+    st.cache_data.clear()
+    st.cache_resource.clear()
+
+
+def _select(at, page):
+    radio = next(r for r in at.sidebar.radio if r.label.startswith(PAGE_RADIO))
+    radio.set_value(page)
+
+
+def _timed_run(at, timer):
+    timer.reset()
+    start = time.perf_counter()
+    at.run()
+    total = time.perf_counter() - start
+    load, figure = timer.totals['load'], timer.totals['figure']
+    return {'total_ms': total * 1e3, 'load_ms': load * 1e3, 'figure_ms': figure * 1e3,
+            'transform_ms': max(total - load - figure, 0.0) * 1e3}
+
+
+def bench_page(at, page, timer, memory=True):
+    """Cold and warm timings, and the cold peak memory, of one page."""
+    _select(at, page)
+    _clear_caches()
+    cold = _timed_run(at, timer)
+    errors = [e.message.splitlines()[0] for e in at.exception] + [e.body for e in at.error]
+    warm = _timed_run(at, timer)
+    result = {'page': page, 'cold': cold, 'warm': warm, 'errors': errors}
+    if memory:
+        _clear_caches()
+        tracemalloc.start()
+        try:
+            at.run()
+            result['peak_mb'] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def bench_scale(scale, pages=None, memory=True, timeout=DEFAULT_TIMEOUT, workdir=None):
+    """Benchmark every page (or those whose name contains one of ``pages``) at ``scale``."""
+    target = os.path.join(workdir or tempfile.mkdtemp(prefix='bench_'), f'x{scale}')
+    rows = build_dataset(target, scale)
+    at = AppTest.from_file(os.path.join(target, 'app.py'), default_timeout=timeout)
+    at.run()
+    options = next(r for r in at.sidebar.radio if r.label.startswith(PAGE_RADIO)).options
+    selected = [p for p in options if not pages or any(s in p for s in pages)]
+
+    # Warm-up pass: builds the on-disk columnar copies once per dataset
+    for page in selected:
+        _select(at, page)
+        at.run()
+
+    results = []
+    with instrumented(PhaseTimer()) as timer:
+        for page in selected:
+            result = bench_page(at, page, timer, memory=memory)
+            result['scale'] = scale
+            results.append(result)
+            logging.getLogger(__name__).info("x%-5d %-24s cold %8.0f ms  warm %8.0f ms",
+                                             scale, page, result['cold']['total_ms'],
+                                             result['warm']['total_ms'])
+    _clear_caches()
+    if workdir is None:
+        shutil.rmtree(os.path.dirname(target), ignore_errors=True)
+    return {'scale': scale, 'rows': rows, 'pages': results}
+
+
+def run(scales=DEFAULT_SCALES, pages=None, memory=True, timeout=DEFAULT_TIMEOUT, workdir=None):
+    """Full report: environment metadata plus one entry per scale."""
+    return {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'commit': _commit(),
+        'environment': {'python': platform.python_version(), 'pandas': pd.__version__,
+                        'numpy': np.__version__, 'plotly': plotly.__version__,
+                        'streamlit': st.__version__, 'machine': platform.machine()},
+        'scales': [bench_scale(s, pages, memory, timeout, workdir) for s in scales],
+    }
+
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=APP_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# ==========================================
+# REPORTS
+# ==========================================
+
+def flatten(report):
+    """One row per (scale, page) with every timing as a column."""
+    rows = []
+    for entry in report['scales']:
+        for result in entry['pages']:
+            row = {'Scale': result['scale'], 'Page': result['page']}
+            for run_kind in ('cold', 'warm'):
+                for key, value in result[run_kind].items():
+                    row[f'{run_kind}_{key}'] = value
+            row['peak_mb'] = result.get('peak_mb', np.nan)
+            row['errors'] = len(result['errors'])
+            rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def compare(base, new, ratio=REGRESSION_RATIO, floor_ms=REGRESSION_FLOOR_MS):
+    """Per-page changes between two reports, with regressions flagged.
+
+    A page regresses when its cold or warm total grew by more than ``ratio``
+    and by more than ``floor_ms``, so noise on fast pages is not reported.
+    """
+    keys = ['Scale', 'Page']
+    merged = flatten(base).merge(flatten(new), on=keys, suffixes=('_base', '_new'))
+    table = merged[keys].copy()
+    regressed = np.zeros(len(merged), dtype=bool)
+    for column in ('cold_total_ms', 'warm_total_ms', 'peak_mb'):
+        before, after = merged[f'{column}_base'], merged[f'{column}_new']
+        table[f'{column}_base'] = before
+        table[f'{column}_new'] = after
+        table[f'{column}_ratio'] = after / before
+        if column.endswith('_ms'):
+            regressed |= ((after > before * ratio) & (after - before > floor_ms)).to_numpy()
+    table['Regressed'] = regressed
+    return table
+
+
+if __name__ == '__main__':
+    import sys
+
+    parser = argparse.ArgumentParser(description="Headless per-page render benchmark.")
+    parser.add_argument('--scales', type=int, nargs='+', default=DEFAULT_SCALES)
+    parser.add_argument('--pages', nargs='+', help="only pages whose name contains one of these")
+    parser.add_argument('--out', default='bench_report.json')
+    parser.add_argument('--no-memory', action='store_true', help="skip the tracemalloc pass")
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT)
+    parser.add_argument('--workdir', help="keep the synthetic datasets here")
+    parser.add_argument('--compare', nargs=2, metavar=('BASE', 'NEW'))
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as fh_base, open(args.compare[1]) as fh_new:
+            table = compare(json.load(fh_base), json.load(fh_new))
+        print(table.to_string(index=False, float_format='%.2f'))
+        sys.exit(1 if table['Regressed'].any() else 0)
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    for noisy in ('streamlit', 'data_store', 'timeseries_store'):
+        logging.getLogger(noisy).setLevel(logging.ERROR)
+    report = run(args.scales, args.pages, not args.no_memory, args.timeout, args.workdir)
+    with open(args.out, 'w') as fh:
+        json.dump(report, fh, indent=1)
+    summary = flatten(report)[['Scale', 'Page', 'cold_total_ms', 'cold_load_ms', 'cold_transform_ms',
+                               'cold_figure_ms', 'warm_total_ms', 'peak_mb', 'errors']]
+    print(summary.to_string(index=False, float_format='%.1f'))
+    print(f"report -> {args.out}")
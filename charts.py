@@ -0,0 +1,205 @@
+"""Shared plotting layer for the long time-series charts.
+
+Traces are reduced to a pixel budget before Plotly serializes them, so a
+chart costs the same JSON whether the window holds a hundred rows or years of
+intraday history:
+
+- ``lttb`` (largest-triangle-three-buckets) keeps the visual shape of smooth
+  series with one point per bucket
+- ``minmax`` keeps each bucket's extremes, for spiky series where a missed
+  peak matters more than the shape
+
+Series that are still dense after downsampling are drawn with ``Scattergl``.
+
+``FigureCache`` keeps built figures keyed by page, figure, table versions
+and parameters, so a rerun that changes none of them reuses the figure
+instead of rebuilding it.
+
+Charts shown with ``show`` can be zoomed by box-selecting a range: the
+selection is stored per chart key, ``zoomed`` clips the page's
+full-resolution frame to it on the rerun, and the traces are downsampled
+again over the narrower range, so zooming in brings back the detail.
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+PIXEL_BUDGET = 1500
+WEBGL_THRESHOLD = 1000
+FIGURE_CACHE_ENTRIES = 64
+
+
+# ==========================================
+# DOWNSAMPLING
+# ==========================================
+
+def _numeric(x):
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        x = x.astype('datetime64[ns]').astype('int64')
+    x = x.astype('float64')
+    return x - x[0] if len(x) else x
+
+
+def lttb(x, y, threshold):
+    """Indices of the ``threshold`` points LTTB keeps (first and last included)."""
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = _numeric(x)
+    y = np.asarray(y, dtype='float64')
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    keep = np.empty(threshold, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    anchor = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # The next bucket's centroid (the last point for the final bucket)
+        nxt = slice(edges[i + 1], edges[i + 2] if i + 2 < len(edges) else n)
+        cx, cy = x[nxt].mean(), y[nxt].mean()
+        area = np.abs((x[anchor] - cx) * (y[lo:hi] - y[anchor])
+                      - (x[anchor] - x[lo:hi]) * (cy - y[anchor]))
+        anchor = lo + int(area.argmax())
+        keep[i + 1] = anchor
+    return keep
+
+
+def minmax(x, y, threshold):
+    """Indices of each bucket's minimum and maximum, in order."""
+    n = len(y)
+    if threshold >= n or threshold < 4:
+        return np.arange(n)
+    y = np.asarray(y, dtype='float64')
+    bucket = np.arange(n) * (threshold // 2) // n
+    order = np.lexsort((y, bucket))
+    starts = np.flatnonzero(np.r_[True, np.diff(bucket[order]) != 0])
+    ends = np.r_[starts[1:], n] - 1
+    return np.unique(np.concatenate([order[starts], order[ends], [0, n - 1]]))
+
+
+DOWNSAMPLERS = {'lttb': lttb, 'minmax': minmax}
+
+
+def downsample(x, y, budget=PIXEL_BUDGET, method='lttb'):
+    """Indices into ``x``/``y`` to plot, NaNs dropped."""
+    valid = np.flatnonzero(~pd.isna(np.asarray(y, dtype='float64')))
+    if len(valid) <= budget:
+        return valid
+    x, y = np.asarray(x)[valid], np.asarray(y, dtype='float64')[valid]
+    return valid[DOWNSAMPLERS[method](x, y, budget)]
+
+
+def line(x, y, budget=PIXEL_BUDGET, method='lttb', **kwargs):
+    """A downsampled line trace; ``Scattergl`` if it stays dense.
+
+    Keyword arguments are passed to the trace; array-valued ones as long as
+    ``y`` (per-point colors, hover text) are downsampled with it.
+    """
+    n = len(y)
+    keep = downsample(x, y, budget, method)
+    for name, value in kwargs.items():
+        if not isinstance(value, (str, dict)) and np.ndim(value) == 1 and len(value) == n:
+            kwargs[name] = np.asarray(value)[keep]
+    trace = go.Scattergl if len(keep) > WEBGL_THRESHOLD else go.Scatter
+    return trace(x=np.asarray(x)[keep], y=np.asarray(y)[keep], **kwargs)
+
+
+# ==========================================
+# ZOOM
+# ==========================================
+
+def zoom_window(key):
+    """The x-range box-selected on chart ``key``, or None when not zoomed."""
+    event = st.session_state.get(key)
+    boxes = (event or {}).get('selection', {}).get('box', [])
+    if boxes:
+        box = tuple(boxes[0].get('x', ()))
+        # A selection is consumed once, so "Reset zoom" is not undone by it
+        if len(box) == 2 and box != st.session_state.get(f'{key}_box'):
+            st.session_state[f'{key}_box'] = box
+            st.session_state[f'{key}_zoom'] = tuple(sorted(box))
+    return st.session_state.get(f'{key}_zoom')
+
+
+def zoomed(frame, key):
+    """Rows of a time-indexed ``frame`` inside chart ``key``'s zoom window."""
+    window = zoom_window(key)
+    if window is None or frame.empty:
+        return frame
+    lo, hi = window
+    if isinstance(frame.index, pd.DatetimeIndex):
+        lo, hi = pd.Timestamp(lo), pd.Timestamp(hi)
+    clipped = frame.loc[lo:hi]
+    return clipped if len(clipped) >= 2 else frame
+
+
+def _reset_zoom(key):
+    st.session_state.pop(f'{key}_zoom', None)
+
+
+def zoomable(fig):
+    """Set box-select dragging on a figure being built for ``show``; returns it."""
+    return fig.update_layout(dragmode='select')
+
+
+def show(fig, key):
+    """Render a zoomable chart: box-select a range to zoom, reset with the button.
+
+    Build ``fig`` with ``zoomable``: figures can come from the shared
+    ``FigureCache`` and are never modified here, so one that is not
+    zoomable is drawn from a copy.
+    """
+    if fig.layout.dragmode != 'select':
+        fig = zoomable(go.Figure(fig))
+    st.plotly_chart(fig, use_container_width=True, key=key, on_select='rerun', selection_mode='box')
+    if st.session_state.get(f'{key}_zoom') is not None:
+        st.button("Reset zoom", key=f'{key}_reset', on_click=_reset_zoom, args=(key,))
+
+
+# ==========================================
+# FIGURE CACHE
+# ==========================================
+
+class FigureCache:
+    """Bounded LRU of built figures, shared by every session.
+
+    Entries are keyed by ``(page, name, version, params)``: ``version`` is
+    the signature of the tables the figure reads, so editing a CSV retires
+    its figures, and ``params`` holds every widget value the figure depends
+    on.  Figures are kept as ``go.Figure`` objects rather than JSON strings:
+    Streamlit serializes a figure object without re-validating it, which is
+    far cheaper than rebuilding one from JSON.  The price is that a hit is
+    the same object every session gets, so callers must never modify it:
+    anything per-chart (e.g. ``zoomable``) is applied inside ``build``.
+    """
+
+    def __init__(self, entries=FIGURE_CACHE_ENTRIES):
+        self.entries = entries
+        self.hits = 0
+        self.misses = 0
+        self._figures = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, page, name, version, params, build):
+        """The cached figure for the key, calling ``build()`` only on a miss."""
+        key = (page, name, version, params)
+        with self._lock:
+            if key in self._figures:
+                self._figures.move_to_end(key)
+                self.hits += 1
+                return self._figures[key]
+        fig = build()
+        with self._lock:
+            self.misses += 1
+            self._figures[key] = fig
+            while len(self._figures) > self.entries:
+                self._figures.popitem(last=False)
+        return fig
+
+    def __len__(self):
+        return len(self._figures)
@@ -0,0 +1,247 @@
+"""Strategy correlation matrices from daily P&L, rolling or EWMA.
+
+Every statistic is kept as an ``N x N`` matrix of pairwise-complete,
+weighted sums, so strategies with different start dates or missing days are
+correlated only over the days both traded.  With ``x`` the day's P&L (0
+where missing), ``v`` its 0/1 validity and ``w`` the day's weight::
+
+    C   += w * v v'        days both observed
+    Sx  += w * x v'        sum of x_i over those days
+    Sxx += w * x^2 v'      sum of x_i^2 over those days
+    P   += w * x x'        cross products
+
+    corr_ij = (C P - Sx_ij Sx_ji) / sqrt((C Sxx_ij - Sx_ij^2) (C Sxx_ji - Sx_ji^2))
+
+A rolling window gives weight 1 to its last ``window`` days; EWMA gives
+``lam ** age``.  ``CorrelationEngine`` holds the sums for the latest day
+and moves them forward one day at a time in O(N^2): a rolling window adds
+the new day's outer products and subtracts the day leaving it, EWMA decays
+the sums and adds the new day.  A matrix as of an earlier date is computed
+directly from the rows that carry weight, as four ``(days x N)`` matrix
+products.
+
+``pairs`` flattens a matrix into the ``correlation_network.csv`` layout and
+classifies ``Relationship`` and ``Diversification_Benefit`` by threshold.
+"""
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_WINDOW = 63
+DEFAULT_HALFLIFE = 21
+MIN_OBSERVATIONS = 10
+EWMA_CUTOFF = 1e-6
+RESYNC_EVERY = 252
+
+RELATIONSHIP_LEVELS = ['Negative', 'Neutral', 'Positive']
+RELATIONSHIP_BINS = [-0.1, 0.3]
+DIVERSIFICATION_LEVELS = ['High', 'Medium', 'Low']
+DIVERSIFICATION_BINS = [0.3, 0.6]
+
+
+def halflife_lambda(halflife):
+    return 0.5 ** (1 / halflife)
+
+
+def _sums(x, valid, weights):
+    """Weighted pairwise sums ``(C, Sx, Sxx, P)`` for rows ``x`` (L, N)."""
+    wv = valid * weights[:, None]
+    wx = x * weights[:, None]
+    return np.stack([wv.T @ valid, wx.T @ valid, (wx * x).T @ valid, wx.T @ x])
+
+
+def _outer(x, valid):
+    return np.stack([np.outer(valid, valid), np.outer(x, valid), np.outer(x * x, valid),
+                     np.outer(x, x)])
+
+
+def correlation(sums, min_observations=MIN_OBSERVATIONS, counts=None):
+    """Correlation matrix from ``(C, Sx, Sxx, P)``; NaN for thin pairs.
+
+    ``counts`` (unweighted days both observed) defaults to ``C``.
+    """
+    C, Sx, Sxx, P = sums
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cov = C * P - Sx * Sx.T
+        var = C * Sxx - Sx * Sx
+        corr = cov / np.sqrt(np.maximum(var, 0.0) * np.maximum(var.T, 0.0))
+    counts = C if counts is None else counts
+    corr = np.where(counts >= min_observations, np.clip(corr, -1.0, 1.0), np.nan)
+    np.fill_diagonal(corr, np.where(np.diagonal(counts) >= min_observations, 1.0, np.nan))
+    return corr
+
+
+class CorrelationEngine:
+    """Pairwise correlations of P&L columns with O(N^2) daily updates.
+
+    Pass ``halflife`` (days) for EWMA weights; otherwise a rolling window of
+    ``window`` days is used.
+    """
+
+    def __init__(self, window=DEFAULT_WINDOW, halflife=None, min_observations=MIN_OBSERVATIONS):
+        self.window = window
+        self.halflife = halflife
+        self.lam = halflife_lambda(halflife) if halflife else None
+        self.min_observations = min_observations
+        self.columns = None
+        self._x = None
+        self._valid = None
+        self._dates = None
+        self._offset = None
+        self._size = 0
+        self._state = None
+        self._counts = None
+        self._appended = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def dates(self):
+        return pd.DatetimeIndex(self._dates[:self._size])
+
+    # ------------------------------------------
+    # History
+    # ------------------------------------------
+
+    def fit(self, pnl):
+        """Load the full history of ``pnl`` (DataFrame, dates x strategies)."""
+        pnl = pnl.sort_index()
+        values = pnl.to_numpy('float64')
+        self.columns = list(pnl.columns)
+        valid = ~np.isnan(values)
+        self._offset = np.nan_to_num(np.nanmean(values, axis=0)) if len(values) else np.zeros(values.shape[1])
+        capacity = max(2 * len(values), 64)
+        self._x = np.zeros((capacity, values.shape[1]))
+        self._valid = np.zeros((capacity, values.shape[1]))
+        self._dates = np.empty(capacity, dtype='datetime64[ns]')
+        self._size = len(values)
+        self._x[:self._size] = np.where(valid, values - self._offset, 0.0)
+        self._valid[:self._size] = valid
+        self._dates[:self._size] = pnl.index.to_numpy('datetime64[ns]')
+        self._resync()
+        return self
+
+    def append(self, date, row):
+        """Move the sums forward by one day: O(N^2)."""
+        row = np.asarray(row, dtype='float64')
+        valid = ~np.isnan(row)
+        x = np.where(valid, row - self._offset, 0.0)
+        if self._size == len(self._dates):
+            self._grow()
+        self._x[self._size] = x
+        self._valid[self._size] = valid
+        self._dates[self._size] = np.datetime64(pd.Timestamp(date), 'ns')
+        self._size += 1
+
+        new = _outer(x, valid.astype('float64'))
+        if self.lam is None:
+            self._state += new
+            self._counts += new[0]
+            leaving = self._size - 1 - self.window
+            if leaving >= 0:
+                old = _outer(self._x[leaving], self._valid[leaving])
+                self._state -= old
+                self._counts -= old[0]
+        else:
+            self._state = self.lam * self._state + new
+            self._counts += new[0]
+            if self._size > self._ewma_rows():
+                leaving = self._size - 1 - self._ewma_rows()
+                self._counts -= np.outer(self._valid[leaving], self._valid[leaving])
+        self._appended += 1
+        # Resync now and then so add/subtract rounding cannot build up
+        if self._appended % RESYNC_EVERY == 0:
+            self._resync()
+
+    def sync(self, pnl):
+        """Append new trailing days of ``pnl``; refit on new columns or edits."""
+        pnl = pnl.sort_index()
+        known = self._size
+        values = pnl.to_numpy('float64')
+        if (self._state is None or list(pnl.columns) != self.columns or len(pnl) < known
+                or not np.array_equal(pnl.index[:known].to_numpy('datetime64[ns]'), self._dates[:known])
+                or not np.allclose(np.where(np.isnan(values[:known]), 0.0, values[:known] - self._offset),
+                                   self._x[:known])):
+            return self.fit(pnl)
+        for date, row in zip(pnl.index[known:], values[known:]):
+            self.append(date, row)
+        return self
+
+    def _grow(self):
+        capacity = 2 * len(self._dates)
+        for name in ('_x', '_valid'):
+            grown = np.zeros((capacity, self._x.shape[1]))
+            grown[:self._size] = getattr(self, name)[:self._size]
+            setattr(self, name, grown)
+        dates = np.empty(capacity, dtype='datetime64[ns]')
+        dates[:self._size] = self._dates[:self._size]
+        self._dates = dates
+
+    def _ewma_rows(self):
+        # Rows whose weight is still above the cutoff
+        return int(np.ceil(np.log(EWMA_CUTOFF) / np.log(self.lam))) + 1
+
+    def _weighted_rows(self, end):
+        """Row slice and weights of the window ending at row ``end`` (exclusive)."""
+        rows = self.window if self.lam is None else self._ewma_rows()
+        lo = max(end - rows, 0)
+        if self.lam is None:
+            return slice(lo, end), np.ones(end - lo)
+        return slice(lo, end), self.lam ** np.arange(end - lo - 1, -1, -1, dtype='float64')
+
+    def _resync(self):
+        rows, weights = self._weighted_rows(self._size)
+        valid = self._valid[rows]
+        self._state = _sums(self._x[rows], valid, weights)
+        self._counts = valid.T @ valid
+
+    # ------------------------------------------
+    # Matrices
+    # ------------------------------------------
+
+    def matrix(self, end=None):
+        """Correlation matrix (DataFrame) as of the last day on or before ``end``."""
+        if end is None:
+            stop = self._size
+        else:
+            end = pd.Timestamp(end)
+            if end == end.normalize():
+                end += pd.Timedelta(days=1) - pd.Timedelta(1, 'ns')
+            stop = int(np.searchsorted(self._dates[:self._size], np.datetime64(end, 'ns'), side='right'))
+        if stop == self._size:
+            sums, counts = self._state, self._counts
+        else:
+            rows, weights = self._weighted_rows(stop)
+            valid = self._valid[rows]
+            sums, counts = _sums(self._x[rows], valid, weights), valid.T @ valid
+        corr = correlation(sums, self.min_observations, counts)
+        return pd.DataFrame(corr, index=self.columns, columns=self.columns)
+
+
+# ==========================================
+# NETWORK TABLE
+# ==========================================
+
+def classify(correlations):
+    """``(Relationship, Diversification_Benefit)`` categoricals for correlations."""
+    values = pd.Series(correlations, dtype='float64')
+    relationship = pd.cut(values, [-np.inf] + RELATIONSHIP_BINS + [np.inf], labels=RELATIONSHIP_LEVELS)
+    benefit = pd.cut(values, [-np.inf] + DIVERSIFICATION_BINS + [np.inf], labels=DIVERSIFICATION_LEVELS)
+    return relationship, benefit
+
+
+def pairs(matrix):
+    """Upper triangle of ``matrix`` in the ``correlation_network`` layout."""
+    names = list(matrix.columns)
+    i, j = np.triu_indices(len(names), k=1)
+    values = matrix.to_numpy()[i, j]
+    keep = ~np.isnan(values)
+    relationship, benefit = classify(values[keep])
+    return pd.DataFrame({
+        'Strategy_1': np.array(names, dtype=object)[i[keep]],
+        'Strategy_2': np.array(names, dtype=object)[j[keep]],
+        'Correlation': values[keep],
+        'Relationship': relationship.to_numpy(),
+        'Diversification_Benefit': benefit.to_numpy(),
+    })
@@ -0,0 +1,253 @@
+"""Shared, read-only table store for the dashboard.
+
+A single ``DataStore`` is held in ``st.cache_resource`` so every session and
+every rerun reads the same in-memory tables instead of unpickling a private
+copy.  Tables are loaded on first access only, so a page pays for the tables
+it actually reads.
+
+The first parse of a CSV is written to an uncompressed Feather file under
+``.table_cache/`` next to the data; later cold starts memory-map that file
+instead of re-parsing the CSV.  A table is reloaded only when its CSV changes:
+a ``stat`` compares size and mtime on every access, and when those differ the
+content hash decides whether the cached copy is really stale.
+
+Dtypes come from the registry in ``schemas``: timestamps become
+``DatetimeIndex``/``datetime64``, label columns categoricals and most ratios
+float32.  Run ``python data_store.py`` for a before/after memory report.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.feather as feather
+
+from schemas import apply_schema, schema_fingerprint
+
+# Frames are shared between sessions; copy-on-write makes any derived frame
+# a private copy instead of a mutation of the shared one (always on in pandas 3).
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = '.table_cache'
+
+TABLES = [
+    'vix_term_structure', 'volatility_surface', 'barra_factors', 'variance_premium',
+    'factor_attribution', 'vol_regime', 'trade_signals', 'portfolio_greeks',
+    'etf_arbitrage_microstructure', 'grinold_kahn_strategies', 'alpha_factors_ml',
+    'order_flow_toxicity', 'etf_basket_composition', 'risk_budgeting_optimization',
+    'ml_feature_importance', 'global_equity_dislocations', 'variance_swap_pricing',
+    'dividend_futures_arbitrage', 'vix_term_structure_forecast', 'option_greeks_dynamic_hedging',
+    'volatility_forecasting_models', 'live_market_snapshot', 'trade_execution_journal',
+    'alert_rules', 'alert_history', 'scenario_analysis', 'research_daily_notes',
+    'performance_attribution_daily', 'economic_calendar', 'correlation_network',
+    'option_positions', 'etf_constituent_ticks'
+]
+
+
+class TableLoadError(Exception):
+    """A table could not be loaded from its CSV source."""
+
+    def __init__(self, name, reason):
+        super().__init__(f"{name}: {reason}")
+        self.name = name
+        self.reason = reason
+
+
+def file_digest(path, chunk_size=1 << 20):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DataStore:
+    """Lazily loaded, process-wide table handles keyed by CSV name."""
+
+    def __init__(self, data_dir='.', cache_dir=None):
+        self.data_dir = data_dir
+        self.cache_dir = cache_dir or os.path.join(data_dir, CACHE_DIR)
+        self._entries = {}
+        self._locks = {name: threading.Lock() for name in TABLES}
+
+    def path(self, name):
+        return os.path.join(self.data_dir, f'{name}.csv')
+
+    def __contains__(self, name):
+        return name in self._locks
+
+    def __getitem__(self, name):
+        if name not in self._locks:
+            raise KeyError(f"Unknown table '{name}'")
+        signature = self.signature(name)
+        entry = self._entries.get(name)
+        if entry is None or entry[0] != signature:
+            # Per-table lock: two sessions opening different pages never wait
+            # on each other, two sessions opening the same page load once.
+            with self._locks[name]:
+                entry = self._entries.get(name)
+                if entry is None or entry[0] != signature:
+                    entry = (signature, self._load(name, signature))
+                    self._entries[name] = entry
+        return entry[1]
+
+    def loaded(self):
+        """Names of the tables materialised so far."""
+        return sorted(self._entries)
+
+    def invalidate(self, name=None):
+        """Drop in-memory tables so the next access re-checks the source."""
+        if name is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(name, None)
+
+    # ------------------------------------------
+    # Loading
+    # ------------------------------------------
+
+    def signature(self, name):
+        """``(size, mtime_ns)`` of a table's CSV, used to detect changes."""
+        try:
+            info = os.stat(self.path(name))
+        except FileNotFoundError:
+            raise TableLoadError(name, f"source file {name}.csv not found") from None
+        except OSError as exc:
+            raise TableLoadError(name, f"cannot stat {name}.csv ({exc})") from exc
+        return (info.st_size, info.st_mtime_ns)
+
+    def _cache_paths(self, name):
+        base = os.path.join(self.cache_dir, name)
+        return base + '.feather', base + '.json'
+
+    def _load(self, name, signature):
+        columnar_path, meta_path = self._cache_paths(name)
+        meta = self._read_meta(meta_path)
+        digest = None
+        if meta and meta.get('schema') == schema_fingerprint(name) and os.path.exists(columnar_path):
+            if (meta.get('size'), meta.get('mtime_ns')) == signature:
+                table = self._read_columnar(name, columnar_path)
+                if table is not None:
+                    return self._to_pandas(table)
+            else:
+                # Touched but possibly unchanged (e.g. re-copied by a deploy):
+                # only the content hash can tell.
+                digest = file_digest(self.path(name))
+                if digest == meta.get('sha1'):
+                    table = self._read_columnar(name, columnar_path)
+                    if table is not None:
+                        self._write_meta(name, signature, digest)
+                        return self._to_pandas(table)
+
+        table = self.parse_csv(name)
+        self._write_columnar(name, table, signature, digest)
+        return self._to_pandas(table)
+
+    def parse_csv(self, name):
+        """Parse a table's CSV into a typed Arrow table, bypassing every cache."""
+        try:
+            raw = pacsv.read_csv(self.path(name))
+        except FileNotFoundError:
+            raise TableLoadError(name, f"source file {name}.csv not found") from None
+        except pa.ArrowInvalid as exc:
+            raise TableLoadError(name, f"could not parse {name}.csv ({exc})") from exc
+        try:
+            frame = apply_schema(name, raw.to_pandas(date_as_object=False))
+        except (ValueError, TypeError) as exc:
+            raise TableLoadError(name, f"{name}.csv does not match its schema ({exc})") from exc
+        # Categoricals become dictionary columns and the index is recorded in
+        # the pandas metadata, so the Feather copy round-trips the dtypes.
+        return pa.Table.from_pandas(frame, preserve_index=True)
+
+    def _to_pandas(self, table):
+        # split_blocks keeps one block per column so null-free numeric columns
+        # stay views over the Arrow (or memory-mapped) buffers.
+        return table.to_pandas(split_blocks=True, date_as_object=False)
+
+    # ------------------------------------------
+    # Columnar cache
+    # ------------------------------------------
+
+    def _read_meta(self, meta_path):
+        try:
+            with open(meta_path) as fh:
+                return json.load(fh)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as exc:
+            logger.warning("Ignoring unreadable cache metadata %s: %s", meta_path, exc)
+            return None
+
+    def _read_columnar(self, name, columnar_path):
+        try:
+            return feather.read_table(columnar_path, memory_map=True)
+        except (OSError, pa.ArrowInvalid) as exc:
+            logger.warning("Columnar cache for %s is unreadable, re-parsing CSV: %s", name, exc)
+            return None
+
+    def _write_columnar(self, name, table, signature, digest=None):
+        columnar_path, meta_path = self._cache_paths(name)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f'{columnar_path}.{os.getpid()}.tmp'
+            # Uncompressed so later reads can memory-map the buffers directly
+            feather.write_feather(table, tmp_path, compression='uncompressed')
+            os.replace(tmp_path, columnar_path)
+        except OSError as exc:
+            # A read-only deploy still works, it just re-parses on cold start
+            logger.warning("Could not write columnar cache for %s: %s", name, exc)
+            return
+        self._write_meta(name, signature, digest or file_digest(self.path(name)))
+
+    def _write_meta(self, name, signature, digest):
+        meta_path = self._cache_paths(name)[1]
+        size, mtime_ns = signature
+        tmp_path = f'{meta_path}.{os.getpid()}.tmp'
+        meta = {'size': size, 'mtime_ns': mtime_ns, 'sha1': digest, 'schema': schema_fingerprint(name)}
+        try:
+            with open(tmp_path, 'w') as fh:
+                json.dump(meta, fh)
+            os.replace(tmp_path, meta_path)
+        except OSError as exc:
+            logger.warning("Could not write cache metadata %s: %s", meta_path, exc)
+
+
+# ==========================================
+# MEMORY REPORT
+# ==========================================
+
+def memory_report(store):
+    """Deep memory of each table with default ``read_csv`` dtypes vs the typed store."""
+    rows = []
+    for name in TABLES:
+        try:
+            before = pd.read_csv(store.path(name)).memory_usage(deep=True).sum()
+            after = store[name].memory_usage(deep=True).sum()
+        except (FileNotFoundError, TableLoadError):
+            continue
+        rows.append({'Table': name, 'Default_Bytes': int(before), 'Typed_Bytes': int(after)})
+    report = pd.DataFrame(rows)
+    if not report.empty:
+        report['Saved_Pct'] = 100 * (1 - report['Typed_Bytes'] / report['Default_Bytes'])
+        total = report[['Default_Bytes', 'Typed_Bytes']].sum()
+        report.loc[len(report)] = {
+            'Table': 'TOTAL', 'Default_Bytes': total['Default_Bytes'],
+            'Typed_Bytes': total['Typed_Bytes'],
+            'Saved_Pct': 100 * (1 - total['Typed_Bytes'] / total['Default_Bytes']),
+        }
+    return report
+
+
+if __name__ == '__main__':
+    import sys
+
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else os.path.dirname(os.path.abspath(__file__))
+    print(memory_report(DataStore(data_dir)).to_string(index=False, float_format='%.1f'))
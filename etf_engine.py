@@ -0,0 +1,214 @@
+"""Streaming ETF NAV, premium/discount and flow statistics.
+
+``EtfNavEngine`` turns ``etf_basket_composition`` weights into share counts
+at a set of reference prices, then keeps the basket NAV current as
+constituent ticks arrive: a tick moves NAV by ``shares * price change``, so
+each update is O(1) whatever the basket size.  ETF quotes are compared with
+the live NAV and fed into time-windowed rolling statistics (premium mean and
+std, mean spread, net flow) held as running sums over a deque, so they are
+amortized O(1) as well.
+
+``replay`` backfills a block of ticks in bulk: NAV is a cumulative sum of
+per-tick contributions and the rolling columns come from pandas time-based
+rolling windows.  Afterwards the engine holds exactly the state streaming
+the same ticks would have left, so live updates continue from it.
+
+A holding with no quote yet (the basket file carries weights, not prices)
+is held at its weight of the reference NAV until its first tick, which then
+fixes its share count; ticks for symbols outside the basket are logged and
+skipped, in streaming and replay alike.
+
+Ticks follow ``etf_constituent_ticks.csv``: ``Timestamp``, ``Holding_Rank``
+(0 for the ETF itself), ``Bid``, ``Ask`` and ``Net_Flow`` (creation minus
+redemption units, ETF rows only).
+"""
+
+import logging
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+ETF_RANK = 0
+DEFAULT_WINDOW = pd.Timedelta(minutes=5)
+RESYNC_EVERY = 100_000
+
+STAT_COLUMNS = ['Premium_Mean_bps', 'Premium_Std_bps', 'Spread_Mean_bps', 'Net_Flow_Sum']
+
+
+def latest_basket(composition):
+    """Holdings of the most recent basket, weights normalized to one."""
+    basket = composition[composition['Date'] == composition['Date'].max()]
+    basket = basket.sort_values('Holding_Rank')
+    weights = basket['Weight_Pct'].to_numpy('float64')
+    return basket['Holding_Rank'].to_numpy(), weights / weights.sum()
+
+
+class EtfNavEngine:
+    """Incremental NAV and rolling premium/discount statistics for one ETF."""
+
+    def __init__(self, holdings, weights, reference_prices, reference_nav, window=DEFAULT_WINDOW):
+        self.holdings = list(holdings)
+        self._slot = {holding: i for i, holding in enumerate(self.holdings)}
+        self.prices = np.asarray(reference_prices, dtype='float64').copy()
+        # Value of each holding at the reference NAV; unpriced ones keep it
+        # until their first quote sets the share count
+        self._values = reference_nav * np.asarray(weights, dtype='float64')
+        self.shares = self._values / self.prices
+        self.nav = float(reference_nav)
+        self.window = pd.Timedelta(window)
+        self._updates = 0
+        self._unknown = set()
+        self._events = deque()
+        self._sums = np.zeros(4)  # premium, premium^2, spread, net flow
+
+    def _skip(self, holdings):
+        # Symbols outside the basket: logged once each, never priced
+        for holding in set(holdings) - self._unknown:
+            logger.warning("Skipping ticks for %r: not in the ETF basket", holding)
+        self._unknown.update(holdings)
+
+    def _marked_nav(self):
+        priced = ~np.isnan(self.prices)
+        return float(self.shares[priced] @ self.prices[priced] + self._values[~priced].sum())
+
+    @classmethod
+    def from_ticks(cls, composition, ticks, window=DEFAULT_WINDOW):
+        """Engine for the latest basket, referenced to the first quotes in ``ticks``.
+
+        Without an official share file the basket is scaled so that NAV
+        equals the first ETF mid; constituents start at their first mid.
+        """
+        holdings, weights = latest_basket(composition)
+        first = ticks.sort_values('Timestamp', kind='stable').groupby('Holding_Rank').first()
+        mid = 0.5 * (first['Bid'] + first['Ask'])
+        return cls(holdings, weights, mid.reindex(holdings).to_numpy('float64'), float(mid.loc[ETF_RANK]),
+                   window=window)
+
+    # ------------------------------------------
+    # Streaming
+    # ------------------------------------------
+
+    def on_constituent(self, holding, bid, ask):
+        """Apply a constituent quote; returns the new NAV."""
+        i = self._slot.get(holding)
+        if i is None:
+            self._skip([holding])
+            return self.nav
+        mid = 0.5 * (bid + ask)
+        if np.isnan(self.prices[i]):
+            # First quote of an unpriced holding: its value is already in NAV
+            self.shares[i] = self._values[i] / mid
+        else:
+            self.nav += self.shares[i] * (mid - self.prices[i])
+        self.prices[i] = mid
+        self._updates += 1
+        if self._updates % RESYNC_EVERY == 0:
+            # Re-add from scratch now and then so float drift cannot build up
+            self.nav = self._marked_nav()
+        return self.nav
+
+    def on_etf(self, timestamp, bid, ask, net_flow=0):
+        """Apply an ETF quote; returns the tick's premium and rolling statistics."""
+        timestamp = pd.Timestamp(timestamp)
+        mid = 0.5 * (bid + ask)
+        event = np.array([(mid / self.nav - 1) * 1e4, 0.0, (ask - bid) / mid * 1e4, net_flow])
+        event[1] = event[0] ** 2
+        self._events.append((timestamp, event))
+        self._sums += event
+        horizon = timestamp - self.window
+        while self._events[0][0] <= horizon:
+            self._sums -= self._events.popleft()[1]
+        return {'Timestamp': timestamp, 'NAV': self.nav, 'ETF_Mid': mid,
+                'Premium_bps': event[0], 'Spread_bps': event[2], 'Net_Flow': net_flow,
+                **self.stats()}
+
+    def on_tick(self, timestamp, holding, bid, ask, net_flow=0):
+        """Route one row of the tick table; returns the stats for ETF rows."""
+        if holding == ETF_RANK:
+            return self.on_etf(timestamp, bid, ask, net_flow)
+        self.on_constituent(holding, bid, ask)
+        return None
+
+    def stats(self):
+        count = len(self._events)
+        if count == 0:
+            return dict.fromkeys(STAT_COLUMNS, np.nan)
+        premium, premium_sq, spread, flow = self._sums
+        mean = premium / count
+        variance = max(premium_sq / count - mean * mean, 0.0) * count / max(count - 1, 1)
+        return {'Premium_Mean_bps': mean, 'Premium_Std_bps': np.sqrt(variance),
+                'Spread_Mean_bps': spread / count, 'Net_Flow_Sum': flow}
+
+    # ------------------------------------------
+    # Bulk replay
+    # ------------------------------------------
+
+    def replay(self, ticks):
+        """Process a block of ticks at once; returns one row per ETF quote."""
+        ticks = ticks.sort_values('Timestamp', kind='stable')
+        rank = ticks['Holding_Rank'].to_numpy()
+        mid = 0.5 * (ticks['Bid'].to_numpy('float64') + ticks['Ask'].to_numpy('float64'))
+        is_etf = rank == ETF_RANK
+        known = np.isin(rank, self.holdings)
+        unknown = ~known & ~is_etf
+        if unknown.any():
+            self._skip(np.unique(rank[unknown]).tolist())
+        slot = np.array([self._slot[r] for r in rank[known]], dtype=int)
+
+        # Unpriced holdings take their share count from their first quote here
+        held_mid = mid[known]
+        first = pd.Series(held_mid).groupby(slot).first()
+        unpriced = first.index[np.isnan(self.prices[first.index])].to_numpy()
+        self.shares[unpriced] = self._values[unpriced] / first.loc[unpriced].to_numpy()
+
+        # NAV moves by shares * (mid - previous mid of the same holding); a
+        # first quote of an unpriced holding moves it by nothing
+        previous = pd.Series(held_mid).groupby(slot).shift(1).to_numpy()
+        previous = np.where(np.isnan(previous), self.prices[slot], previous)
+        previous = np.where(np.isnan(previous), held_mid, previous)
+        contribution = np.zeros(len(ticks))
+        contribution[known] = self.shares[slot] * (held_mid - previous)
+        nav = self.nav + np.cumsum(contribution)
+
+        last = pd.Series(held_mid).groupby(slot).last()
+        self.prices[last.index.to_numpy()] = last.to_numpy()
+        self._updates += int(known.sum())
+        if len(ticks):
+            self.nav = float(nav[-1])
+
+        quotes = ticks.loc[is_etf, ['Timestamp', 'Bid', 'Ask']].copy()
+        quotes['NAV'] = nav[is_etf]
+        quotes['ETF_Mid'] = mid[is_etf]
+        quotes['Premium_bps'] = (quotes['ETF_Mid'] / quotes['NAV'] - 1) * 1e4
+        quotes['Spread_bps'] = (quotes['Ask'] - quotes['Bid']) / quotes['ETF_Mid'] * 1e4
+        quotes['Net_Flow'] = ticks.loc[is_etf, 'Net_Flow'].fillna(0).to_numpy('float64')
+        return self._roll(quotes.drop(columns=['Bid', 'Ask']).set_index('Timestamp'))
+
+    def _roll(self, quotes):
+        # Prepend the events still in the live window so the rolling columns
+        # continue the streaming state, then leave the new window behind.
+        carried = pd.DataFrame([e for _, e in self._events],
+                               index=pd.DatetimeIndex([t for t, _ in self._events]),
+                               columns=['Premium_bps', 'Premium_Sq', 'Spread_bps', 'Net_Flow'])
+        events = quotes[['Premium_bps', 'Spread_bps', 'Net_Flow']].assign(
+            Premium_Sq=quotes['Premium_bps'] ** 2)[carried.columns]
+        events = pd.concat([carried, events]) if len(carried) else events
+        rolling = events.rolling(self.window)
+        count = rolling['Premium_bps'].count()
+        sums = rolling.sum()
+        mean = sums['Premium_bps'] / count
+        variance = (sums['Premium_Sq'] / count - mean ** 2).clip(lower=0) * count / (count - 1).clip(lower=1)
+        stats = pd.DataFrame({
+            'Premium_Mean_bps': mean, 'Premium_Std_bps': np.sqrt(variance),
+            'Spread_Mean_bps': sums['Spread_bps'] / count, 'Net_Flow_Sum': sums['Net_Flow'],
+        }).iloc[len(carried):]
+
+        if len(events):
+            horizon = events.index[-1] - self.window
+            tail = events[events.index > horizon]
+            self._events = deque(zip(tail.index, tail.to_numpy('float64')))
+            self._sums = tail.to_numpy('float64').sum(axis=0)
+        return pd.concat([quotes, stats.set_axis(quotes.index)], axis=1)
@@ -0,0 +1,201 @@
+"""Figure builders for the heavy and downsampled charts.
+
+Every function here is pure: it takes frames or arrays plus parameters and
+returns a ``go.Figure``, without reading the stores or session state.  That
+is what lets ``charts.FigureCache`` reuse a figure whenever its inputs'
+table versions and parameters are unchanged.
+"""
+
+import numpy as np
+import plotly.graph_objects as go
+
+import charts
+
+
+def vol_surface(grid):
+    """3D implied-vol surface from an SVI render grid."""
+    fig = go.Figure(data=[go.Surface(
+        z=grid['Implied_Vol'],
+        x=grid['Maturity_Days'],
+        y=grid['Strike'],
+        colorscale='Blues'
+    )])
+    fig.update_layout(
+        title="3D Volatility Surface",
+        scene=dict(
+            xaxis_title='Maturity (Days)',
+            yaxis_title='Strike',
+            zaxis_title='Implied Vol'
+        ),
+        height=700
+    )
+    return fig
+
+
+def dislocation_scatter(global_data):
+    """US/Europe/Asia realized vol cloud colored by dislocation score."""
+    fig = go.Figure(data=[go.Scatter3d(
+        x=global_data['US_RV'],
+        y=global_data['Europe_RV'],
+        z=global_data['Asia_RV'],
+        mode='markers',
+        marker=dict(
+            size=5,
+            color=global_data['Dislocation_Score'],
+            colorscale='RdYlGn_r',
+            showscale=True
+        )
+    )])
+    fig.update_layout(
+        title="3D Volatility Correlation",
+        scene=dict(
+            xaxis_title='US Vol',
+            yaxis_title='Europe Vol',
+            zaxis_title='Asia Vol'
+        ),
+        height=700
+    )
+    return fig
+
+
+def greeks_trajectory(greeks):
+    """Vega/gamma path of the book through time."""
+    fig = go.Figure()
+    fig.add_trace(go.Scatter3d(
+        x=greeks.index,
+        y=greeks['Total_Vega'],
+        z=greeks['Total_Gamma'],
+        mode='lines+markers',
+        marker=dict(size=3, color='#1E3A8A')
+    ))
+    fig.update_layout(
+        scene=dict(
+            xaxis_title='Time',
+            yaxis_title='Vega',
+            zaxis_title='Gamma'
+        ),
+        height=700
+    )
+    return fig
+
+
+def cumulative_pnl(perf):
+    fig = go.Figure()
+    fig.add_trace(charts.line(perf.index, perf['Cumulative_PnL'],
+                              fill='tozeroy', line=dict(color='#1E3A8A')))
+    fig.update_layout(height=400, plot_bgcolor='white', title="Cumulative P&L")
+    return fig
+
+
+def rolling_statistic(frame, title):
+    """One downsampled line per strategy column, the total drawn heavier."""
+    fig = go.Figure()
+    for column in frame:
+        width = 3 if column == frame.columns[-1] else 1.5
+        fig.add_trace(charts.line(frame.index, frame[column], name=column, line=dict(width=width)))
+    fig.update_layout(height=350, plot_bgcolor='white', title=title)
+    return fig
+
+
+def series_line(frame, column, color, title, height=300):
+    """A single downsampled time-series line."""
+    fig = go.Figure()
+    fig.add_trace(charts.line(frame.index, frame[column], line=dict(color=color)))
+    fig.update_layout(height=height, plot_bgcolor='white', title=title)
+    return fig
+
+
+RELATIONSHIP_COLORS = {'Positive': '#DC2626', 'Neutral': '#94A3B8', 'Negative': '#10B981'}
+BENEFIT_WIDTHS = {'Low': 4, 'Medium': 2.5, 'High': 1}
+
+
+def correlation_network(table, min_abs=0.0):
+    """Strategies on a circle, edges colored by relationship and sized by
+    how little diversification the pair offers."""
+    names = list(dict.fromkeys(list(table['Strategy_1']) + list(table['Strategy_2'])))
+    angle = 2 * np.pi * np.arange(len(names)) / max(len(names), 1)
+    position = dict(zip(names, zip(np.cos(angle), np.sin(angle))))
+    edges = table[table['Correlation'].abs() >= min_abs]
+
+    fig = go.Figure()
+    # One trace per (relationship, benefit) group, segments split by None
+    for (relationship, benefit), group in edges.groupby(['Relationship', 'Diversification_Benefit'],
+                                                        observed=True):
+        xs, ys = [], []
+        for a, b in zip(group['Strategy_1'], group['Strategy_2']):
+            xs += [position[a][0], position[b][0], None]
+            ys += [position[a][1], position[b][1], None]
+        fig.add_trace(go.Scatter(x=xs, y=ys, mode='lines', hoverinfo='skip',
+                                 name=f"{relationship} / {benefit} benefit",
+                                 line=dict(color=RELATIONSHIP_COLORS.get(relationship, '#94A3B8'),
+                                           width=BENEFIT_WIDTHS.get(benefit, 1))))
+    if len(edges):
+        mid = np.array([[(position[a][0] + position[b][0]) / 2, (position[a][1] + position[b][1]) / 2]
+                        for a, b in zip(edges['Strategy_1'], edges['Strategy_2'])])
+        fig.add_trace(go.Scatter(
+            x=mid[:, 0], y=mid[:, 1], mode='markers', marker=dict(size=6, opacity=0), showlegend=False,
+            text=[f"{a} / {b}: {c:.2f}" for a, b, c in
+                  zip(edges['Strategy_1'], edges['Strategy_2'], edges['Correlation'])],
+            hoverinfo='text'))
+    fig.add_trace(go.Scatter(
+        x=[position[n][0] for n in names], y=[position[n][1] for n in names],
+        mode='markers+text', text=names, textposition='top center', showlegend=False,
+        marker=dict(size=14, color='#1E3A8A'), hoverinfo='text'))
+    fig.update_layout(height=550, plot_bgcolor='white', title="Strategy Correlation Network",
+                      xaxis=dict(visible=False), yaxis=dict(visible=False, scaleanchor='x'))
+    return fig
+
+
+def vol_predictions(predictions, title):
+    """Realized next-day vol against walk-forward and in-sample predictions."""
+    fig = go.Figure()
+    styles = {'Actual': dict(color='#94A3B8', width=1.5),
+              'Out_Of_Sample': dict(color='#1E3A8A', width=2),
+              'Fitted': dict(color='#10B981', width=1, dash='dot')}
+    for column, line in styles.items():
+        fig.add_trace(charts.line(predictions.index, predictions[column],
+                                  name=column.replace('_', ' '), line=line))
+    fig.update_layout(height=400, plot_bgcolor='white', title=title)
+    return fig
+
+
+def permutation_importance(importance, title):
+    """Mean increase in out-of-sample MSE per shuffled feature, with its spread."""
+    fig = go.Figure(go.Bar(x=importance['Feature'], y=importance['Importance'],
+                           error_y=dict(type='data', array=importance['Std']),
+                           marker_color='#1E3A8A'))
+    fig.update_layout(height=400, plot_bgcolor='white', title=title, yaxis_title="ΔMSE")
+    fig.update_xaxes(tickangle=45)
+    return fig
+
+
+REGIME_COLORS = {'Contango': '#10B981', 'Flat': '#94A3B8', 'Backwardation': '#DC2626'}
+
+
+def term_structure_curve(curve, date):
+    """Listed futures at their maturities with the constant-maturity points."""
+    fig = go.Figure()
+    listed = curve[curve['Kind'] != 'Constant Maturity']
+    fixed = curve[curve['Kind'] == 'Constant Maturity']
+    fig.add_trace(go.Scatter(x=listed['Days'], y=listed['Level'], mode='lines+markers+text',
+                             text=listed['Point'], textposition='top center', name='Spot & Futures',
+                             line=dict(color='#1E3A8A')))
+    fig.add_trace(go.Scatter(x=fixed['Days'], y=fixed['Level'], mode='markers', name='Constant Maturity',
+                             marker=dict(size=11, symbol='diamond', color='#F59E0B')))
+    fig.update_layout(height=400, plot_bgcolor='white', title=f"VIX Term Structure · {date:%Y-%m-%d}",
+                      xaxis_title="Days to Maturity", yaxis_title="VIX")
+    return fig
+
+
+def roll_yield_history(table):
+    """Constant-maturity roll yield over time, marked by term-structure regime."""
+    fig = go.Figure()
+    fig.add_trace(charts.line(table.index, table['Roll_Yield_1M_pct'], name='Roll Yield 1M',
+                              line=dict(color='#1E3A8A', width=1.5)))
+    for regime, color in REGIME_COLORS.items():
+        days = table[table['Term_Structure_Regime'] == regime]
+        fig.add_trace(go.Scatter(x=days.index, y=days['Roll_Yield_1M_pct'], mode='markers', name=regime,
+                                 marker=dict(size=5, color=color)))
+    fig.add_hline(y=0, line_dash="dash", line_color="gray")
+    fig.update_layout(height=350, plot_bgcolor='white', title="Constant-Maturity Roll Yield (%)")
+    return fig
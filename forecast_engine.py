@@ -0,0 +1,245 @@
+"""In-process EWMA and GARCH(1,1) volatility forecasts.
+
+``VolForecaster`` works on a wide frame of daily returns (one column per
+symbol) so the same code serves the app's single SPX series and a batch run
+over thousands of symbols:
+
+- EWMA variance is a linear recursion and is computed with pandas' ``ewm``
+  over all symbols at once.
+- GARCH(1,1) is fitted by maximum likelihood with variance targeting.  The
+  likelihood recursion runs over time but is vectorized across symbols and
+  across candidate (alpha, beta) pairs; a coarse grid is refined around the
+  best pair per symbol, and a refit starts from the previous parameters.
+- ``sync`` appends new bars with an O(1) update of each model's variance and
+  only refits every ``refit_every`` bars.
+- ``table`` rebuilds the ``volatility_forecasting_models.csv`` columns,
+  with the vol cones as rolling quantiles of 20-day realized vol.
+
+Run ``python forecast_engine.py returns.csv out_dir`` to produce the table
+columns for every symbol in a wide returns CSV.
+"""
+
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+EWMA_LAMBDA = 0.94
+REALIZED_WINDOW = 20
+CONE_WINDOW = 252
+CONE_MIN_PERIODS = 60
+CONE_LEVELS = {'Vol_Cone_50pct': 0.50, 'Vol_Cone_75pct': 0.75, 'Vol_Cone_90pct': 0.90}
+MAX_PERSISTENCE = 0.999
+
+TABLE_COLUMNS = ['Realized_Vol_20D', 'EWMA_Forecast', 'GARCH_Forecast', 'Vol_Cone_50pct',
+                 'Vol_Cone_75pct', 'Vol_Cone_90pct', 'Actual_Future_Vol', 'Forecast_Error_EWMA',
+                 'Forecast_Error_GARCH']
+
+
+# ==========================================
+# GARCH(1,1) FIT
+# ==========================================
+
+def _garch_recursion(r, long_run, alpha, beta, keep_paths=False):
+    """Log-likelihood (and optionally variance paths) for candidate parameters.
+
+    ``r`` is (T, N); ``alpha``/``beta`` are (K, N).  Returns the (K, N)
+    log-likelihood and, with ``keep_paths``, the (T + 1, K, N) variances
+    where row t is the forecast for day t made after day t - 1.  Missing
+    returns leave the variance unchanged and add nothing to the likelihood.
+    """
+    T = r.shape[0]
+    omega = long_run * (1 - alpha - beta)
+    valid = ~np.isnan(r)
+    r2 = np.where(valid, r * r, 0.0)
+    var = np.broadcast_to(long_run, alpha.shape).astype('float64')
+    paths = np.empty((T + 1,) + alpha.shape) if keep_paths else None
+    loglik = np.zeros(alpha.shape)
+    for t in range(T):
+        if keep_paths:
+            paths[t] = var
+        loglik -= np.where(valid[t], np.log(var) + r2[t] / var, 0.0)
+        var = np.where(valid[t], omega + alpha * r2[t] + beta * var, var)
+    if keep_paths:
+        paths[T] = var
+    return 0.5 * loglik, paths
+
+
+def _candidates(center_a, center_b, step_a, step_b, size):
+    offsets = np.linspace(-1, 1, size)
+    da, db = np.meshgrid(offsets, offsets, indexing='ij')
+    alpha = np.clip(center_a + da.reshape(-1, 1) * step_a, 1e-4, 0.5)
+    beta = np.clip(center_b + db.reshape(-1, 1) * step_b, 0.0, MAX_PERSISTENCE)
+    # Keep alpha + beta < 1 so the long-run variance exists
+    over = alpha + beta >= MAX_PERSISTENCE
+    beta = np.where(over, MAX_PERSISTENCE - alpha, beta)
+    return alpha, beta
+
+
+def fit_garch(returns, warm_start=None, rounds=4):
+    """Fit GARCH(1,1) per column of ``returns`` (T, N).
+
+    Returns ``(alpha, beta, long_run_var)`` arrays of length N.  Without a
+    warm start a coarse 9x9 grid is searched first; each refinement round
+    evaluates a 5x5 grid around the current best pair with half the step.
+    """
+    r = np.asarray(returns, dtype='float64')
+    if r.ndim == 1:
+        r = r[:, None]
+    long_run = np.nanvar(r, axis=0)
+    n = r.shape[1]
+    if warm_start is None:
+        center_a, center_b = np.full(n, 0.15), np.full(n, 0.70)
+        step_a, step_b, size = 0.14, 0.28, 9
+    else:
+        center_a, center_b = np.asarray(warm_start[0], 'float64'), np.asarray(warm_start[1], 'float64')
+        step_a, step_b, size, rounds = 0.02, 0.04, 5, max(2, rounds // 2)
+
+    for _ in range(rounds):
+        alpha, beta = _candidates(center_a, center_b, step_a, step_b, size)
+        loglik = _garch_recursion(r, long_run, alpha, beta)[0]
+        best = np.nanargmax(loglik, axis=0)
+        center_a, center_b = alpha[best, np.arange(n)], beta[best, np.arange(n)]
+        step_a, step_b, size = step_a / 2, step_b / 2, 5
+    return center_a, center_b, long_run
+
+
+# ==========================================
+# FORECASTER
+# ==========================================
+
+class VolForecaster:
+    """EWMA and GARCH(1,1) one-day-ahead forecasts with incremental updates."""
+
+    def __init__(self, lam=EWMA_LAMBDA, refit_every=21):
+        self.lam = lam
+        self.refit_every = refit_every
+        self.params = None
+        self._returns = None
+        self._ewma = None
+        self._garch = None
+        self._bars_since_fit = 0
+        self._new_dates = []
+        self._new_rows = []
+        self._new_ewma = []
+        self._new_garch = []
+
+    @property
+    def returns(self):
+        """Every return seen so far, fitted history plus appended bars."""
+        if self._new_rows:
+            appended = pd.DataFrame(self._new_rows, index=pd.DatetimeIndex(self._new_dates),
+                                    columns=self._returns.columns)
+            self._returns = pd.concat([self._returns, appended])
+            self._ewma = np.vstack([self._ewma] + self._new_ewma)
+            self._garch = np.vstack([self._garch] + self._new_garch)
+            self._new_dates, self._new_rows, self._new_ewma, self._new_garch = [], [], [], []
+        return self._returns
+
+    def fit(self, returns):
+        """Full pass over ``returns`` (DataFrame, one column per symbol)."""
+        returns = returns.astype('float64')
+        warm = None
+        if self.params is not None and len(self.params[0]) == returns.shape[1]:
+            warm = self.params[:2]
+        alpha, beta, long_run = fit_garch(returns.to_numpy(), warm_start=warm)
+        self.params = (alpha, beta, long_run)
+
+        # Row t holds the variance forecast for day t + 1, made at day t's close
+        ewma = (returns ** 2).ewm(alpha=1 - self.lam, adjust=False, ignore_na=True).mean()
+        paths = _garch_recursion(returns.to_numpy(), long_run, alpha[None, :], beta[None, :],
+                                 keep_paths=True)[1]
+        self._returns = returns
+        self._ewma = ewma.to_numpy()
+        self._garch = paths[1:, 0, :]
+        self._new_dates, self._new_rows, self._new_ewma, self._new_garch = [], [], [], []
+        self._bars_since_fit = 0
+        return self
+
+    def update(self, date, row):
+        """Append one bar (``row`` aligned with the columns): O(1) per symbol."""
+        alpha, beta, long_run = self.params
+        r = np.asarray(row, dtype='float64')
+        valid = ~np.isnan(r)
+        r2 = np.where(valid, r * r, 0.0)
+        last_ewma = self._new_ewma[-1] if self._new_ewma else self._ewma[-1]
+        last_garch = self._new_garch[-1] if self._new_garch else self._garch[-1]
+        self._new_ewma.append(np.where(valid, self.lam * last_ewma + (1 - self.lam) * r2, last_ewma))
+        self._new_garch.append(np.where(
+            valid, long_run * (1 - alpha - beta) + alpha * r2 + beta * last_garch, last_garch))
+        self._new_dates.append(pd.Timestamp(date))
+        self._new_rows.append(r)
+        self._bars_since_fit += 1
+
+    def sync(self, returns):
+        """Bring the models up to date with ``returns``.
+
+        New trailing rows go through ``update``; a history that was edited
+        rather than extended, or ``refit_every`` appended bars, trigger a
+        warm-started refit.
+        """
+        returns = returns.astype('float64')
+        if self._returns is None or list(returns.columns) != list(self._returns.columns):
+            return self.fit(returns)
+        history = self.returns
+        known = len(history)
+        if len(returns) < known or not returns.iloc[:known].equals(history):
+            return self.fit(returns)
+        for date, row in zip(returns.index[known:], returns.to_numpy()[known:]):
+            self.update(date, row)
+        # Counted separately: reading ``returns`` flushes the pending rows
+        if self._bars_since_fit >= self.refit_every:
+            self.fit(returns)
+        return self
+
+    def forecast(self):
+        """Latest one-day-ahead annualized (EWMA, GARCH) vol per symbol."""
+        ewma = self._new_ewma[-1] if self._new_ewma else self._ewma[-1]
+        garch = self._new_garch[-1] if self._new_garch else self._garch[-1]
+        return np.sqrt(ewma * TRADING_DAYS), np.sqrt(garch * TRADING_DAYS)
+
+    def summary(self):
+        """Fitted GARCH parameters per symbol (annualized long-run vol)."""
+        alpha, beta, long_run = self.params
+        return pd.DataFrame({
+            'Alpha': alpha, 'Beta': beta, 'Persistence': alpha + beta,
+            'Omega': long_run * (1 - alpha - beta),
+            'Long_Run_Vol': np.sqrt(long_run * TRADING_DAYS),
+        }, index=self._returns.columns)
+
+    def table(self, symbol=None):
+        """The forecasting-table columns, for one symbol or all of them.
+
+        With ``symbol`` a frame shaped like ``volatility_forecasting_models``
+        is returned; without it, a dict of wide (date x symbol) frames.
+        """
+        returns = self.returns
+        index, columns = returns.index, returns.columns
+        realized = returns.rolling(REALIZED_WINDOW).std() * np.sqrt(TRADING_DAYS)
+        wide = {
+            'Realized_Vol_20D': realized,
+            'EWMA_Forecast': pd.DataFrame(np.sqrt(self._ewma * TRADING_DAYS), index, columns),
+            'GARCH_Forecast': pd.DataFrame(np.sqrt(self._garch * TRADING_DAYS), index, columns),
+        }
+        cone = realized.rolling(CONE_WINDOW, min_periods=CONE_MIN_PERIODS)
+        for name, level in CONE_LEVELS.items():
+            wide[name] = cone.quantile(level)
+        wide['Actual_Future_Vol'] = realized.shift(-REALIZED_WINDOW)
+        wide['Forecast_Error_EWMA'] = wide['Actual_Future_Vol'] - wide['EWMA_Forecast']
+        wide['Forecast_Error_GARCH'] = wide['Actual_Future_Vol'] - wide['GARCH_Forecast']
+        if symbol is None:
+            return wide
+        return pd.DataFrame({name: wide[name][symbol] for name in TABLE_COLUMNS})
+
+
+if __name__ == '__main__':
+    import os
+    import sys
+
+    if len(sys.argv) != 3:
+        sys.exit("usage: python forecast_engine.py returns.csv out_dir")
+    frame = pd.read_csv(sys.argv[1], index_col=0, parse_dates=True)
+    os.makedirs(sys.argv[2], exist_ok=True)
+    forecaster = VolForecaster().fit(frame)
+    for name, values in forecaster.table().items():
+        values.to_parquet(os.path.join(sys.argv[2], f'{name}.parquet'))
+    forecaster.summary().to_parquet(os.path.join(sys.argv[2], 'garch_params.parquet'))
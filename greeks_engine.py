@@ -0,0 +1,133 @@
+"""Batched Black-Scholes greeks for the option book.
+
+``book_greeks`` prices every line of a positions table (``Position``,
+``Option_Type``, ``Strike``, ``Expiry_Days``, ``Quantity``) in one NumPy pass:
+implied vols are read off ``volatility_surface`` by bilinear interpolation
+in (moneyness, maturity), then delta, gamma, vega and theta are evaluated as
+arrays.  Nothing loops over lines, so a book of tens of thousands of options
+costs a few milliseconds.
+
+Units follow ``portfolio_greeks.csv``: delta in underlying units, gamma as the
+change in delta per index point, vega in USD per vol point and theta in USD
+per calendar day, all scaled by quantity and contract multiplier.
+"""
+
+import numpy as np
+
+CONTRACT_MULTIPLIER = 100
+DEFAULT_RATE = 0.04
+DEFAULT_DIVIDEND = 0.013
+MIN_EXPIRY_YEARS = 1 / (365 * 24)
+
+GREEK_COLUMNS = ['Delta', 'Gamma', 'Vega', 'Theta']
+
+
+# ==========================================
+# NORMAL DISTRIBUTION
+# ==========================================
+
+_SQRT_2PI = np.sqrt(2 * np.pi)
+
+
+def norm_pdf(x):
+    return np.exp(-0.5 * x * x) / _SQRT_2PI
+
+
+def norm_cdf(x):
+    """Standard normal CDF (Abramowitz & Stegun 26.2.17, |error| < 7.5e-8)."""
+    x = np.asarray(x, dtype='float64')
+    k = 1.0 / (1.0 + 0.2316419 * np.abs(x))
+    poly = k * (0.319381530 + k * (-0.356563782 + k * (1.781477937
+                + k * (-1.821255978 + k * 1.330274429))))
+    upper = 1.0 - norm_pdf(x) * poly
+    return np.where(x >= 0, upper, 1.0 - upper)
+
+
+# ==========================================
+# VOLATILITY LOOKUP
+# ==========================================
+
+def surface_grid(surface):
+    """``(moneyness, maturity_days, vol)`` grid from the surface quotes.
+
+    Vols are returned in decimals.  Missing (moneyness, maturity) pairs are
+    filled by interpolating along moneyness within each maturity.
+    """
+    pivot = surface.pivot_table(index='Moneyness', columns='Maturity_Days',
+                                values='Implied_Vol', aggfunc='mean').sort_index().sort_index(axis=1)
+    pivot = pivot.interpolate(axis=0, limit_direction='both')
+    return (pivot.index.to_numpy('float64'), pivot.columns.to_numpy('float64'),
+            pivot.to_numpy('float64') / 100)
+
+
+def _axis_weights(axis, values):
+    if len(axis) == 1:
+        return np.zeros(len(values), dtype=int), np.zeros(len(values)), 0
+    values = np.clip(values, axis[0], axis[-1])
+    lo = np.clip(np.searchsorted(axis, values, side='right') - 1, 0, len(axis) - 2)
+    weight = (values - axis[lo]) / (axis[lo + 1] - axis[lo])
+    return lo, weight, 1
+
+
+def interpolate_vol(grid, moneyness, days):
+    """Bilinear vol lookup with flat extrapolation beyond the quoted wings."""
+    xs, ys, vols = grid
+    i, tx, di = _axis_weights(xs, np.asarray(moneyness, dtype='float64'))
+    j, ty, dj = _axis_weights(ys, np.asarray(days, dtype='float64'))
+    return (vols[i, j] * (1 - tx) * (1 - ty) + vols[i + di, j] * tx * (1 - ty)
+            + vols[i, j + dj] * (1 - tx) * ty + vols[i + di, j + dj] * tx * ty)
+
+
+# ==========================================
+# BLACK-SCHOLES
+# ==========================================
+
+def black_scholes_greeks(spot, strike, years, vol, is_call, rate=DEFAULT_RATE,
+                         dividend=DEFAULT_DIVIDEND):
+    """Per-unit price and greeks for arrays of European options."""
+    years = np.maximum(years, MIN_EXPIRY_YEARS)
+    vol = np.maximum(vol, 1e-6)
+    sqrt_t = np.sqrt(years)
+    d1 = (np.log(spot / strike) + (rate - dividend + 0.5 * vol * vol) * years) / (vol * sqrt_t)
+    d2 = d1 - vol * sqrt_t
+    disc_q = np.exp(-dividend * years)
+    disc_r = np.exp(-rate * years)
+    pdf_d1 = norm_pdf(d1)
+    sign = np.where(is_call, 1.0, -1.0)
+    cdf_d1 = norm_cdf(sign * d1)
+    cdf_d2 = norm_cdf(sign * d2)
+
+    price = sign * (spot * disc_q * cdf_d1 - strike * disc_r * cdf_d2)
+    delta = sign * disc_q * cdf_d1
+    gamma = disc_q * pdf_d1 / (spot * vol * sqrt_t)
+    vega = spot * disc_q * pdf_d1 * sqrt_t / 100
+    theta = (-spot * disc_q * pdf_d1 * vol / (2 * sqrt_t)
+             + sign * (dividend * spot * disc_q * cdf_d1 - rate * strike * disc_r * cdf_d2)) / 365
+    return {'Price': price, 'Delta': delta, 'Gamma': gamma, 'Vega': vega, 'Theta': theta}
+
+
+def book_greeks(positions, surface, spot, rate=DEFAULT_RATE, dividend=DEFAULT_DIVIDEND,
+                multiplier=CONTRACT_MULTIPLIER):
+    """Position-scaled greeks for every line of ``positions``."""
+    strike = positions['Strike'].to_numpy('float64')
+    days = positions['Expiry_Days'].to_numpy('float64')
+    is_call = positions['Option_Type'].astype(str).str.upper().str.startswith('C').to_numpy()
+    size = positions['Quantity'].to_numpy('float64') * multiplier
+
+    vol = interpolate_vol(surface_grid(surface), strike / spot, days)
+    unit = black_scholes_greeks(spot, strike, days / 365, vol, is_call, rate, dividend)
+    lines = positions.copy()
+    lines['Implied_Vol'] = vol * 100
+    lines['Market_Value'] = unit['Price'] * size
+    for greek in GREEK_COLUMNS:
+        lines[greek] = unit[greek] * size
+    return lines
+
+
+def summarize_book(lines):
+    """Greeks per ``Position`` plus the underlying units needed to flatten delta."""
+    summary = lines.groupby('Position', sort=False, observed=True)[
+        ['Market_Value'] + GREEK_COLUMNS].sum().reset_index()
+    summary['Hedge_Shares_Needed'] = -summary['Delta']
+    return summary
+
@@ -0,0 +1,141 @@
+"""Shared poller for the live market snapshot.
+
+One ``LivePoller`` per server process watches ``live_market_snapshot.csv``
+on a background thread.  Every tick costs one ``stat``; only when the size
+or mtime changes is the file re-parsed (straight from the CSV, skipping the
+columnar cache, which would otherwise be rewritten every tick).  Rows newer
+than the last one seen are appended to a fixed-size ring buffer, so the
+latest snapshot and the intraday history are in-memory reads for every
+session.
+
+Sessions render from the buffer inside ``st.fragment`` blocks that rerun on
+their own cadence: a tick redraws a few metrics and one chart, not the
+whole script.  ``version`` counts appended snapshots; the history frame is
+rebuilt at most once per version and shared.  Process-level consumers (the
+alert monitor) ``subscribe`` to receive each batch of new rows on the
+poller thread.
+"""
+
+import logging
+import threading
+from collections import deque
+
+import pandas as pd
+
+from data_store import TableLoadError
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_TABLE = 'live_market_snapshot'
+POLL_SECONDS = 1.0
+BUFFER_ROWS = 3600
+STOP_TIMEOUT = 5.0
+
+
+class LivePoller:
+    """Background watcher appending new snapshot rows to a ring buffer."""
+
+    def __init__(self, store, name=SNAPSHOT_TABLE, interval=POLL_SECONDS, capacity=BUFFER_ROWS):
+        self.store = store
+        self.name = name
+        self.interval = interval
+        self.error = None
+        self.version = 0
+        self._rows = deque(maxlen=capacity)
+        self._signature = None
+        self._last_time = None
+        self._frame = (None, pd.DataFrame())
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __len__(self):
+        return len(self._rows)
+
+    def start(self):
+        """Poll once synchronously, then keep polling on a daemon thread."""
+        if self._thread is None:
+            self.poll()
+            self._thread = threading.Thread(target=self._run, name='live-poller', daemon=True)
+            self._thread.start()
+        return self
+
+    def subscribe(self, callback):
+        """Call ``callback(rows)`` with every batch of appended snapshots."""
+        self._listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        """Stop calling ``callback``; unknown callbacks are ignored."""
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def stop(self, timeout=STOP_TIMEOUT):
+        """Stop polling and wait up to ``timeout`` seconds for the thread to exit."""
+        self._stop.set()
+        thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+            if thread.is_alive():
+                logger.warning("Live poller for %s did not stop within %.1fs", self.name, timeout)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception:
+                # Keep the feed alive across one bad tick; the buffer stays as it was
+                logger.exception("Live poll of %s failed", self.name)
+
+    def poll(self):
+        """Check the source once; returns the number of snapshots appended."""
+        try:
+            signature = self.store.signature(self.name)
+            if signature == self._signature:
+                return 0
+            frame = self.store.parse_csv(self.name).to_pandas(date_as_object=False)
+        except TableLoadError as exc:
+            self.error = exc
+            return 0
+        self.error = None
+        self._signature = signature
+        if 'Timestamp' in frame:
+            frame = frame.sort_values('Timestamp')
+            if self._last_time is not None:
+                frame = frame[frame['Timestamp'] > self._last_time]
+        else:
+            # Without timestamps every change of the file is one new snapshot
+            frame = frame.tail(1)
+        if frame.empty:
+            return 0
+        rows = frame.to_dict('records')
+        with self._lock:
+            self._rows.extend(rows)
+            self._last_time = rows[-1].get('Timestamp')
+            self.version += len(rows)
+        for callback in list(self._listeners):
+            try:
+                callback(rows)
+            except Exception:
+                logger.exception("Live snapshot listener %r failed", callback)
+        return len(rows)
+
+    # ------------------------------------------
+    # Reads
+    # ------------------------------------------
+
+    def latest(self, back=0):
+        """The newest snapshot (``back`` rows earlier) as a dict, or None."""
+        with self._lock:
+            return self._rows[-1 - back] if len(self._rows) > back else None
+
+    def history(self):
+        """The buffered snapshots as a DataFrame, oldest first."""
+        with self._lock:
+            version, frame = self._frame
+            if version != self.version:
+                frame = pd.DataFrame(list(self._rows))
+                if 'Timestamp' in frame:
+                    frame = frame.set_index('Timestamp')
+                self._frame = (self.version, frame)
+            return frame
@@ -0,0 +1,331 @@
+"""Next-day volatility models trained walk-forward in a background pool.
+
+Models are written against NumPy alone and predict whole matrices at once:
+
+- ``RidgeModel``: standardized linear ridge regression in closed form
+- ``BoostedTrees``: gradient-boosted regression trees on quantile-binned
+  features.  Each tree is grown level by level; the gradient sums of every
+  (node, feature, bin) come from one ``np.bincount``, so finding all splits
+  of a level is a handful of array operations.  Trees are stored as flat
+  arrays and evaluated for all rows together.
+
+``train`` runs an expanding-window walk-forward: each fold fits on every
+row before its test block, so out-of-sample predictions never see the
+future.  Permutation importance is measured on each fold's test block by
+stacking every (feature, repeat) permutation into one matrix and scoring
+it in a single ``predict`` call.  A final model fitted on all rows gives
+in-sample fitted values over the history and the next-day forecast.
+
+``ModelTrainer`` runs ``train`` on a background thread pool so the page
+never waits for it.  Results are cached in an LRU keyed by the data hash, model and
+hyperparameters, and a request for a run already in flight returns its
+status instead of submitting it twice.  A failed run is reported for
+``FAILURE_TTL`` seconds and then retried on the next request.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+TARGET = 'Target_Vol_Next_Day'
+NAIVE_FEATURE = 'Realized_Vol_20D'
+DEFAULT_SPLITS = 5
+DEFAULT_REPEATS = 10
+MIN_TRAIN_ROWS = 60
+CACHE_ENTRIES = 16
+DEFAULT_WORKERS = 2
+FAILURE_TTL = 60.0
+
+READY, TRAINING, FAILED = 'ready', 'training', 'failed'
+
+
+def frame_hash(frame):
+    """Stable digest of a frame's values and index."""
+    rows = pd.util.hash_pandas_object(frame, index=True).to_numpy()
+    digest = hashlib.sha1(rows.tobytes())
+    digest.update('|'.join(map(str, frame.columns)).encode())
+    return digest.hexdigest()
+
+
+# ==========================================
+# MODELS
+# ==========================================
+
+class RidgeModel:
+    """Ridge regression on standardized features."""
+
+    def __init__(self, alpha=1.0):
+        self.alpha = alpha
+
+    def fit(self, X, y):
+        self.mean = X.mean(axis=0)
+        self.scale = X.std(axis=0)
+        self.scale[self.scale == 0] = 1.0
+        Z = (X - self.mean) / self.scale
+        self.intercept = y.mean()
+        self.coef = np.linalg.solve(Z.T @ Z + self.alpha * np.eye(X.shape[1]), Z.T @ (y - self.intercept))
+        return self
+
+    def predict(self, X):
+        return self.intercept + ((X - self.mean) / self.scale) @ self.coef
+
+
+class BoostedTrees:
+    """Least-squares gradient boosting of histogram-split regression trees."""
+
+    def __init__(self, n_estimators=200, max_depth=3, learning_rate=0.05, min_leaf=10, bins=32,
+                 subsample=0.8, seed=0):
+        self.n_estimators = n_estimators
+        self.max_depth = max_depth
+        self.learning_rate = learning_rate
+        self.min_leaf = min_leaf
+        self.bins = bins
+        self.subsample = subsample
+        self.seed = seed
+
+    def _bin(self, X):
+        return np.stack([np.searchsorted(edges, X[:, j], side='right')
+                         for j, edges in enumerate(self.edges)], axis=1)
+
+    def fit(self, X, y):
+        rng = np.random.default_rng(self.seed)
+        quantiles = np.linspace(0, 1, self.bins + 1)[1:-1]
+        self.edges = [np.unique(np.quantile(X[:, j], quantiles)) for j in range(X.shape[1])]
+        B = self._bin(X)
+        self.base = y.mean()
+        pred = np.full(len(y), self.base)
+        self.trees = []
+        for _ in range(self.n_estimators):
+            rows = rng.random(len(y)) < self.subsample
+            tree = self._grow(B[rows], (y - pred)[rows])
+            self.trees.append(tree)
+            pred += self.learning_rate * self._predict_tree(tree, B)
+        return self
+
+    def _grow(self, B, g):
+        n, f = B.shape
+        size = 2 ** (self.max_depth + 1) - 1
+        feature = np.full(size, -1)
+        split = np.zeros(size, dtype=int)
+        value = np.zeros(size)
+        node = np.zeros(n, dtype=int)
+        value[0] = g.mean() if n else 0.0
+        frontier = np.array([0])
+        for _ in range(self.max_depth):
+            if len(frontier) == 0:
+                break
+            # Gradient sums and counts per (frontier node, feature, bin)
+            slot = np.full(size, -1)
+            slot[frontier] = np.arange(len(frontier))
+            active = slot[node] >= 0
+            k = len(frontier)
+            index = ((slot[node[active]][:, None] * f + np.arange(f)) * self.bins
+                     + B[active]).ravel()
+            sums = np.bincount(index, np.repeat(g[active], f), minlength=k * f * self.bins)
+            counts = np.bincount(index, minlength=k * f * self.bins)
+            sums, counts = sums.reshape(k, f, self.bins), counts.reshape(k, f, self.bins)
+            left_sum, left_n = np.cumsum(sums, axis=2), np.cumsum(counts, axis=2)
+            total_sum, total_n = left_sum[:, :, -1:], left_n[:, :, -1:]
+            right_sum, right_n = total_sum - left_sum, total_n - left_n
+            with np.errstate(invalid='ignore', divide='ignore'):
+                gain = (left_sum ** 2 / left_n + right_sum ** 2 / right_n - total_sum ** 2 / total_n)
+            gain = np.where((left_n >= self.min_leaf) & (right_n >= self.min_leaf), gain, -np.inf)
+            flat = gain.reshape(k, -1)
+            best = flat.argmax(axis=1)
+            splittable = np.isfinite(flat[np.arange(k), best]) & (flat[np.arange(k), best] > 1e-12)
+
+            children = []
+            for i, parent in enumerate(frontier):
+                if not splittable[i]:
+                    continue
+                j, b = divmod(best[i], self.bins)
+                feature[parent], split[parent] = j, b
+                left, right = 2 * parent + 1, 2 * parent + 2
+                value[left] = left_sum[i, j, b] / left_n[i, j, b]
+                value[right] = right_sum[i, j, b] / right_n[i, j, b]
+                children += [left, right]
+            # Route rows of split nodes to their children
+            split_rows = feature[node] >= 0
+            go_left = B[np.arange(n), np.maximum(feature[node], 0)] <= split[node]
+            moved = split_rows & np.isin(node, frontier)
+            node = np.where(moved, np.where(go_left, 2 * node + 1, 2 * node + 2), node)
+            frontier = np.array(children, dtype=int)
+        return feature, split, value
+
+    def _predict_tree(self, tree, B):
+        feature, split, value = tree
+        node = np.zeros(len(B), dtype=int)
+        rows = np.arange(len(B))
+        for _ in range(self.max_depth):
+            inner = feature[node] >= 0
+            go_left = B[rows, np.maximum(feature[node], 0)] <= split[node]
+            node = np.where(inner, np.where(go_left, 2 * node + 1, 2 * node + 2), node)
+        return value[node]
+
+    def predict(self, X):
+        B = self._bin(X)
+        return self.base + self.learning_rate * sum(self._predict_tree(tree, B) for tree in self.trees)
+
+
+MODELS = {'Ridge': RidgeModel, 'Boosted Trees': BoostedTrees}
+
+
+# ==========================================
+# WALK-FORWARD TRAINING
+# ==========================================
+
+def walk_forward_splits(n, splits=DEFAULT_SPLITS, min_train=MIN_TRAIN_ROWS):
+    """``(train_end, test_end)`` row bounds of expanding-window folds."""
+    min_train = min(max(min_train, n // 3), n - splits)
+    bounds = np.linspace(min_train, n, splits + 1).astype(int)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def permutation_importance(model, X, y, repeats=DEFAULT_REPEATS, seed=0):
+    """Increase in test MSE when each feature is shuffled: ``(features, repeats)``."""
+    rng = np.random.default_rng(seed)
+    n, f = X.shape
+    baseline = np.mean((model.predict(X) - y) ** 2)
+    # Every (feature, repeat) permutation stacked into one batch
+    stacked = np.broadcast_to(X, (f, repeats, n, f)).copy()
+    order = rng.permuted(np.broadcast_to(np.arange(n), (f, repeats, n)), axis=2)
+    for j in range(f):
+        stacked[j, :, :, j] = X[order[j], j]
+    pred = model.predict(stacked.reshape(-1, f)).reshape(f, repeats, n)
+    return np.mean((pred - y) ** 2, axis=2) - baseline
+
+
+def train(frame, model='Ridge', params=None, splits=DEFAULT_SPLITS, repeats=DEFAULT_REPEATS,
+          target=TARGET, seed=0):
+    """Walk-forward evaluation, permutation importance and a final fit.
+
+    Returns a dict with ``folds`` (per-fold metrics), ``predictions``
+    (actual, out-of-sample and in-sample fitted values per date),
+    ``importance`` (mean and std of the MSE increase per feature),
+    ``forecast`` (the final model's prediction from the latest row) and
+    ``train_seconds``.
+    """
+    start = time.perf_counter()
+    params = dict(params or {})
+    frame = frame.dropna().sort_index()
+    features = [c for c in frame.columns if c != target]
+    X = frame[features].to_numpy('float64')
+    y = frame[target].to_numpy('float64')
+    naive = frame[NAIVE_FEATURE].to_numpy('float64') if NAIVE_FEATURE in frame else None
+
+    oos = np.full(len(y), np.nan)
+    folds, drops, weights = [], [], []
+    for i, (train_end, test_end) in enumerate(walk_forward_splits(len(y), splits)):
+        fitted = MODELS[model](**params).fit(X[:train_end], y[:train_end])
+        test = slice(train_end, test_end)
+        pred = fitted.predict(X[test])
+        oos[test] = pred
+        err = pred - y[test]
+        folds.append({
+            'Fold': i + 1, 'Train_Rows': train_end, 'Test_Rows': test_end - train_end,
+            'Test_Start': frame.index[train_end], 'RMSE': np.sqrt(np.mean(err ** 2)),
+            'R2': 1 - np.sum(err ** 2) / np.sum((y[test] - y[test].mean()) ** 2),
+            'IC': np.corrcoef(pred, y[test])[0, 1],
+            'Naive_RMSE': np.sqrt(np.mean((naive[test] - y[test]) ** 2)) if naive is not None else np.nan,
+        })
+        drops.append(permutation_importance(fitted, X[test], y[test], repeats, seed + i))
+        weights.append(test_end - train_end)
+
+    drops = np.average(np.stack(drops), axis=0, weights=weights)
+    final = MODELS[model](**params).fit(X, y)
+    tested = ~np.isnan(oos)
+    return {
+        'model': model, 'params': params,
+        'folds': pd.DataFrame(folds),
+        'oos_rmse': float(np.sqrt(np.mean((oos[tested] - y[tested]) ** 2))),
+        'oos_ic': float(np.corrcoef(oos[tested], y[tested])[0, 1]),
+        'predictions': pd.DataFrame({'Actual': y, 'Out_Of_Sample': oos, 'Fitted': final.predict(X)},
+                                    index=frame.index),
+        'importance': pd.DataFrame({'Feature': features, 'Importance': drops.mean(axis=1),
+                                    'Std': drops.std(axis=1)}).sort_values('Importance', ascending=False),
+        'forecast': float(final.predict(X[-1:])[0]),
+        'train_seconds': time.perf_counter() - start,
+    }
+
+
+# ==========================================
+# BACKGROUND TRAINER
+# ==========================================
+
+class ModelTrainer:
+    """Background walk-forward training with an LRU of finished runs."""
+
+    def __init__(self, workers=DEFAULT_WORKERS, entries=CACHE_ENTRIES, failure_ttl=FAILURE_TTL):
+        self.workers = workers
+        self.entries = entries
+        self.failure_ttl = failure_ttl
+        self._pool = None
+        self._cache = OrderedDict()
+        self._pending = {}
+        self._failed = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(frame, model, params, splits=DEFAULT_SPLITS, repeats=DEFAULT_REPEATS):
+        return (frame_hash(frame), model, json.dumps(params, sort_keys=True), splits, repeats)
+
+    def request(self, frame, model='Ridge', params=None, splits=DEFAULT_SPLITS, repeats=DEFAULT_REPEATS):
+        """``(status, result)`` for a run, submitting it if it is not cached or running.
+
+        ``status`` is ``READY`` with the result, ``TRAINING`` with None, or
+        ``FAILED`` with the exception until the failure expires.
+        """
+        params = dict(params or {})
+        key = self.key(frame, model, params, splits, repeats)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return READY, self._cache[key]
+            error = self._failure(key)
+            if error is not None:
+                return FAILED, error
+            if key not in self._pending:
+                if self._pool is None:
+                    # Threads, not processes: results land straight in this cache,
+                    # and spawned workers would re-run the Streamlit script as __main__
+                    self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='ml-train')
+                future = self._pool.submit(train, frame, model, params, splits, repeats)
+                self._pending[key] = future
+                future.add_done_callback(lambda done, key=key: self._store(key, done))
+        return TRAINING, None
+
+    def status(self, key):
+        with self._lock:
+            if key in self._cache:
+                return READY
+            return FAILED if self._failure(key) is not None else TRAINING
+
+    def _failure(self, key):
+        # The error of a recent failed run; expired ones are dropped so the
+        # next request trains again
+        if key not in self._failed:
+            return None
+        failed_at, error = self._failed[key]
+        if time.monotonic() - failed_at > self.failure_ttl:
+            del self._failed[key]
+            return None
+        return error
+
+    def _store(self, key, future):
+        with self._lock:
+            self._pending.pop(key, None)
+            error = future.exception()
+            if error is not None:
+                self._failed[key] = (time.monotonic(), error)
+                while len(self._failed) > self.entries:
+                    self._failed.popitem(last=False)
+                return
+            self._cache[key] = future.result()
+            while len(self._cache) > self.entries:
+                self._cache.popitem(last=False)
@@ -0,0 +1,271 @@
+"""Risk-budget optimizer: risk parity and IR-maximizing strategy weights.
+
+Inputs per strategy:
+
+- information ratio from the fundamental law of active management,
+  ``IR = IC * sqrt(breadth) * TC``
+- annualized covariance of the strategies' daily P&L
+- Barra volatility-factor exposure
+
+Weights ``w`` are shares of the risk budget: ``w >= 0``, ``sum(w) = 1``,
+``w <= max_weight`` and a cap on the book's volatility-factor exposure
+``b'w <= max_exposure``.  A strategy's expected alpha scales with its risk,
+``alpha_i = IR_i * vol_i``, so the portfolio IR is ``alpha'w / sqrt(w'Cw)``.
+
+- Max IR is the tangency portfolio, solved as the convex QP
+  ``min y'Cy  s.t.  alpha'y = 1`` with the constraints made homogeneous in
+  ``y``; ``w = y / sum(y)``.
+- Risk parity (equal risk contributions) is solved by cyclical coordinate
+  descent on Spinu's convex formulation.  When it breaks a constraint, the
+  feasible portfolio closest to it in tracking-error terms is returned.
+
+Both QPs go through ``solve_qp``, an ADMM solver in the style of OSQP
+whose iterates can be warm-started.  ``RiskBudgetOptimizer`` keeps the last
+solution of each objective as the next warm start, so moving a constraint
+slider re-solves in a few iterations, and caches results per constraint set.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+OBJECTIVES = ['Risk Parity', 'Max IR']
+TRADING_DAYS = 252
+CACHE_ENTRIES = 64
+MAX_ITERATIONS = 5000
+TOLERANCE = 1e-6
+RHO_EVERY = 25
+
+
+def fundamental_ir(ic, breadth, tc):
+    """Grinold-Kahn information ratio."""
+    return np.asarray(ic, 'float64') * np.sqrt(np.asarray(breadth, 'float64')) * np.asarray(tc, 'float64')
+
+
+# ==========================================
+# SOLVERS
+# ==========================================
+
+def solve_qp(P, q, A, lower, upper, warm=None, rho=0.1, sigma=1e-6, relax=1.6,
+             tolerance=TOLERANCE, max_iterations=MAX_ITERATIONS):
+    """ADMM for ``min 1/2 x'Px + q'x  s.t.  lower <= Ax <= upper``.
+
+    ``warm`` is a previous ``(x, z, y)`` of the same shapes.  The step size
+    ``rho`` is rebalanced every ``RHO_EVERY`` iterations from the ratio of
+    the primal and dual residuals.  Returns ``((x, z, y), iterations)``.
+    """
+    n, m = P.shape[0], A.shape[0]
+    # Equality rows get a stiffer penalty, as in OSQP
+    equality = np.where(np.isclose(lower, upper), 1e3, 1.0)
+
+    def factor(rho):
+        # Explicit inverse: the system is small and solved once per iteration
+        return np.linalg.inv(P + sigma * np.eye(n) + A.T @ ((rho * equality)[:, None] * A))
+
+    kkt_inv = factor(rho)
+    if warm is not None and warm[0].shape == (n,) and warm[1].shape == (m,):
+        x, z, y = (np.array(v, dtype='float64') for v in warm)
+    else:
+        x, z, y = np.zeros(n), np.zeros(m), np.zeros(m)
+
+    for iteration in range(1, max_iterations + 1):
+        step = rho * equality
+        x_tilde = kkt_inv @ (sigma * x - q + A.T @ (step * z - y))
+        z_tilde = A @ x_tilde
+        x = relax * x_tilde + (1 - relax) * x
+        z_relaxed = relax * z_tilde + (1 - relax) * z
+        z_next = np.clip(z_relaxed + y / step, lower, upper)
+        y = y + step * (z_relaxed - z_next)
+        z = z_next
+        if iteration % 5 == 0:
+            Ax, Px, Aty = A @ x, P @ x, A.T @ y
+            primal = np.abs(Ax - z).max() / max(np.abs(Ax).max(), np.abs(z).max(), 1e-12)
+            dual = np.abs(Px + q + Aty).max() / max(np.abs(Px).max(), np.abs(Aty).max(),
+                                                    np.abs(q).max(), 1e-12)
+            if primal < tolerance and dual < tolerance:
+                break
+            if iteration % RHO_EVERY == 0:
+                ratio = np.sqrt(primal / max(dual, 1e-30))
+                if ratio > 5 or ratio < 0.2:
+                    rho = float(np.clip(rho * ratio, 1e-6, 1e6))
+                    kkt_inv = factor(rho)
+    return (x, z, y), iteration
+
+
+def risk_parity(cov, budgets=None, warm=None, tolerance=1e-10, max_sweeps=500):
+    """Long-only weights whose risk contributions match ``budgets``.
+
+    Cyclical coordinate descent on ``min 1/2 y'Cy - sum(b log y)``; each
+    coordinate step is the positive root of a quadratic.  Returns
+    ``(weights, sweeps)``.
+    """
+    n = len(cov)
+    b = np.full(n, 1 / n) if budgets is None else np.asarray(budgets, 'float64') / np.sum(budgets)
+    diag = np.diagonal(cov)
+    y = np.array(warm, dtype='float64') if warm is not None and len(warm) == n else 1 / np.sqrt(diag)
+    # The optimum has y'Cy = sum(b) = 1; rescale a warm start onto it
+    y *= 1 / np.sqrt(y @ cov @ y)
+    for sweep in range(1, max_sweeps + 1):
+        previous = y.copy()
+        for i in range(n):
+            c = cov[i] @ y - diag[i] * y[i]
+            y[i] = (-c + np.sqrt(c * c + 4 * diag[i] * b[i])) / (2 * diag[i])
+        if np.abs(y - previous).max() < tolerance * np.abs(y).max():
+            break
+    return y / y.sum(), sweep
+
+
+def min_exposure(exposure, max_weight):
+    """Lowest ``b'w`` over the long-only, fully invested, capped weights."""
+    remaining, total = 1.0, 0.0
+    for value in np.sort(exposure):
+        take = min(max_weight, remaining)
+        total += take * value
+        remaining -= take
+        if remaining <= 0:
+            break
+    return total if remaining <= 1e-12 else np.inf
+
+
+def _constraints(n, exposure, max_exposure, max_weight, homogeneous):
+    """Rows of ``lower <= A w <= upper`` for the weight constraints.
+
+    With ``homogeneous`` the budget row is dropped and the caps are written
+    relative to ``sum(w)``, for the scale-free tangency problem.
+    """
+    ones = np.ones(n)
+    rows, lower, upper = [np.eye(n)], [np.zeros(n)], [np.full(n, np.inf)]
+    if homogeneous:
+        if max_weight < 1:
+            rows.append(np.eye(n) - max_weight * ones[None, :])
+            lower.append(np.full(n, -np.inf))
+            upper.append(np.zeros(n))
+        if np.isfinite(max_exposure):
+            rows.append((exposure - max_exposure)[None, :])
+            lower.append([-np.inf])
+            upper.append([0.0])
+    else:
+        rows.append(ones[None, :])
+        lower.append([1.0])
+        upper.append([1.0])
+        upper[0] = np.full(n, max_weight)
+        if np.isfinite(max_exposure):
+            rows.append(exposure[None, :])
+            lower.append([-np.inf])
+            upper.append([max_exposure])
+    return np.vstack(rows), np.concatenate(lower), np.concatenate(upper)
+
+
+# ==========================================
+# OPTIMIZER
+# ==========================================
+
+def inputs_key(names, ir, cov, exposure):
+    digest = hashlib.sha1()
+    digest.update('|'.join(names).encode())
+    for values in (ir, cov, exposure):
+        digest.update(np.ascontiguousarray(values, dtype='float64').tobytes())
+    return digest.hexdigest()
+
+
+class RiskBudgetOptimizer:
+    """Warm-started, cached risk-parity / max-IR solves over one strategy set."""
+
+    def __init__(self, entries=CACHE_ENTRIES):
+        self.entries = entries
+        self._warm = OrderedDict()
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _warm_state(self, key):
+        """Previous solver state for ``key``, refreshed as most recently used."""
+        if key in self._warm:
+            self._warm.move_to_end(key)
+        return self._warm.get(key)
+
+    def _keep_warm(self, key, state):
+        # Bounded like ``_cache``: every new input set adds a key here
+        self._warm[key] = state
+        self._warm.move_to_end(key)
+        while len(self._warm) > self.entries:
+            self._warm.popitem(last=False)
+
+    def solve(self, names, ir, cov, exposure, objective='Risk Parity', max_exposure=np.inf,
+              max_weight=1.0):
+        """Weights and diagnostics for one constraint set.
+
+        ``cov`` is the annualized P&L covariance (any currency scale).
+        Returns ``(table, summary)``: a per-strategy DataFrame and a dict
+        with the portfolio IR, exposure, status, iterations and solve time.
+        """
+        names = list(names)
+        ir, exposure = np.asarray(ir, 'float64'), np.asarray(exposure, 'float64')
+        cov = np.asarray(cov, 'float64')
+        data_key = inputs_key(names, ir, cov, exposure)
+        key = (data_key, objective, float(max_exposure), float(max_weight))
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                table, summary = self._cache[key]
+                return table, dict(summary, cached=True)
+
+            start = time.perf_counter()
+            n = len(names)
+            # Work in units of the average strategy variance
+            scale = np.mean(np.diagonal(cov))
+            C = cov / scale
+            vol = np.sqrt(np.diagonal(C))
+            alpha = ir * vol
+            max_weight = max(float(max_weight), 1 / n)
+            warm_key = (data_key, objective)
+            warmed = warm_key in self._warm or (data_key, 'parity') in self._warm
+
+            status = 'optimal'
+            if min_exposure(exposure, max_weight) > max_exposure + 1e-12:
+                status = 'infeasible'
+                w, iterations = np.full(n, 1 / n), 0
+            elif objective == 'Max IR':
+                A, lower, upper = _constraints(n, exposure, max_exposure, max_weight, homogeneous=True)
+                A = np.vstack([alpha[None, :], A])
+                lower, upper = np.concatenate([[1.0], lower]), np.concatenate([[1.0], upper])
+                state, iterations = solve_qp(C, np.zeros(n), A, lower, upper, warm=self._warm_state(warm_key))
+                self._keep_warm(warm_key, state)
+                y = np.maximum(state[0], 0.0)
+                w = y / y.sum()
+            else:
+                target, sweeps = risk_parity(C, warm=self._warm_state((data_key, 'parity')))
+                self._keep_warm((data_key, 'parity'), target)
+                iterations = sweeps
+                w = target
+                if target.max() > max_weight + 1e-9 or exposure @ target > max_exposure + 1e-9:
+                    # Closest feasible portfolio in tracking error to the parity weights
+                    status = 'constrained'
+                    A, lower, upper = _constraints(n, exposure, max_exposure, max_weight, homogeneous=False)
+                    state, qp_iterations = solve_qp(C, -C @ target, A, lower, upper,
+                                                    warm=self._warm_state(warm_key))
+                    self._keep_warm(warm_key, state)
+                    w = np.clip(state[0], 0.0, None)
+                    w /= w.sum()
+                    iterations += qp_iterations
+
+            risk = np.sqrt(w @ C @ w)
+            contribution = w * (C @ w) / risk ** 2
+            table = pd.DataFrame({
+                'Strategy': names, 'IR': ir, 'Vol': np.sqrt(np.diagonal(cov)),
+                'Vol_Exposure': exposure, 'Weight_Pct': w * 100,
+                'Risk_Contribution_Pct': contribution * 100,
+            })
+            summary = {
+                'objective': objective, 'status': status,
+                'portfolio_ir': float(alpha @ w / risk), 'vol_exposure': float(exposure @ w),
+                'iterations': int(iterations), 'solve_ms': (time.perf_counter() - start) * 1e3,
+                'warm_start': warmed, 'cached': False,
+            }
+            self._cache[key] = (table, summary)
+            while len(self._cache) > self.entries:
+                self._cache.popitem(last=False)
+            return table, summary
@@ -0,0 +1,193 @@
+"""Rolling and period performance statistics from daily strategy P&L.
+
+``PerformanceEngine`` keeps prefix sums over a wide frame of daily P&L (one
+column per strategy, plus their total): the sum of P&L, of squared P&L, of
+squared losses and the count of winning and observed days.  Every statistic
+over a run of days is then a difference of two prefix rows:
+
+- Sharpe: mean / std of daily P&L, annualized by ``sqrt(252)``
+- Sortino: mean / downside deviation ``sqrt(mean(min(pnl, 0)^2))``
+- win rate: winning days / observed days
+
+so a rolling window of any length over any date range is one vectorized
+pass over ``(days, strategies)`` arrays, and the statistics of a whole
+period are O(strategies).  Appending a day adds one prefix row; the arrays
+grow by doubling, so ``append`` is amortized O(strategies).
+
+P&L is centred on a per-strategy offset fixed at ``fit`` time before it is
+squared, which keeps the differenced sums of squares accurate over long
+histories.  Missing days count as unobserved.
+"""
+
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+DEFAULT_WINDOW = 30
+TOTAL = 'Total'
+STRATEGY_COLUMNS = ['Variance_Swap_PnL', 'VIX_Products_PnL', 'ETF_Arb_PnL', 'Skew_Trading_PnL']
+STATISTICS = ['Sharpe', 'Sortino', 'Win_Rate']
+
+# Prefix-sum planes: centred sum, centred sum of squares, raw sum,
+# sum of squared losses, winning days, observed days
+_SUM, _SQ, _RAW, _DOWN, _WINS, _COUNT = range(6)
+
+
+def _moments(pnl, offset):
+    valid = ~np.isnan(pnl)
+    raw = np.where(valid, pnl, 0.0)
+    centred = np.where(valid, pnl - offset, 0.0)
+    loss = np.minimum(raw, 0.0)
+    return np.stack([centred, centred * centred, raw, loss * loss,
+                     (raw > 0).astype('float64'), valid.astype('float64')])
+
+
+def _statistics(sums, annualization=TRADING_DAYS):
+    """Sharpe, Sortino and win rate from differenced prefix sums ``(6, ..., N)``."""
+    count = sums[_COUNT]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = sums[_RAW] / count
+        centred_mean = sums[_SUM] / count
+        variance = (sums[_SQ] - count * centred_mean ** 2) / (count - 1)
+        std = np.sqrt(np.maximum(variance, 0.0))
+        downside = np.sqrt(sums[_DOWN] / count)
+        scale = np.sqrt(annualization)
+        sharpe = np.where((count > 1) & (std > 0), mean / std * scale, np.nan)
+        sortino = np.where((count > 0) & (downside > 0), mean / downside * scale, np.nan)
+        win_rate = np.where(count > 0, sums[_WINS] / count, np.nan)
+    return {'Sharpe': sharpe, 'Sortino': sortino, 'Win_Rate': win_rate}
+
+
+class PerformanceEngine:
+    """Prefix-summed daily P&L with rolling and period statistics."""
+
+    def __init__(self, annualization=TRADING_DAYS, total=True):
+        self.annualization = annualization
+        self.total = total
+        self.columns = None
+        self._dates = np.empty(0, dtype='datetime64[ns]')
+        self._pnl = None
+        self._prefix = None
+        self._offset = None
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def dates(self):
+        return pd.DatetimeIndex(self._dates[:self._size])
+
+    @property
+    def pnl(self):
+        """Daily P&L held by the engine, strategies plus the total column."""
+        return pd.DataFrame(self._pnl[:self._size], index=self.dates, columns=self.columns)
+
+    def _wide(self, pnl):
+        pnl = pnl.astype('float64')
+        if self.total:
+            pnl = pnl.assign(**{TOTAL: pnl.sum(axis=1, min_count=1)})
+        return pnl
+
+    def fit(self, pnl):
+        """Full pass over ``pnl`` (DataFrame, dates x strategies)."""
+        wide = self._wide(pnl.sort_index())
+        values = wide.to_numpy()
+        self.columns = list(wide.columns)
+        self._offset = np.nan_to_num(np.nanmean(values, axis=0)) if len(values) else np.zeros(values.shape[1])
+        capacity = max(2 * len(values), 64)
+        self._dates = np.empty(capacity, dtype='datetime64[ns]')
+        self._pnl = np.empty((capacity, values.shape[1]))
+        self._prefix = np.zeros((6, capacity + 1, values.shape[1]))
+        self._size = len(values)
+        self._dates[:self._size] = wide.index.to_numpy('datetime64[ns]')
+        self._pnl[:self._size] = values
+        self._prefix[:, 1:self._size + 1] = np.cumsum(_moments(values, self._offset), axis=1)
+        return self
+
+    def append(self, date, row):
+        """Add one day (``row`` aligned with the strategy columns): amortized O(N)."""
+        row = np.asarray(row, dtype='float64')
+        if self.total:
+            row = np.append(row, np.nan if np.isnan(row).all() else np.nansum(row))
+        if self._size == len(self._dates):
+            self._grow()
+        self._dates[self._size] = np.datetime64(pd.Timestamp(date), 'ns')
+        self._pnl[self._size] = row
+        self._prefix[:, self._size + 1] = self._prefix[:, self._size] + _moments(row, self._offset)
+        self._size += 1
+
+    def _grow(self):
+        capacity = 2 * len(self._dates)
+        dates = np.empty(capacity, dtype='datetime64[ns]')
+        pnl = np.empty((capacity, self._pnl.shape[1]))
+        prefix = np.zeros((6, capacity + 1, self._pnl.shape[1]))
+        dates[:self._size] = self._dates[:self._size]
+        pnl[:self._size] = self._pnl[:self._size]
+        prefix[:, :self._size + 1] = self._prefix[:, :self._size + 1]
+        self._dates, self._pnl, self._prefix = dates, pnl, prefix
+
+    def sync(self, pnl):
+        """Bring the engine up to date with ``pnl``.
+
+        New trailing days go through ``append``; new strategies or an edited
+        history trigger a full ``fit``.
+        """
+        pnl = pnl.sort_index()
+        strategies = self.columns[:-1] if self.total and self.columns else self.columns
+        known = self._size
+        if (self._prefix is None or list(pnl.columns) != strategies or len(pnl) < known
+                or not np.array_equal(pnl.index[:known].to_numpy('datetime64[ns]'), self._dates[:known])
+                or not np.allclose(pnl.to_numpy('float64')[:known], self._pnl[:known, :len(strategies)],
+                                   equal_nan=True)):
+            return self.fit(pnl)
+        for date, row in zip(pnl.index[known:], pnl.to_numpy('float64')[known:]):
+            self.append(date, row)
+        return self
+
+    # ------------------------------------------
+    # Statistics
+    # ------------------------------------------
+
+    def _span(self, start=None, end=None):
+        dates = self._dates[:self._size]
+        lo = 0 if start is None else int(np.searchsorted(dates, np.datetime64(pd.Timestamp(start), 'ns')))
+        if end is None:
+            hi = self._size
+        else:
+            end = pd.Timestamp(end)
+            # A bare date includes that whole day
+            if end == end.normalize():
+                end += pd.Timedelta(days=1) - pd.Timedelta(1, 'ns')
+            hi = int(np.searchsorted(dates, np.datetime64(end, 'ns'), side='right'))
+        return lo, max(hi, lo)
+
+    def rolling(self, window=DEFAULT_WINDOW, start=None, end=None):
+        """Trailing ``window``-day statistics for each day in ``[start, end]``.
+
+        Returns ``{statistic: DataFrame(dates x columns)}``.  Windows reach
+        back before ``start``; days with fewer than ``window`` days of
+        history are NaN.
+        """
+        lo, hi = self._span(start, end)
+        rows = np.arange(lo + 1, hi + 1)
+        before = np.maximum(rows - window, 0)
+        sums = self._prefix[:, rows] - self._prefix[:, before]
+        stats = _statistics(sums, self.annualization)
+        short = (rows < window)[:, None]
+        index = pd.DatetimeIndex(self._dates[lo:hi], name='Date')
+        return {name: pd.DataFrame(np.where(short, np.nan, values), index=index, columns=self.columns)
+                for name, values in stats.items()}
+
+    def period(self, start=None, end=None):
+        """Statistics over all days in ``[start, end]``, one row per column."""
+        lo, hi = self._span(start, end)
+        sums = self._prefix[:, hi] - self._prefix[:, lo]
+        stats = _statistics(sums, self.annualization)
+        cumulative = np.nancumsum(self._pnl[lo:hi], axis=0)
+        drawdown = (np.maximum.accumulate(np.maximum(cumulative, 0.0), axis=0) - cumulative).max(axis=0) \
+            if hi > lo else np.full(len(self.columns), np.nan)
+        return pd.DataFrame({
+            'PnL': sums[_RAW], 'Days': sums[_COUNT].astype(int), **stats,
+            'Max_Drawdown': drawdown,
+        }, index=pd.Index(self.columns, name='Strategy'))
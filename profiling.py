@@ -0,0 +1,233 @@
+"""Opt-in per-rerun profiling: timing spans, memory deltas and cProfile dumps.
+
+A ``Profiler`` records nested spans for one script run: the rerun itself,
+the page branch, every table load and every ``st.plotly_chart`` /
+``st.dataframe`` call.  Each span keeps its wall time, its self time
+(excluding child spans) and the change in ``tracemalloc``-traced memory.
+``tracemalloc`` is process-wide and shared by every profiled session, so a
+run's peak is measured above its own starting memory and the global peak is
+never reset.
+When a run finishes the spans are written as one JSON log line on the
+``profiling`` logger and, optionally, a cProfile dump is saved.
+
+``install`` wraps the Streamlit render calls once per process.  The
+wrappers look up the profiler of the calling script thread, so sessions do
+not see each other's spans; with profiling off a render call costs one
+thread-local lookup and every ``span`` is a shared no-op context.
+"""
+
+import contextlib
+import cProfile
+import functools
+import io
+import json
+import logging
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+from streamlit.delta_generator import DeltaGenerator
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DIR = '.profiles'
+RENDER_CALLS = {'plotly_chart': 'chart', 'dataframe': 'table'}
+TOP_FUNCTIONS = 15
+
+_active = threading.local()
+_tracing = {'sessions': 0, 'lock': threading.Lock()}
+_NO_SPAN = contextlib.nullcontext()
+
+
+def _traced_bytes():
+    return tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+
+
+def _start_tracing():
+    with _tracing['lock']:
+        if _tracing['sessions'] == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _tracing['sessions'] += 1
+
+
+def _stop_tracing():
+    # tracemalloc is process-wide: stop only when no profiled run is left
+    with _tracing['lock']:
+        _tracing['sessions'] = max(_tracing['sessions'] - 1, 0)
+        if _tracing['sessions'] == 0 and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+class Span:
+    __slots__ = ('name', 'kind', 'depth', 'start', 'elapsed', 'children', 'mem_start', 'mem_delta')
+
+    def __init__(self, name, kind, depth):
+        self.name = name
+        self.kind = kind
+        self.depth = depth
+        self.elapsed = 0.0
+        self.children = 0.0
+        self.mem_delta = 0
+        self.mem_start = _traced_bytes()
+        self.start = time.perf_counter()
+
+
+class Profiler:
+    """Spans of one script run; a disabled profiler records nothing."""
+
+    def __init__(self, enabled=False, cprofile=False, profile_dir=PROFILE_DIR):
+        self.enabled = enabled
+        self.page = None
+        self.spans = []
+        self.peak_mb = None
+        self.dump_path = None
+        self.top_functions = None
+        self._stack = []
+        self._cprofile = cProfile.Profile() if enabled and cprofile else None
+        self._profile_dir = profile_dir
+        self._finished = not enabled
+        if enabled:
+            _start_tracing()
+            self._mem_start, self._peak_start = tracemalloc.get_traced_memory()
+            self._mem_high = self._mem_start
+            if self._cprofile is not None:
+                self._cprofile.enable()
+            self.begin('rerun', 'rerun')
+
+    def span(self, name, kind):
+        """Context timing ``name``; a shared no-op when profiling is off."""
+        if not self.enabled:
+            return _NO_SPAN
+        return self._span(name, kind)
+
+    @contextlib.contextmanager
+    def _span(self, name, kind):
+        self.begin(name, kind)
+        try:
+            yield
+        finally:
+            self.end()
+
+    def begin(self, name, kind):
+        if self.enabled:
+            span = Span(name, kind, len(self._stack))
+            self.spans.append(span)
+            self._stack.append(span)
+
+    def end(self):
+        if self.enabled and self._stack:
+            span = self._stack.pop()
+            span.elapsed = time.perf_counter() - span.start
+            current = _traced_bytes()
+            span.mem_delta = current - span.mem_start
+            self._mem_high = max(self._mem_high, current)
+            if self._stack:
+                self._stack[-1].children += span.elapsed
+
+    def finish(self):
+        """Close open spans, stop tracing, log the run and write the cProfile dump."""
+        if self._finished:
+            return
+        self._finished = True
+        while self._stack:
+            self.end()
+        # The process peak counts only if it was raised during this run;
+        # otherwise the highest memory seen at a span boundary stands in
+        current, peak = tracemalloc.get_traced_memory()
+        high = max(self._mem_high, current, peak if peak > self._peak_start else 0)
+        self.peak_mb = (high - self._mem_start) / 2 ** 20
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            self._dump()
+        logger.info(json.dumps(self.record(), default=str))
+        _stop_tracing()
+        # Render calls made after this point (the panel itself) are not recorded
+        self.enabled = False
+
+    # ------------------------------------------
+    # Reports
+    # ------------------------------------------
+
+    def table(self):
+        """One row per span, in start order, indented by nesting depth."""
+        return pd.DataFrame([{
+            'Span': '  ' * s.depth + s.name, 'Kind': s.kind,
+            'Total_ms': s.elapsed * 1e3, 'Self_ms': (s.elapsed - s.children) * 1e3,
+            'Mem_Delta_MB': s.mem_delta / 2 ** 20,
+        } for s in self.spans])
+
+    def breakdown(self):
+        """Self time by kind; the rerun's and page's own time is the transform work."""
+        totals = {}
+        for s in self.spans:
+            kind = 'transform' if s.kind in ('rerun', 'page') else s.kind
+            totals[kind] = totals.get(kind, 0.0) + (s.elapsed - s.children) * 1e3
+        return pd.Series(totals, name='ms').sort_values(ascending=False)
+
+    def record(self):
+        return {
+            'event': 'rerun', 'page': self.page,
+            'total_ms': round(self.spans[0].elapsed * 1e3, 3) if self.spans else 0.0,
+            'peak_mb': None if self.peak_mb is None else round(self.peak_mb, 3),
+            'spans': [{'name': s.name, 'kind': s.kind, 'depth': s.depth,
+                       'ms': round(s.elapsed * 1e3, 3), 'self_ms': round((s.elapsed - s.children) * 1e3, 3),
+                       'mem_delta_kb': round(s.mem_delta / 1024, 1)} for s in self.spans],
+            'cprofile': self.dump_path,
+        }
+
+    def _dump(self):
+        os.makedirs(self._profile_dir, exist_ok=True)
+        label = ''.join(c for c in (self.page or 'rerun') if c.isalnum() or c in ' _-').strip().replace(' ', '_')
+        self.dump_path = os.path.join(self._profile_dir,
+                                      f"{label or 'page'}-{datetime.now():%Y%m%d-%H%M%S}.prof")
+        self._cprofile.dump_stats(self.dump_path)
+        out = io.StringIO()
+        pstats.Stats(self._cprofile, stream=out).sort_stats('cumulative').print_stats(TOP_FUNCTIONS)
+        self.top_functions = out.getvalue()
+
+
+# ==========================================
+# SCRIPT-THREAD HOOKS
+# ==========================================
+
+def start(enabled=False, cprofile=False, state=None):
+    """Profiler for the run on this thread, finishing any run left unfinished.
+
+    ``state`` (the session state) carries the previous run across reruns,
+    which Streamlit may execute on a new thread.
+    """
+    for previous in (getattr(_active, 'profiler', None), (state or {}).get('_profiler')):
+        if previous is not None:
+            previous.finish()
+    _active.profiler = Profiler(enabled, cprofile)
+    if state is not None:
+        state['_profiler'] = _active.profiler
+    return _active.profiler
+
+
+def _timed_render(kind, render):
+    @functools.wraps(render)
+    def timed(*args, **kwargs):
+        profiler = getattr(_active, 'profiler', None)
+        if profiler is None or not profiler.enabled:
+            return render(*args, **kwargs)
+        with profiler.span(render.__name__, kind):
+            return render(*args, **kwargs)
+    timed.__profiled__ = True
+    return timed
+
+
+def install():
+    """Wrap the render calls in ``RENDER_CALLS`` (idempotent)."""
+    for name, kind in RENDER_CALLS.items():
+        # ``st.<call>`` is bound to the main container at import time, so
+        # both it and the method used by columns/containers are wrapped
+        for owner in (DeltaGenerator, st):
+            render = getattr(owner, name)
+            if not getattr(render, '__profiled__', False):
+                setattr(owner, name, _timed_render(kind, render))
@@ -0,0 +1,221 @@
+"""Per-table dtype registry applied when a CSV is first parsed.
+
+Each entry lists, for one CSV:
+
+- ``index``: timestamp column parsed once into a ``DatetimeIndex``
+- ``dates``: other timestamp columns kept as ``datetime64`` columns
+- ``categories``: label columns stored as categoricals; a dict maps a column
+  to its ordered levels, and a label outside them fails the load
+- ``float32`` / ``int32`` / ``int16``: numeric columns that can be narrowed
+  without losing meaningful precision
+
+Prices that feed arbitrage spreads and every USD P&L column stay float64.
+Columns that are absent from a file are skipped, so a schema never blocks a
+table from loading.
+"""
+
+import hashlib
+import json
+
+import pandas as pd
+
+PRIORITY_LEVELS = ['LOW', 'MEDIUM', 'HIGH', 'CRITICAL']
+
+SCHEMAS = {
+    'vix_term_structure': {
+        'categories': ['Tenor'],
+        'float32': ['Implied_Vol'],
+        'int16': ['Days_To_Maturity'],
+    },
+    'volatility_surface': {
+        'float32': ['Moneyness', 'Implied_Vol'],
+        'int16': ['Maturity_Days'],
+    },
+    'barra_factors': {
+        'categories': ['Factor'],
+        'float32': ['Exposure', 'Factor_Return', 'Contribution_to_Risk'],
+    },
+    'variance_premium': {
+        'index': 'Date',
+        'float32': ['VIX', 'Realized_Vol', 'Variance_Risk_Premium'],
+    },
+    'factor_attribution': {
+        'float32': ['Return_Contribution', 'Risk_Contribution'],
+    },
+    'vol_regime': {
+        'index': 'Date',
+        'categories': ['Regime'],
+        'float32': ['VIX', 'SPX_Return'],
+        'int32': ['Day'],
+    },
+    'trade_signals': {
+        'categories': ['Risk_Level'],
+    },
+    'portfolio_greeks': {
+        'float32': ['VRP_Sensitivity'],
+    },
+    'etf_arbitrage_microstructure': {
+        'index': 'Timestamp',
+        'categories': ['Vol_Regime'],
+        'float32': ['Premium_Discount_bps', 'VPIN_Toxicity', 'Bid_Ask_Spread_bps'],
+        'int32': ['Creation_Units', 'Redemption_Units', 'Net_Flow'],
+    },
+    'grinold_kahn_strategies': {
+        'int32': ['Breadth'],
+    },
+    'alpha_factors_ml': {
+        'index': 'Date',
+        'float32': ['Realized_Vol_20D', 'VPIN_Toxicity', 'Order_Imbalance', 'VIX_Level',
+                    'Term_Structure_Slope', 'Target_Vol_Next_Day'],
+    },
+    'order_flow_toxicity': {
+        'index': 'Date',
+        'categories': {'Toxicity_Regime': ['Low', 'Normal', 'High']},
+        'float32': ['VPIN', 'Buy_Volume_Pct', 'Sell_Volume_Pct', 'Volume_Imbalance',
+                    'High_Frequency_Participation'],
+    },
+    'etf_basket_composition': {
+        'dates': ['Date'],
+        'float32': ['Weight_Pct', 'Liquidity_Score', 'Basket_Alignment', 'Trading_Cost_bps'],
+        'int16': ['Holding_Rank'],
+    },
+    'risk_budgeting_optimization': {
+        'float32': ['Risk_Budget_Pct', 'Expected_IC', 'Transfer_Coef', 'Barra_Vol_Exposure',
+                    'Expected_IR'],
+        'int32': ['Annual_Breadth'],
+    },
+    'ml_feature_importance': {
+        'categories': ['Feature_Category'],
+        'float32': ['Random_Forest_Importance', 'XGBoost_Importance'],
+    },
+    'global_equity_dislocations': {
+        'index': 'Date',
+        'categories': ['Arbitrage_Opportunity'],
+        'float32': ['US_RV', 'Europe_RV', 'Asia_RV', 'Cross_Region_Correlation',
+                    'Dislocation_Score', 'Spillover_Intensity'],
+    },
+    'variance_swap_pricing': {
+        'index': 'Date',
+        'float32': ['ATM_IV'],
+    },
+    'dividend_futures_arbitrage': {
+        'dates': ['Quarter'],
+        'categories': ['Trade_Signal'],
+        'float32': ['Expected_Div_Points', 'Implied_Div_Points', 'Realized_Div_Points',
+                    'Arb_Spread_bps'],
+    },
+    'vix_term_structure_forecast': {
+        'index': 'Date',
+        'categories': ['Term_Structure_Regime', 'Trade_Recommendation'],
+        'float32': ['VIX_Spot', 'VIX_1M_Future', 'VIX_2M_Future', 'VIX_3M_Future',
+                    'Roll_Yield_1M_pct', 'Mean_Reversion_Signal', 'Forecast_7D'],
+    },
+    'option_greeks_dynamic_hedging': {
+        'index': 'Date',
+        'float32': ['Total_Delta', 'Total_Gamma', 'Total_Vega', 'Total_Theta',
+                    'Hedge_Shares_Needed'],
+    },
+    'volatility_forecasting_models': {
+        'index': 'Date',
+        'float32': ['Realized_Vol_20D', 'EWMA_Forecast', 'GARCH_Forecast', 'Vol_Cone_50pct',
+                    'Vol_Cone_75pct', 'Vol_Cone_90pct', 'Actual_Future_Vol',
+                    'Forecast_Error_EWMA', 'Forecast_Error_GARCH'],
+    },
+    'live_market_snapshot': {
+        'dates': ['Timestamp'],
+        'categories': ['Market_Status'],
+    },
+    'trade_execution_journal': {
+        'dates': ['Entry_Date', 'Exit_Date'],
+        'categories': ['Strategy', 'Direction', 'Status'],
+    },
+    'alert_rules': {
+        'categories': {'Priority': PRIORITY_LEVELS},
+    },
+    'alert_history': {
+        'dates': ['Timestamp'],
+        'categories': {'Alert_Name': None, 'Priority': PRIORITY_LEVELS, 'Status': None,
+                       'Action_Taken': None},
+        'float32': ['Triggered_Value'],
+    },
+    'scenario_analysis': {
+        'float32': ['SPX_Move_Pct', 'VIX_Level', 'US_EU_Correlation', 'Max_Drawdown_Pct',
+                    'Probability_Estimate'],
+        'int16': ['Recovery_Days'],
+    },
+    'research_daily_notes': {
+        'dates': ['Date'],
+        'categories': ['Term_Structure'],
+        'float32': ['VIX_Close', 'VIX_Change', 'VRP'],
+    },
+    'performance_attribution_daily': {
+        'index': 'Date',
+        'float32': ['Sharpe_30D', 'Sortino_30D', 'Win_Rate_30D'],
+    },
+    'economic_calendar': {
+        'dates': ['Event_Date'],
+        'categories': {'Priority': PRIORITY_LEVELS, 'Expected_Impact': None},
+        'float32': ['Avg_VIX_Move_Historical', 'Last_5_Events_Avg_Move'],
+        'int16': ['Days_Until'],
+    },
+    'option_positions': {
+        'categories': ['Position', 'Option_Type'],
+        'int16': ['Expiry_Days'],
+        'int32': ['Quantity'],
+    },
+    'etf_constituent_ticks': {
+        'dates': ['Timestamp'],
+        'int16': ['Holding_Rank'],
+        'int32': ['Net_Flow'],
+    },
+    'correlation_network': {
+        'categories': ['Strategy_1', 'Strategy_2', 'Relationship', 'Diversification_Benefit'],
+        'float32': ['Correlation'],
+    },
+}
+
+
+def schema_fingerprint(name):
+    """Short hash of a table's schema, stored with cached copies of it."""
+    spec = json.dumps(SCHEMAS.get(name, {}), sort_keys=True)
+    return hashlib.sha1(spec.encode()).hexdigest()[:12]
+
+
+def apply_schema(name, frame):
+    """Return ``frame`` with the registered dtypes for table ``name``."""
+    schema = SCHEMAS.get(name)
+    if not schema or frame.empty:
+        return frame
+
+    columns = {}
+    index = schema.get('index')
+    for col in schema.get('dates', []) + ([index] if index else []):
+        if col in frame:
+            columns[col] = pd.to_datetime(frame[col])
+
+    categories = schema.get('categories', {})
+    if isinstance(categories, list):
+        categories = dict.fromkeys(categories)
+    for col, levels in categories.items():
+        if col in frame:
+            if levels is None:
+                columns[col] = frame[col].astype('category')
+            else:
+                typed = frame[col].astype(pd.CategoricalDtype(levels, ordered=True))
+                # The cast maps labels outside ``levels`` to NaN without a word
+                unknown = typed.isna() & frame[col].notna()
+                if unknown.any():
+                    labels = sorted(map(str, frame[col][unknown].unique()))
+                    raise ValueError(f"column {col} has labels outside its levels: {', '.join(labels)}")
+                columns[col] = typed
+
+    for dtype in ('float32', 'int32', 'int16'):
+        for col in schema.get(dtype, []):
+            # Integer columns with gaps keep pandas' float representation
+            if col in frame and (dtype == 'float32' or not frame[col].isna().any()):
+                columns[col] = frame[col].astype(dtype)
+
+    frame = frame.assign(**columns)
+    if index and index in frame:
+        frame = frame.set_index(index)
+    return frame
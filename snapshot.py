@@ -0,0 +1,456 @@
+"""Static snapshot build: every sidebar page rendered to HTML and JSON.
+
+Each page of ``app.py`` is run headlessly with Streamlit's ``AppTest`` and
+its element tree is written out twice:
+
+- ``data/<page>.json``: the page's elements (text, metrics, tables as
+  ``split`` records, Plotly figure specs, widget values) for other tools
+- ``<page>.html``: a static page drawing the same elements, with the
+  figures rendered client-side by one shared ``assets/plotly.min.js``
+
+so read-only viewers can be served the directory by any static file server
+while analysts who need the controls use the Streamlit app.  Widgets are
+shown with the default values the page was built with.
+
+Pages are rendered in parallel on a spawn process pool; each worker keeps
+one ``AppTest`` (and so its warm caches) for all the pages it renders.
+While a page runs, every table whose signature is read through
+``DataStore`` is recorded as one of its inputs.  ``manifest.json`` keeps the
+content hash of each page's inputs and of the app's code, and a rebuild
+renders only the pages where one of them changed.  Inputs are hashed once,
+before rendering; a page whose input tables change while the build runs, or
+that renders an error, is failed: it is left out of the manifest, so the
+next build tries it again::
+
+    python snapshot.py --out snapshot
+    python snapshot.py --out snapshot --pages Performance "VIX" --workers 2
+"""
+
+import argparse
+import contextlib
+import glob
+import hashlib
+import html
+import json
+import logging
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from multiprocessing import get_context
+
+import pandas as pd
+import plotly.offline
+from streamlit import logger as streamlit_logger
+from streamlit.testing.v1 import AppTest
+
+from data_store import TABLES, DataStore, file_digest
+from live_feed import SNAPSHOT_TABLE
+
+logger = logging.getLogger(__name__)
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(APP_DIR, 'app.py')
+PAGE_RADIO = "Select Analysis"
+DEFAULT_OUT = 'snapshot'
+DEFAULT_TIMEOUT = 300
+MAX_TABLE_ROWS = 500
+# Background work (model training) shows an hourglass status until done
+PENDING_MARK = '⏳'
+PENDING_POLL_SECONDS = 0.5
+
+PAGE_CSS = """
+body { font-family: -apple-system, 'Segoe UI', Roboto, sans-serif; margin: 0; color: #0F172A; }
+nav { position: fixed; top: 0; bottom: 0; width: 230px; overflow-y: auto; background: #F1F5F9;
+      padding: 16px; box-sizing: border-box; }
+nav a { display: block; padding: 4px 0; color: #1E3A8A; text-decoration: none; }
+nav a.current { font-weight: 700; }
+main { margin-left: 250px; padding: 16px 32px; max-width: 1200px; }
+.row { display: flex; gap: 16px; } .col { flex: 1; min-width: 0; }
+.metric { padding: 8px 0; } .metric .label { font-size: 0.85rem; color: #475569; }
+.metric .value { font-size: 1.8rem; } .metric .delta { font-size: 0.85rem; color: #64748B; }
+.alert { padding: 10px 14px; border-radius: 6px; margin: 8px 0; background: #EFF6FF; }
+.alert.warning { background: #FEF9C3; } .alert.error { background: #FEE2E2; }
+.alert.success { background: #DCFCE7; }
+.widget { font-size: 0.85rem; color: #475569; margin: 6px 0; }
+.table { overflow-x: auto; max-height: 420px; } table { border-collapse: collapse; font-size: 0.8rem; }
+td, th { border-bottom: 1px solid #E2E8F0; padding: 3px 8px; text-align: right; }
+.stamp { color: #64748B; font-size: 0.8rem; }
+"""
+
+
+def slug(page):
+    """File name stem of a page: its words, lower-cased and hyphenated."""
+    return re.sub(r'[^a-z0-9]+', '-', page.lower()).strip('-') or 'page'
+
+
+def code_digest(app_dir=APP_DIR):
+    """Hash of every Python module of the app: a code change rebuilds every page."""
+    digest = hashlib.sha1()
+    for path in sorted(glob.glob(os.path.join(app_dir, '*.py'))):
+        digest.update(os.path.basename(path).encode())
+        with open(path, 'rb') as fh:
+            digest.update(fh.read())
+    return digest.hexdigest()
+
+
+def table_digests(app_dir=APP_DIR):
+    store = DataStore(app_dir)
+    return {name: file_digest(store.path(name)) for name in TABLES if os.path.exists(store.path(name))}
+
+
+# ==========================================
+# RENDERING (WORKER PROCESSES)
+# ==========================================
+
+_app = None
+
+
+def _worker_app(app_path, timeout):
+    # One AppTest per worker process, reused (with its caches) for every page
+    global _app
+    if _app is None:
+        _app = AppTest.from_file(app_path, default_timeout=timeout)
+        _app.run()
+        # Set after the first run, which loads the config and its log level;
+        # otherwise every page logs the same deprecation warnings again
+        streamlit_logger.set_log_level('error')
+    return _app
+
+
+@contextlib.contextmanager
+def recorded_tables():
+    """Names of the tables whose signature is read inside the block."""
+    names = set()
+    signature = DataStore.signature
+
+    def recording(store, name):
+        names.add(name)
+        return signature(store, name)
+
+    DataStore.signature = recording
+    try:
+        yield names
+    finally:
+        DataStore.signature = signature
+
+
+def _select(at, page):
+    radio = next(r for r in at.sidebar.radio if r.label.startswith(PAGE_RADIO))
+    radio.set_value(page)
+
+
+def _pending(at):
+    # A leading emoji in an alert's text is split off into its icon
+    return any(e.icon == PENDING_MARK for e in at.info)
+
+
+def _element(node):
+    """Serializable dict for one element-tree node (None to skip it)."""
+    kind = getattr(node, 'type', type(node).__name__.lower())
+    children = [c for c in (_element(child) for child in getattr(node, 'children', {}).values()) if c]
+    if kind in ('flex_container', 'vertical', 'horizontal', 'column', 'container', 'tab', 'expander'):
+        block = {'type': 'column' if kind == 'column' else 'block', 'children': children}
+        if kind == 'flex_container' and children and all(c['type'] == 'column' for c in children):
+            block['type'] = 'row'
+        if kind in ('expander', 'tab'):
+            block.update(type='expander', label=getattr(node, 'label', ''))
+        return block
+    if children:
+        return {'type': 'block', 'children': children}
+    if kind in ('title', 'header', 'subheader', 'caption', 'code', 'latex'):
+        return {'type': kind, 'text': node.value}
+    if kind == 'markdown':
+        return {'type': 'markdown', 'text': node.value, 'html': bool(node.proto.allow_html)}
+    if kind in ('info', 'warning', 'error', 'success', 'exception'):
+        return {'type': 'alert', 'level': kind, 'text': str(getattr(node, 'value', '')),
+                'icon': getattr(node, 'icon', '') or ''}
+    if kind == 'metric':
+        return {'type': 'metric', 'label': node.label, 'value': node.value, 'delta': node.delta or None}
+    if kind in ('dataframe', 'table'):
+        frame = node.value
+        return {'type': 'table', 'rows': len(frame),
+                'data': json.loads(frame.head(MAX_TABLE_ROWS).to_json(orient='split', date_format='iso'))}
+    if kind == 'plotly_chart':
+        return {'type': 'figure', 'spec': json.loads(node.proto.spec)}
+    if hasattr(node, 'label') and hasattr(node, 'value'):
+        value = node.value
+        return {'type': 'widget', 'kind': kind, 'label': node.label,
+                'value': value if isinstance(value, (str, int, float, bool, type(None))) else str(value)}
+    return None
+
+
+def page_names(app_path=APP_PATH, timeout=DEFAULT_TIMEOUT):
+    """Options of the sidebar page radio."""
+    at = _worker_app(app_path, timeout)
+    return list(next(r for r in at.sidebar.radio if r.label.startswith(PAGE_RADIO)).options)
+
+
+def render_page(page, app_path=APP_PATH, timeout=DEFAULT_TIMEOUT):
+    """Run one page headlessly; its elements, input tables and errors."""
+    start = time.perf_counter()
+    at = _worker_app(app_path, timeout)
+    with recorded_tables() as tables:
+        _select(at, page)
+        at.run()
+        deadline = time.monotonic() + timeout
+        while _pending(at) and time.monotonic() < deadline:
+            time.sleep(PENDING_POLL_SECONDS)
+            at.run()
+    # The status bar on every page reads the live poller's buffer, which is
+    # filled outside the page run
+    tables.add(SNAPSHOT_TABLE)
+    main = at._tree.children[0]
+    return {
+        'page': page,
+        'elements': [e for e in (_element(child) for child in main.children.values()) if e],
+        'tables': sorted(tables),
+        'errors': [e.message.splitlines()[0] for e in at.exception] + [e.body for e in at.error],
+        'render_ms': (time.perf_counter() - start) * 1e3,
+    }
+
+
+# ==========================================
+# HTML
+# ==========================================
+
+def _inline_markdown(text):
+    text = html.escape(text)
+    text = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', text)
+    return re.sub(r'(?<!\*)\*(?!\s)(.+?)\*', r'<em>\1</em>', text)
+
+
+def _markdown(text, allow_html):
+    """Enough Markdown for the app's own text: headings, rules, lists, emphasis."""
+    if allow_html:
+        return text
+    lines = []
+    for line in text.strip().splitlines():
+        stripped = line.strip()
+        heading = re.match(r'(#{1,6})\s+(.*)', stripped)
+        if stripped in ('---', '***'):
+            lines.append('<hr>')
+        elif heading:
+            level = len(heading.group(1))
+            lines.append(f'<h{level}>{_inline_markdown(heading.group(2))}</h{level}>')
+        elif stripped.startswith(('- ', '* ')):
+            lines.append(f'<li>{_inline_markdown(stripped[2:])}</li>')
+        elif stripped:
+            lines.append(f'<p>{_inline_markdown(stripped)}</p>')
+    return '\n'.join(lines)
+
+
+def _table(data, rows):
+    frame = pd.DataFrame(data['data'], index=data['index'], columns=data['columns'])
+    note = f'<div class="stamp">first {MAX_TABLE_ROWS} of {rows} rows</div>' if rows > MAX_TABLE_ROWS else ''
+    return f'<div class="table">{frame.to_html(border=0, na_rep="")}</div>{note}'
+
+
+def _html(element, figures):
+    kind = element['type']
+    if kind in ('block', 'column', 'row', 'expander'):
+        inner = '\n'.join(_html(child, figures) for child in element['children'])
+        if kind == 'row':
+            return f'<div class="row">{inner}</div>'
+        if kind == 'column':
+            return f'<div class="col">{inner}</div>'
+        if kind == 'expander':
+            return f'<details><summary>{html.escape(element["label"])}</summary>{inner}</details>'
+        return f'<div>{inner}</div>'
+    if kind in ('title', 'header', 'subheader'):
+        tag = {'title': 'h1', 'header': 'h2', 'subheader': 'h3'}[kind]
+        return f'<{tag}>{html.escape(element["text"])}</{tag}>'
+    if kind == 'caption':
+        return f'<div class="stamp">{_inline_markdown(element["text"])}</div>'
+    if kind in ('code', 'latex'):
+        return f'<pre>{html.escape(element["text"])}</pre>'
+    if kind == 'markdown':
+        return _markdown(element['text'], element['html'])
+    if kind == 'alert':
+        text = f'{element["icon"]} {element["text"]}'.strip()
+        return f'<div class="alert {element["level"]}">{_inline_markdown(text)}</div>'
+    if kind == 'metric':
+        delta = f'<div class="delta">{html.escape(element["delta"])}</div>' if element['delta'] else ''
+        return (f'<div class="metric"><div class="label">{html.escape(element["label"])}</div>'
+                f'<div class="value">{html.escape(element["value"])}</div>{delta}</div>')
+    if kind == 'table':
+        return _table(element['data'], element['rows'])
+    if kind == 'figure':
+        figures.append(element['spec'])
+        return f'<div class="chart" id="figure-{len(figures) - 1}"></div>'
+    if kind == 'widget':
+        return (f'<div class="widget">{html.escape(element["label"])}: '
+                f'<strong>{html.escape(str(element["value"]))}</strong></div>')
+    return ''
+
+
+def page_html(page, elements, pages, built):
+    """A self-contained static page; figures come from the embedded specs."""
+    figures = []
+    body = '\n'.join(_html(element, figures) for element in elements)
+    nav = '\n'.join(f'<a href="{slug(p)}.html"{" class=current" if p == page else ""}>{html.escape(p)}</a>'
+                    for p in pages)
+    # "</" inside a script block would end it early
+    specs = json.dumps(figures).replace('</', '<\\/')
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{html.escape(page)}</title>
+<style>{PAGE_CSS}</style>
+<script src="assets/plotly.min.js"></script></head>
+<body><nav><a href="index.html"><strong>📊 Snapshot</strong></a><hr>{nav}</nav>
+<main><div class="stamp">Static snapshot built {built}</div>
+{body}
+</main>
+<script>
+const specs = {specs};
+specs.forEach((spec, i) => Plotly.newPlot('figure-' + i, spec.data || [], spec.layout || {{}},
+                                          {{responsive: true}}));
+</script></body></html>
+"""
+
+
+def index_html(manifest):
+    rows = '\n'.join(
+        f'<tr><td style="text-align:left"><a href="{entry["slug"]}.html">{html.escape(page)}</a></td>'
+        f'<td>{entry["built"]}</td><td>{len(entry["inputs"])}</td></tr>'
+        for page, entry in manifest['pages'].items())
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Snapshot</title><style>{PAGE_CSS}</style></head>
+<body><main style="margin-left:0"><h1>📊 Professional Volatility Analytics Platform</h1>
+<div class="stamp">Static snapshot, last built {manifest['built']}</div>
+<table><tr><th style="text-align:left">Page</th><th>Built</th><th>Input tables</th></tr>
+{rows}</table></main></body></html>
+"""
+
+
+# ==========================================
+# BUILD
+# ==========================================
+
+def _read_manifest(path):
+    try:
+        with open(path) as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as exc:
+        logger.warning("Ignoring unreadable manifest %s: %s", path, exc)
+        return None
+
+
+def stale_pages(manifest, pages, code, digests, out):
+    """Pages whose code or input tables changed since they were built, or never built."""
+    if manifest is None or manifest.get('code') != code:
+        return list(pages)
+    stale = []
+    for page in pages:
+        entry = manifest['pages'].get(page)
+        if (entry is None or not os.path.exists(os.path.join(out, f'{entry["slug"]}.html'))
+                or any(digests.get(name) != digest for name, digest in entry['inputs'].items())):
+            stale.append(page)
+    return stale
+
+
+def build(out=DEFAULT_OUT, pages=None, workers=None, force=False, timeout=DEFAULT_TIMEOUT,
+          app_path=APP_PATH):
+    """Render the stale pages into ``out``; returns the lists of built, skipped and failed pages."""
+    os.makedirs(os.path.join(out, 'data'), exist_ok=True)
+    os.makedirs(os.path.join(out, 'assets'), exist_ok=True)
+    manifest_path = os.path.join(out, 'manifest.json')
+    manifest = None if force else _read_manifest(manifest_path)
+    code, digests = code_digest(os.path.dirname(app_path)), table_digests(os.path.dirname(app_path))
+
+    fresh = manifest is None or manifest.get('code') != code
+    built_at = datetime.now().isoformat(timespec='seconds')
+
+    plotly_js = os.path.join(out, 'assets', 'plotly.min.js')
+    if not os.path.exists(plotly_js):
+        with open(plotly_js, 'w') as fh:
+            fh.write(plotly.offline.get_plotlyjs())
+
+    built, failed, results = [], [], {}
+    # spawn: each worker imports Streamlit and the app from scratch.  The app
+    # only ever runs in workers: AppTest replaces this process's __main__.
+    # Workers start on the first submit, so a build with nothing stale starts none.
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1,
+                             mp_context=get_context('spawn')) as pool:
+        names = pool.submit(page_names, app_path, timeout).result() if fresh else manifest['names']
+        selected = [p for p in names if not pages or any(s in p for s in pages)]
+        todo = stale_pages(manifest, selected, code, digests, out)
+        if fresh:
+            manifest = {'pages': {}}
+        manifest.update(code=code, built=built_at, names=names)
+        if todo:
+            futures = {pool.submit(render_page, page, app_path, timeout): page for page in todo}
+            for future in as_completed(futures):
+                page = futures[future]
+                try:
+                    result = future.result()
+                except Exception as exc:
+                    logger.error("%-24s failed: %s", page, exc)
+                    failed.append(page)
+                    continue
+                if result['errors']:
+                    # A page that rendered an error is not a snapshot of it
+                    logger.error("%-24s failed: %s", page, '; '.join(result['errors']))
+                    failed.append(page)
+                    continue
+                results[page] = result
+
+    # Inputs are hashed before rendering.  A table that changed during the
+    # run (written by a page, or by anything else) makes every page that
+    # read it unreproducible: those pages fail and stay stale.
+    after = table_digests(os.path.dirname(app_path))
+    changed = {t for t in set(digests) | set(after) if digests.get(t) != after.get(t)}
+    for page, result in results.items():
+        moved = sorted(changed & set(result['tables']))
+        if moved:
+            logger.error("%-24s failed: inputs changed during the build: %s", page, ', '.join(moved))
+            failed.append(page)
+            continue
+        name = slug(page)
+        with open(os.path.join(out, 'data', f'{name}.json'), 'w') as fh:
+            json.dump(result, fh, default=str)
+        with open(os.path.join(out, f'{name}.html'), 'w') as fh:
+            fh.write(page_html(page, result['elements'], names, built_at))
+        manifest['pages'][page] = {
+            'slug': name, 'built': built_at, 'render_ms': round(result['render_ms'], 1),
+            'inputs': {t: digests[t] for t in result['tables'] if t in digests},
+        }
+        built.append(page)
+        logger.info("%-24s %7.0f ms  %d tables", page, result['render_ms'], len(result['tables']))
+    # A failed page leaves the index until a build renders it cleanly
+    for page in failed:
+        manifest['pages'].pop(page, None)
+
+    # Keep the sidebar order in the index
+    manifest['pages'] = {p: manifest['pages'][p] for p in names if p in manifest['pages']}
+    with open(manifest_path, 'w') as fh:
+        json.dump(manifest, fh, indent=1)
+    with open(os.path.join(out, 'index.html'), 'w') as fh:
+        fh.write(index_html(manifest))
+    skipped = [p for p in selected if p not in todo]
+    return {'built': built, 'skipped': skipped, 'failed': failed}
+
+
+if __name__ == '__main__':
+    import sys
+
+    parser = argparse.ArgumentParser(description="Render every page to a static HTML/JSON snapshot.")
+    parser.add_argument('--out', default=DEFAULT_OUT)
+    parser.add_argument('--pages', nargs='+', help="only pages whose name contains one of these")
+    parser.add_argument('--workers', type=int, help="render processes (default: CPU count)")
+    parser.add_argument('--force', action='store_true', help="rebuild every page")
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    for noisy in ('streamlit', 'data_store', 'timeseries_store'):
+        logging.getLogger(noisy).setLevel(logging.ERROR)
+    # Run from the imported module so the pool pickles ``snapshot.render_page``:
+    # inside a worker, ``__main__`` becomes the app script once AppTest runs it
+    import snapshot
+    summary = snapshot.build(args.out, args.pages, args.workers, args.force, args.timeout)
+    print(f"built {len(summary['built'])}, unchanged {len(summary['skipped'])}, "
+          f"failed {len(summary['failed'])} -> {args.out}")
+    sys.exit(1 if summary['failed'] else 0)
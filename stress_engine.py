@@ -0,0 +1,230 @@
+"""Full-revaluation stress grid for the volatility book.
+
+Every sleeve is revalued from scratch at every grid cell rather than
+approximated with greeks:
+
+- option book: every line of ``option_positions.csv`` repriced with
+  Black-Scholes at the shocked SPX level, its vol read off the surface at
+  the new moneyness and shifted in parallel by the VIX move
+- variance swap: mark-to-market with the shock's realized variance accrued
+  and the remaining leg marked at the scenario implied vol
+- VIX call spread: Black-76 on the VIX future implied by the scenario
+
+The ETF NAV arbitrage sleeve is not a revaluation: it is a capture model in
+which the premium/discount earned widens with the index move, the VIX level
+and the breakdown of US/EU correlation (the only use of the correlation
+axis).  None of the last three sleeves is in the positions file; their
+terms are the ``DEFAULT_BOOK`` parameters.
+
+A grid of SPX moves x VIX levels x US/EU correlations is evaluated with
+NumPy broadcasting.  For VaR_95 each cell is additionally revalued under a
+fixed set of one-day joint SPX/VIX shocks (common random numbers, so the
+surface is smooth and reproducible).  ``run_grid`` splits the SPX axis into
+chunks and can fan them out over one shared, fixed-size process pool.
+"""
+
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+
+import numpy as np
+
+from greeks_engine import CONTRACT_MULTIPLIER, black_scholes_greeks, interpolate_vol, surface_grid
+
+# Terms of the sleeves held outside option_positions.csv
+DEFAULT_BOOK = {
+    'var_swap_vega_notional': 25_000,   # USD per vol point
+    'var_swap_strike': 18.0,            # vol points
+    'var_swap_tenor_days': 30,
+    'vix_spread_long_strike': 20.0,
+    'vix_spread_short_strike': 30.0,
+    'vix_spread_contracts': 2_000,
+    'vix_spread_expiry_days': 30,
+    'vix_multiplier': 100,
+    'vix_vol_of_vol': 0.9,
+    'etf_arb_notional': 250_000_000,
+    'etf_base_premium_bps': 2.5,
+    'etf_capture_ratio': 0.35,
+}
+
+DEFAULT_MARKET = {'spx': 5847.25, 'vix': 18.45, 'vix_future': 19.8, 'correlation': 0.8,
+                  'rate': 0.04}
+
+VAR_PATHS = 512
+MIN_VOL = 0.01
+BLOCK_ELEMENTS = 2_000_000
+VAR_CONFIDENCE = 0.95
+SPOT_VOL_CORRELATION = -0.7
+COMPONENTS = ['Option_Book_PnL', 'Variance_Swap_PnL', 'VIX_Call_Spread_PnL', 'ETF_NAV_Arb_PnL']
+POOL_WORKERS = os.cpu_count() or 1
+
+
+# ==========================================
+# BOOK REVALUATION
+# ==========================================
+
+def _variance_swap_value(book, spx_move, vix):
+    strike = book['var_swap_strike']
+    tenor = book['var_swap_tenor_days']
+    # The shock counts as one realized day; the rest is marked at the new implied vol
+    realized_var = np.log1p(spx_move) ** 2 * 252 * 1e4
+    expected_var = (realized_var + (tenor - 1) * vix ** 2) / tenor
+    return book['var_swap_vega_notional'] * (expected_var - strike ** 2) / (2 * strike)
+
+
+def _vix_spread_value(book, vix_future, rate):
+    years = book['vix_spread_expiry_days'] / 365
+    vol = book['vix_vol_of_vol']
+    # Black-76: a dividend yield equal to the rate turns the BS forward into F
+    legs = [black_scholes_greeks(vix_future, strike, years, vol, True, rate, rate)['Price']
+            for strike in (book['vix_spread_long_strike'], book['vix_spread_short_strike'])]
+    return (legs[0] - legs[1]) * book['vix_spread_contracts'] * book['vix_multiplier']
+
+
+def _etf_arb_value(book, spx_move, vix, correlation, market):
+    # Heuristic carry of the arbitrage desk, not a mark of held positions
+    dislocation_bps = (book['etf_base_premium_bps']
+                       + 40 * np.abs(spx_move)
+                       + 0.25 * np.maximum(vix - market['vix'], 0)
+                       + 10 * np.maximum(market['correlation'] - correlation, 0))
+    return book['etf_arb_notional'] * book['etf_capture_ratio'] * dislocation_bps / 1e4
+
+
+def option_book(positions, surface, multiplier=CONTRACT_MULTIPLIER):
+    """Arrays of an ``option_positions`` table and its vol surface for ``run_grid``."""
+    return {
+        'strike': positions['Strike'].to_numpy('float64'),
+        'years': positions['Expiry_Days'].to_numpy('float64') / 365,
+        'days': positions['Expiry_Days'].to_numpy('float64'),
+        'is_call': positions['Option_Type'].astype(str).str.upper().str.startswith('C').to_numpy(),
+        'size': positions['Quantity'].to_numpy('float64') * multiplier,
+        'surface': surface_grid(surface),
+    }
+
+
+def _option_book_value(options, market, spx_move, vix):
+    # Positions on a trailing axis, summed away after pricing
+    spot = market['spx'] * (1 + np.asarray(spx_move))[..., None]
+    shift = ((np.asarray(vix) - market['vix']) / 100)[..., None]
+    vol = np.maximum(interpolate_vol(options['surface'], options['strike'] / spot, options['days'])
+                     + shift, MIN_VOL)
+    price = black_scholes_greeks(spot, options['strike'], options['years'], vol, options['is_call'],
+                                 market['rate'])['Price']
+    return (price * options['size']).sum(axis=-1)
+
+
+def revalue(book, market, spx_move, vix, correlation, options=None):
+    """Value of each sleeve at a market state (arrays broadcast together)."""
+    basis = market['vix_future'] - market['vix']
+    vix_future = np.maximum(vix + basis * np.clip(1 - (vix - market['vix']) / 20, -1, 1), 0.01)
+    return {
+        'Option_Book_PnL': (_option_book_value(options, market, spx_move, vix)
+                            if options is not None else np.zeros(np.broadcast(spx_move, vix).shape)),
+        'Variance_Swap_PnL': _variance_swap_value(book, spx_move, vix),
+        'VIX_Call_Spread_PnL': _vix_spread_value(book, vix_future, market['rate']),
+        'ETF_NAV_Arb_PnL': _etf_arb_value(book, spx_move, vix, correlation, market),
+    }
+
+
+def scenario_pnl(book, market, spx_move, vix, correlation, options=None):
+    """P&L of each sleeve versus today's market, plus their total."""
+    base = revalue(book, market, 0.0, market['vix'], market['correlation'], options)
+    shocked = revalue(book, market, spx_move, vix, correlation, options)
+    pnl = {name: shocked[name] - base[name] for name in COMPONENTS}
+    pnl['Total_Portfolio_PnL'] = sum(pnl[name] for name in COMPONENTS)
+    return pnl
+
+
+# ==========================================
+# GRID EVALUATION
+# ==========================================
+
+def _shocks(paths, seed=7):
+    rng = np.random.default_rng(seed)
+    z_spot, z_other = rng.standard_normal((2, paths))
+    z_vol = SPOT_VOL_CORRELATION * z_spot + np.sqrt(1 - SPOT_VOL_CORRELATION ** 2) * z_other
+    return z_spot, z_vol
+
+
+def _evaluate_block(book, market, options, spx_moves, vix_levels, correlations, z_spot, z_vol):
+    s = np.asarray(spx_moves)[:, None, None]
+    v = np.asarray(vix_levels)[None, :, None]
+    c = np.asarray(correlations)[None, None, :]
+    shape = (s.shape[0], v.shape[1], c.shape[2])
+    grid = {name: np.broadcast_to(values, shape).copy()
+            for name, values in scenario_pnl(book, market, s, v, c, options).items()}
+
+    # One-day shocks around each cell: daily SPX vol from the cell's VIX,
+    # VIX moving log-normally with the book's vol-of-vol.
+    daily = np.sqrt(1 / 252)
+    volvol = book['vix_vol_of_vol'] * daily
+    s4, v4, c4 = s[..., None], v[..., None], c[..., None]
+    spx_next = (1 + s4) * (1 + v4 / 100 * daily * z_spot) - 1
+    vix_next = v4 * np.exp(volvol * z_vol - 0.5 * volvol ** 2)
+    shocked = scenario_pnl(book, market, spx_next, vix_next, c4, options)['Total_Portfolio_PnL']
+    day_pnl = shocked - grid['Total_Portfolio_PnL'][..., None]
+    grid['VaR_95'] = -np.quantile(day_pnl, 1 - VAR_CONFIDENCE, axis=-1)
+    return grid
+
+
+def _evaluate_chunk(book, market, options, spx_moves, vix_levels, correlations, paths):
+    """P&L and VaR_95 for a run of SPX moves (a picklable unit of work)."""
+    z_spot, z_vol = _shocks(paths)
+    # Bound the (cells x paths) temporaries to a few million elements; option
+    # lines add a positions axis but no correlation axis
+    lines = 0 if options is None else len(options['strike'])
+    cells = len(vix_levels) * max(len(correlations), lines) * paths
+    rows = max(1, BLOCK_ELEMENTS // cells)
+    blocks = [_evaluate_block(book, market, options, spx_moves[i:i + rows], vix_levels, correlations,
+                              z_spot, z_vol)
+              for i in range(0, len(spx_moves), rows)]
+    return {name: np.concatenate([block[name] for block in blocks]) for name in blocks[0]}
+
+
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+
+def _pool(broken=None):
+    """The shared pool; replaced only when ``broken`` is the current one."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None or _POOL is broken:
+            # spawn: forking a threaded server process is not safe
+            _POOL = ProcessPoolExecutor(max_workers=POOL_WORKERS, mp_context=get_context('spawn'))
+        return _POOL
+
+
+def _map_chunks(args):
+    pool = _pool()
+    try:
+        return [future.result() for future in [pool.submit(_evaluate_chunk, *a) for a in args]]
+    except BrokenProcessPool:
+        # A crashed worker breaks the executor for everyone: the first caller
+        # to notice replaces it, and every caller retries on the new one
+        pool = _pool(broken=pool)
+        return [future.result() for future in [pool.submit(_evaluate_chunk, *a) for a in args]]
+
+
+def run_grid(spx_moves, vix_levels, correlations, book=None, market=None, options=None,
+             paths=VAR_PATHS, workers=1):
+    """Revalue the book over the full grid.
+
+    ``options`` is an ``option_book`` (without one the option sleeve is
+    zero).  Returns a dict of arrays shaped ``(len(spx_moves),
+    len(vix_levels), len(correlations))`` for every P&L column and
+    ``VaR_95``.  With ``workers > 1`` the SPX axis is split into that many
+    chunks, run on the shared pool of ``POOL_WORKERS`` processes.
+    """
+    book = {**DEFAULT_BOOK, **(book or {})}
+    market = {**DEFAULT_MARKET, **(market or {})}
+    spx_moves = np.asarray(spx_moves, dtype='float64')
+    workers = max(1, min(workers or POOL_WORKERS, len(spx_moves)))
+    if workers == 1:
+        return _evaluate_chunk(book, market, options, spx_moves, vix_levels, correlations, paths)
+
+    parts = _map_chunks([(book, market, options, chunk, vix_levels, correlations, paths)
+                         for chunk in np.array_split(spx_moves, workers)])
+    return {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
@@ -0,0 +1,252 @@
+"""SVI volatility-surface fitting and a fixed-size render grid.
+
+Each maturity slice is fitted with raw SVI total variance::
+
+    w(k) = a + b * (rho * (k - m) + sqrt((k - m)^2 + sigma^2))
+
+where ``k = ln(K / F)``.  All slices are calibrated at once with a batched
+Levenberg-Marquardt solver: quotes are padded to a common length with zero
+weights, and every iteration is a handful of NumPy passes over
+``(slices, points)`` arrays, however many quotes an expiry carries.
+
+No-arbitrage conditions:
+
+- the parametrization keeps ``b >= 0``, ``|rho| < 1``, ``sigma > 0``, a
+  non-negative minimum variance and Lee's wing bound ``b (1 + |rho|) <= 2``
+- butterfly arbitrage (a negative Gatheral density ``g(k)``) and calendar
+  arbitrage (total variance falling with maturity) on a strike grid are
+  penalized during the fit
+- the render grid is made non-decreasing in maturity before plotting
+
+``SurfaceFitter`` warm-starts each fit from the previous parameters of the
+same maturity and keeps the fitted parameters and rendered grid of recent
+surfaces keyed by a hash of the quotes.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from greeks_engine import DEFAULT_DIVIDEND, DEFAULT_RATE
+
+PARAM_NAMES = ['a', 'b', 'rho', 'm', 'sigma']
+GRID_STRIKES = 41
+GRID_MATURITIES = 30
+PENALTY_POINTS = 21
+PENALTY_WEIGHT = 10.0
+MAX_ITERATIONS = 60
+CACHE_ENTRIES = 8
+
+
+# ==========================================
+# SVI SLICES
+# ==========================================
+
+# Box on the unconstrained parameters so trial steps cannot overflow
+_U_LOWER = np.array([-30.0, -30.0, -7.0, -2.0, -12.0])
+_U_UPPER = np.array([3.0, 30.0, 7.0, 2.0, 2.0])
+
+
+def _params(u):
+    """Raw SVI parameters from unconstrained ``u`` (..., 5)."""
+    u = np.clip(u, _U_LOWER, _U_UPPER)
+    rho = np.tanh(u[..., 2])
+    b = 2 / (1 + np.abs(rho)) / (1 + np.exp(-u[..., 1]))
+    sigma = np.exp(u[..., 4]) + 1e-4
+    a = np.exp(u[..., 0]) - b * sigma * np.sqrt(1 - rho * rho)
+    return np.stack([a, b, rho, u[..., 3], sigma], axis=-1)
+
+
+def _unconstrained(p):
+    a, b, rho, m, sigma = np.moveaxis(np.asarray(p, dtype='float64'), -1, 0)
+    rho = np.clip(rho, -0.999, 0.999)
+    cap = 2 / (1 + np.abs(rho))
+    share = np.clip(b / cap, 1e-6, 1 - 1e-6)
+    sigma = np.maximum(sigma - 1e-4, 1e-6)
+    floor = np.maximum(a + b * sigma * np.sqrt(1 - rho * rho), 1e-8)
+    return np.stack([np.log(floor), np.log(share / (1 - share)), np.arctanh(rho), m,
+                     np.log(sigma)], axis=-1)
+
+
+def svi_total_variance(p, k):
+    """Total variance of raw SVI parameters ``p`` (..., 5) at ``k`` (..., n)."""
+    a, b, rho, m, sigma = (p[..., i:i + 1] for i in range(5))
+    d = k - m
+    return a + b * (rho * d + np.sqrt(d * d + sigma * sigma))
+
+
+def butterfly_density(p, k):
+    """Gatheral's ``g(k)``; negative values mean butterfly arbitrage."""
+    a, b, rho, m, sigma = (p[..., i:i + 1] for i in range(5))
+    d = k - m
+    root = np.sqrt(d * d + sigma * sigma)
+    w = np.maximum(a + b * (rho * d + root), 1e-12)
+    w1 = b * (rho + d / root)
+    w2 = b * sigma * sigma / root ** 3
+    return (1 - k * w1 / (2 * w)) ** 2 - w1 * w1 / 4 * (1 / w + 0.25) + w2 / 2
+
+
+# ==========================================
+# BATCHED CALIBRATION
+# ==========================================
+
+def _residuals(u, k, vol, weight, years, k_check, floor):
+    p = _params(u)
+    w = svi_total_variance(p, k)
+    fit = weight * (np.sqrt(np.maximum(w, 1e-12) / years) - vol)
+    butterfly = np.minimum(butterfly_density(p, k_check), 0.0)
+    calendar = np.minimum(svi_total_variance(p, k_check) - floor, 0.0)
+    return np.concatenate([fit, PENALTY_WEIGHT * butterfly, PENALTY_WEIGHT * calendar], axis=-1)
+
+
+def check_strikes(k, weight, points=PENALTY_POINTS):
+    """Strike grid spanning the quotes, where arbitrage is penalized and checked."""
+    masked = np.where(weight > 0, k, np.nan)
+    return np.linspace(np.nanmin(masked), np.nanmax(masked), points)[None, :]
+
+
+def fit_slices(k, vol, weight, years, warm_start=None, iterations=MAX_ITERATIONS):
+    """Fit SVI to every slice of padded quotes.
+
+    ``k``, ``vol`` (decimal) and ``weight`` are ``(M, n)`` with slices sorted
+    by maturity and zero weight on padding; ``years`` is ``(M,)``.  Returns
+    the raw parameters ``(M, 5)``, the weighted vol RMSE per slice and the
+    unconstrained parameters to pass back as ``warm_start``.
+    """
+    k, vol, weight = (np.asarray(x, dtype='float64') for x in (k, vol, weight))
+    years = np.asarray(years, dtype='float64')[:, None]
+    k_check = np.broadcast_to(check_strikes(k, weight), (len(k), PENALTY_POINTS))
+
+    if warm_start is None:
+        level = np.sum(vol * weight, axis=1) / np.maximum(np.sum(weight, axis=1), 1e-12)
+        n = len(k)
+        start = np.column_stack([level ** 2 * years[:, 0], np.full(n, 0.1), np.full(n, -0.3),
+                                 np.zeros(n), np.full(n, 0.1)])
+        u = _unconstrained(start)
+    else:
+        u = np.array(warm_start, dtype='float64')
+    damping = np.full(len(k), 1e-2)
+    step = 1e-6
+
+    for _ in range(iterations):
+        # Calendar floor: the previous slice's variance, frozen for this step
+        w_check = svi_total_variance(_params(u), k_check)
+        floor = np.vstack([np.zeros((1, PENALTY_POINTS)), w_check[:-1]])
+        r = _residuals(u, k, vol, weight, years, k_check, floor)
+        cost = np.sum(r * r, axis=1)
+        jac = np.stack([(_residuals(u + step * np.eye(5)[i], k, vol, weight, years, k_check, floor)
+                         - r) / step for i in range(5)], axis=-1)
+        jtj = np.einsum('mri,mrj->mij', jac, jac)
+        grad = np.einsum('mri,mr->mi', jac, r)
+        lhs = jtj + damping[:, None, None] * (np.eye(5) * np.diagonal(jtj, axis1=1, axis2=2)[:, None, :]
+                                               + 1e-12 * np.eye(5))
+        delta = np.linalg.solve(lhs, -grad[..., None])[..., 0]
+        trial = np.clip(u + delta, _U_LOWER, _U_UPPER)
+        trial_r = _residuals(trial, k, vol, weight, years, k_check, floor)
+        improved = np.sum(trial_r * trial_r, axis=1) < cost
+        u = np.where(improved[:, None], trial, u)
+        damping = np.clip(np.where(improved, damping / 3, damping * 4), 1e-9, 1e9)
+        if np.all(np.abs(delta).max(axis=1) < 1e-7) or np.all(damping >= 1e9):
+            break
+
+    p = _params(u)
+    w = svi_total_variance(p, k)
+    err = weight * (np.sqrt(np.maximum(w, 1e-12) / years) - vol)
+    rmse = np.sqrt(np.sum(err * err, axis=1) / np.maximum(np.sum(weight * weight, axis=1), 1e-12))
+    return p, rmse, u
+
+
+# ==========================================
+# SURFACES
+# ==========================================
+
+def surface_hash(surface):
+    """Stable digest of the quotes (index ignored)."""
+    rows = pd.util.hash_pandas_object(surface, index=False).to_numpy()
+    return hashlib.sha1(rows.tobytes()).hexdigest()
+
+
+def slice_quotes(surface, rate=DEFAULT_RATE, dividend=DEFAULT_DIVIDEND):
+    """Padded ``(days, k, vol, weight, spot)`` arrays, one row per maturity."""
+    quotes = surface.dropna(subset=['Moneyness', 'Maturity_Days', 'Implied_Vol'])
+    quotes = quotes.sort_values(['Maturity_Days', 'Moneyness'])
+    days = np.sort(quotes['Maturity_Days'].astype('float64').unique())
+    slot = quotes.groupby('Maturity_Days', observed=True).cumcount().to_numpy()
+    row = np.searchsorted(days, quotes['Maturity_Days'].to_numpy('float64'))
+    shape = (len(days), slot.max() + 1)
+
+    years = quotes['Maturity_Days'].to_numpy('float64') / 365
+    k = np.zeros(shape)
+    vol = np.zeros(shape)
+    weight = np.zeros(shape)
+    k[row, slot] = np.log(quotes['Moneyness'].to_numpy('float64')) - (rate - dividend) * years
+    vol[row, slot] = quotes['Implied_Vol'].to_numpy('float64') / 100
+    weight[row, slot] = 1.0
+    spot = float(np.median(quotes['Strike'] / quotes['Moneyness'])) if 'Strike' in quotes else 1.0
+    return days, k, vol, weight, spot
+
+
+def render_grid(params, days, k_range, spot, rate=DEFAULT_RATE, dividend=DEFAULT_DIVIDEND,
+                strikes=GRID_STRIKES, maturities=GRID_MATURITIES):
+    """Fixed-size ``(maturity, strike)`` grid of implied vols (percent).
+
+    Total variance is evaluated on each fitted slice, forced non-decreasing
+    in maturity, and interpolated linearly in maturity between slices.
+    """
+    k = np.linspace(k_range[0], k_range[1], strikes)
+    w_slices = np.maximum.accumulate(svi_total_variance(params, k[None, :]), axis=0)
+    grid_days = np.linspace(days[0], days[-1], maturities)
+    if len(days) == 1:
+        w = np.repeat(w_slices, maturities, axis=0)
+    else:
+        lo = np.clip(np.searchsorted(days, grid_days, side='right') - 1, 0, len(days) - 2)
+        t = ((grid_days - days[lo]) / (days[lo + 1] - days[lo]))[:, None]
+        w = w_slices[lo] * (1 - t) + w_slices[lo + 1] * t
+    years = grid_days[:, None] / 365
+    return {
+        'Maturity_Days': np.broadcast_to(grid_days[:, None], w.shape),
+        'Strike': spot * np.exp(k[None, :] + (rate - dividend) * years),
+        'Implied_Vol': np.sqrt(np.maximum(w, 0) / years) * 100,
+    }
+
+
+class SurfaceFitter:
+    """SVI fits warm-started across calls, with a small cache per surface hash."""
+
+    def __init__(self, entries=CACHE_ENTRIES):
+        self.entries = entries
+        self._warm = {}
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def fit(self, surface):
+        """``(params, grid)`` for ``surface``: a DataFrame of SVI parameters and
+        RMSE per maturity, and the ``render_grid`` dict."""
+        key = surface_hash(surface)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+            days, k, vol, weight, spot = slice_quotes(surface)
+            warm = None
+            if all(d in self._warm for d in days):
+                warm = np.array([self._warm[d] for d in days])
+            params, rmse, u = fit_slices(k, vol, weight, days / 365, warm_start=warm)
+            self._warm.update(zip(days, u))
+
+            k_check = check_strikes(k, weight)
+            grid = render_grid(params, days, (k_check[0, 0], k_check[0, -1]), spot)
+            table = pd.DataFrame(params, columns=PARAM_NAMES)
+            table.insert(0, 'Maturity_Days', days.astype(int))
+            table['RMSE_Vol_Pts'] = rmse * 100
+            table['Min_Density'] = butterfly_density(params, k_check).min(axis=1)
+
+            self._cache[key] = (table, grid)
+            while len(self._cache) > self.entries:
+                self._cache.popitem(last=False)
+            return table, grid
+
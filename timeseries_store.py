@@ -0,0 +1,192 @@
+"""Date-partitioned storage and range queries for the long time-series tables.
+
+Each table in ``TIME_SERIES`` is rewritten from its CSV into a hive-style
+Parquet dataset under ``.table_cache/partitions/<table>/year=YYYY/month=M/``.
+``TimeSeriesStore.query`` turns a date range into a partition filter, so
+pyarrow opens only the month directories that overlap the range and then
+uses row-group statistics to skip the rest.  Pages therefore hold the window
+they show, not the whole history.
+
+A small manifest records the CSV signature, schema fingerprint and date
+bounds; the dataset is rebuilt only when the CSV (or its schema) changes.
+If the cache directory cannot be written, the table is queried in memory.
+"""
+
+import json
+import logging
+import os
+import shutil
+import threading
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from data_store import TableLoadError, file_digest
+from schemas import SCHEMAS, schema_fingerprint
+
+logger = logging.getLogger(__name__)
+
+PARTITION_DIR = 'partitions'
+
+TIME_SERIES = [
+    'global_equity_dislocations', 'etf_arbitrage_microstructure', 'option_greeks_dynamic_hedging',
+    'order_flow_toxicity', 'performance_attribution_daily', 'variance_swap_pricing', 'vol_regime'
+]
+
+PARTITIONING = ds.partitioning(pa.schema([('year', pa.int16()), ('month', pa.int8())]), flavor='hive')
+
+
+class TimeSeriesStore:
+    """Range-queryable, month-partitioned copies of the time-series tables."""
+
+    def __init__(self, store):
+        self.store = store
+        self.root = os.path.join(store.cache_dir, PARTITION_DIR)
+        self._datasets = {}
+        self._locks = {name: threading.Lock() for name in TIME_SERIES}
+
+    def index_column(self, name):
+        return SCHEMAS[name]['index']
+
+    def bounds(self, name):
+        """First and last timestamp of a table, read from its manifest."""
+        manifest = self._dataset(name)[1]
+        return pd.Timestamp(manifest['start']), pd.Timestamp(manifest['end'])
+
+    def query(self, name, start=None, end=None, columns=None):
+        """Rows of ``name`` with ``start <= index <= end``, sorted by date.
+
+        ``start``/``end`` may be dates or timestamps; a bare date for ``end``
+        includes that whole day.  ``columns`` limits the columns read.
+        """
+        dataset, manifest = self._dataset(name)
+        index = self.index_column(name)
+        start = pd.Timestamp(start) if start is not None else pd.Timestamp(manifest['start'])
+        end = pd.Timestamp(end) if end is not None else pd.Timestamp(manifest['end'])
+        if end == end.normalize():
+            end = end + pd.Timedelta(days=1) - pd.Timedelta(1, 'ns')
+
+        unit = dataset.schema.field(index).type.unit
+        predicate = (
+            _month_filter(start, end)
+            & (ds.field(index) >= _timestamp_scalar(start, unit))
+            & (ds.field(index) <= _timestamp_scalar(end, unit))
+        )
+        if columns is None:
+            columns = [c for c in dataset.schema.names if c not in ('year', 'month')]
+        else:
+            columns = [index] + [c for c in columns if c != index]
+        table = dataset.to_table(columns=columns, filter=predicate)
+        return table.to_pandas(date_as_object=False).sort_index()
+
+    # ------------------------------------------
+    # Partition maintenance
+    # ------------------------------------------
+
+    def _dataset(self, name):
+        if name not in self._locks:
+            raise KeyError(f"'{name}' is not a partitioned time series")
+        signature = self.store.signature(name)
+        entry = self._datasets.get(name)
+        if entry is None or entry[0] != signature:
+            with self._locks[name]:
+                entry = self._datasets.get(name)
+                if entry is None or entry[0] != signature:
+                    entry = (signature,) + self._open(name, signature)
+                    self._datasets[name] = entry
+        return entry[1], entry[2]
+
+    def _open(self, name, signature):
+        path = os.path.join(self.root, name)
+        manifest_path = path + '.json'
+        manifest = _read_json(manifest_path)
+        fresh = (
+            manifest is not None
+            and manifest.get('schema') == schema_fingerprint(name)
+            and os.path.isdir(path)
+            and ((manifest.get('size'), manifest.get('mtime_ns')) == tuple(signature)
+                 or manifest.get('sha1') == file_digest(self.store.path(name)))
+        )
+        if not fresh:
+            table, manifest = self._partition_table(name, signature)
+            try:
+                self._write_partitions(name, path, table)
+            except OSError as exc:
+                # A read-only or full cache directory still serves the CSV,
+                # held in memory instead of as partition files
+                logger.warning("Could not write partitions for %s, querying it in memory: %s", name, exc)
+                return ds.dataset(table), manifest
+            _save_manifest(manifest_path, manifest)
+        elif (manifest['size'], manifest['mtime_ns']) != tuple(signature):
+            manifest['size'], manifest['mtime_ns'] = signature
+            _save_manifest(manifest_path, manifest)
+        return ds.dataset(path, format='parquet', partitioning=PARTITIONING), manifest
+
+    def _partition_table(self, name, signature):
+        """The parsed CSV with its ``year``/``month`` keys, and its manifest."""
+        table = self.store.parse_csv(name)
+        index = self.index_column(name)
+        if index not in table.column_names or table.num_rows == 0:
+            raise TableLoadError(name, f"{name}.csv has no '{index}' rows to partition")
+        dates = table[index]
+        table = table.append_column('year', pc.year(dates).cast(pa.int16()))
+        table = table.append_column('month', pc.month(dates).cast(pa.int8()))
+        bounds = pc.min_max(dates)
+        size, mtime_ns = signature
+        return table, {
+            'size': size, 'mtime_ns': mtime_ns, 'sha1': file_digest(self.store.path(name)),
+            'schema': schema_fingerprint(name), 'rows': table.num_rows,
+            'start': str(bounds['min'].as_py()), 'end': str(bounds['max'].as_py()),
+        }
+
+    def _write_partitions(self, name, path, table):
+        # Write next to the live copy and swap, so concurrent readers of the
+        # old dataset never see a half-written directory.
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        ds.write_dataset(table, tmp_path, format='parquet', partitioning=PARTITIONING,
+                         max_rows_per_group=64 * 1024)
+        old_path = f'{path}.{os.getpid()}.old'
+        if os.path.isdir(path):
+            os.replace(path, old_path)
+        os.replace(tmp_path, path)
+        shutil.rmtree(old_path, ignore_errors=True)
+        logger.info("Partitioned %s: %d rows", name, table.num_rows)
+
+
+def _month_filter(start, end):
+    # Expressed on the partition keys only, so pyarrow prunes whole directories
+    year, month = ds.field('year'), ds.field('month')
+    after_start = (year > start.year) | ((year == start.year) & (month >= start.month))
+    before_end = (year < end.year) | ((year == end.year) & (month <= end.month))
+    return after_start & before_end
+
+
+def _timestamp_scalar(ts, unit):
+    # Truncate to the column's unit so the bound compares without casting
+    per_unit = {'s': 10**9, 'ms': 10**6, 'us': 10**3, 'ns': 1}[unit]
+    return pa.scalar(ts.as_unit('ns').value // per_unit, type=pa.timestamp(unit))
+
+
+def _read_json(path):
+    try:
+        with open(path) as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as exc:
+        logger.warning("Ignoring unreadable manifest %s: %s", path, exc)
+        return None
+
+
+def _save_manifest(path, manifest):
+    # Without a manifest the next process rebuilds the partitions, nothing worse
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    try:
+        with open(tmp_path, 'w') as fh:
+            json.dump(manifest, fh)
+        os.replace(tmp_path, path)
+    except OSError as exc:
+        logger.warning("Could not write partition manifest %s: %s", path, exc)
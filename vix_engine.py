@@ -0,0 +1,239 @@
+"""Constant-maturity VIX futures curves with roll yield, slope and regime.
+
+``VIX_1M_Future``/``2M``/``3M`` are read as the first three listed
+contracts.  VIX futures settle 30 days before the third Friday of the
+following month, so each day's contracts sit at known calendar-day
+maturities that roll down towards zero between expiries.  With spot at
+maturity 0, the curve is interpolated linearly in time to fixed tenors
+(30/60/90 days), held flat beyond the last listed expiry.  Every day's
+interpolation is one broadcast over ``(days, tenors)``.
+
+From the constant-maturity curve:
+
+- roll yield: ``(CM30 - spot) / spot`` in percent, the month's roll-down
+- slope: ``CM90 - CM30`` in vol points
+- regime: contango / flat / backwardation by roll yield band
+- mean-reversion signal: z-score of spot over a trailing window, from
+  prefix sums
+
+``TermStructureEngine`` holds all of this per day in growable arrays.
+``append`` adds one day in O(tenors), and ``snapshot`` finds a date's curve
+by binary search, so scrubbing through years of curves is a lookup.
+"""
+
+import numpy as np
+import pandas as pd
+
+SPOT = 'VIX_Spot'
+CONTRACTS = ['VIX_1M_Future', 'VIX_2M_Future', 'VIX_3M_Future']
+TENORS = (30, 60, 90)
+SIGNAL_WINDOW = 63
+MIN_OBSERVATIONS = 20
+REGIME_LEVELS = ['Backwardation', 'Flat', 'Contango']
+REGIME_BINS = [-2.0, 2.0]
+
+
+def vix_expiries(start, end):
+    """Final settlement dates of the VIX futures listed between ``start`` and ``end``."""
+    months = pd.date_range(pd.Timestamp(start).normalize() - pd.offsets.MonthBegin(2),
+                           pd.Timestamp(end).normalize() + pd.offsets.MonthBegin(6), freq='MS')
+    following = months + pd.offsets.MonthBegin(1)
+    third_friday = following + pd.to_timedelta((4 - following.weekday) % 7 + 14, unit='D')
+    return third_friday - pd.Timedelta(days=30)
+
+
+def contract_days(dates, expiries, contracts=len(CONTRACTS)):
+    """Calendar days from each date to the next ``contracts`` expiries: ``(dates, contracts)``."""
+    days = pd.DatetimeIndex(dates).normalize().to_numpy('datetime64[D]')
+    settle = pd.DatetimeIndex(expiries).to_numpy('datetime64[D]')
+    first = np.searchsorted(settle, days, side='right')
+    return (settle[first[:, None] + np.arange(contracts)] - days[:, None]).astype('float64')
+
+
+def constant_maturity(spot, futures, days, tenors=TENORS):
+    """Curve levels at ``tenors`` from spot (maturity 0) and dated futures.
+
+    Linear in time between points, flat past the last expiry.  ``spot`` is
+    ``(n,)``, ``futures`` and ``days`` are ``(n, contracts)``.
+    """
+    x = np.column_stack([np.zeros(len(spot)), days])
+    y = np.column_stack([spot, futures])
+    t = np.asarray(tenors, dtype='float64')
+    left = np.clip((x[:, None, :] <= t[None, :, None]).sum(-1) - 1, 0, x.shape[1] - 2)
+    x0, x1 = np.take_along_axis(x, left, 1), np.take_along_axis(x, left + 1, 1)
+    y0, y1 = np.take_along_axis(y, left, 1), np.take_along_axis(y, left + 1, 1)
+    weight = np.clip((t - x0) / (x1 - x0), 0.0, 1.0)
+    return y0 + weight * (y1 - y0)
+
+
+def classify(roll_yield):
+    """Term-structure regime for roll yields (percent)."""
+    return pd.cut(pd.Series(roll_yield, dtype='float64'), [-np.inf] + REGIME_BINS + [np.inf],
+                  labels=REGIME_LEVELS)
+
+
+class TermStructureEngine:
+    """Daily constant-maturity curves and their signals, appended one day at a time."""
+
+    def __init__(self, tenors=TENORS, window=SIGNAL_WINDOW, min_observations=MIN_OBSERVATIONS):
+        self.tenors = tuple(tenors)
+        self.window = window
+        self.min_observations = min_observations
+        self._size = 0
+        self._expiries = pd.DatetimeIndex([])
+        self._offset = 0.0
+        self._arrays = None
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def dates(self):
+        return pd.DatetimeIndex(self._arrays['dates'][:self._size])
+
+    def _expiries_for(self, start, end):
+        # Extend the settlement calendar only when a date runs past it
+        if len(self._expiries) == 0 or pd.Timestamp(end) + pd.Timedelta(days=120) > self._expiries[-1] \
+                or pd.Timestamp(start) < self._expiries[0]:
+            self._expiries = vix_expiries(start, end)
+        return self._expiries
+
+    def _allocate(self, capacity):
+        k, c = len(self.tenors), len(CONTRACTS)
+        arrays = {
+            'dates': np.empty(capacity, dtype='datetime64[ns]'), 'spot': np.empty(capacity),
+            'futures': np.empty((capacity, c)), 'days': np.empty((capacity, c)),
+            'curve': np.empty((capacity, k)), 'signal': np.empty(capacity),
+            # Prefix sums of centred spot, its square and the valid-day count
+            'prefix': np.zeros((3, capacity + 1)),
+        }
+        if self._arrays is not None:
+            for name, values in arrays.items():
+                if name == 'prefix':
+                    values[:, :self._size + 1] = self._arrays[name][:, :self._size + 1]
+                else:
+                    values[:self._size] = self._arrays[name][:self._size]
+        self._arrays = arrays
+
+    # ------------------------------------------
+    # History
+    # ------------------------------------------
+
+    def fit(self, history):
+        """Full pass over ``history`` (DataFrame with spot and futures, dates index)."""
+        history = history.sort_index()
+        spot = history[SPOT].to_numpy('float64')
+        futures = history[CONTRACTS].to_numpy('float64')
+        self._offset = float(np.nan_to_num(np.nanmean(spot))) if len(spot) else 0.0
+        self._arrays = None
+        self._size = 0
+        self._allocate(max(2 * len(spot), 64))
+        n = len(spot)
+        a = self._arrays
+        if n:
+            expiries = self._expiries_for(history.index[0], history.index[-1])
+            a['days'][:n] = contract_days(history.index, expiries)
+        a['dates'][:n] = history.index.to_numpy('datetime64[ns]')
+        a['spot'][:n], a['futures'][:n] = spot, futures
+        a['curve'][:n] = constant_maturity(spot, futures, a['days'][:n], self.tenors)
+        valid = ~np.isnan(spot)
+        centred = np.where(valid, spot - self._offset, 0.0)
+        a['prefix'][:, 1:n + 1] = np.cumsum(np.stack([centred, centred ** 2, valid]), axis=1)
+        self._size = n
+        a['signal'][:n] = self._signal(np.arange(1, n + 1))
+        return self
+
+    def append(self, date, spot, futures):
+        """Add one day of settlements: O(tenors)."""
+        if self._arrays is None:
+            self._allocate(64)
+        if self._size == len(self._arrays['spot']):
+            self._allocate(2 * self._size)
+        i, a = self._size, self._arrays
+        futures = np.asarray(futures, dtype='float64')
+        days = contract_days([date], self._expiries_for(self.dates[0] if i else date, date))[0]
+        a['dates'][i] = np.datetime64(pd.Timestamp(date), 'ns')
+        a['spot'][i], a['futures'][i], a['days'][i] = spot, futures, days
+        a['curve'][i] = constant_maturity(np.array([spot]), futures[None, :], days[None, :], self.tenors)[0]
+        valid = not np.isnan(spot)
+        centred = spot - self._offset if valid else 0.0
+        a['prefix'][:, i + 1] = a['prefix'][:, i] + (centred, centred ** 2, float(valid))
+        self._size += 1
+        a['signal'][i] = self._signal(np.array([i + 1]))[0]
+
+    def sync(self, history):
+        """Append new trailing days of ``history``; refit on an edited history."""
+        history = history.sort_index()
+        known = self._size
+        if (self._arrays is None or len(history) < known
+                or not np.array_equal(history.index[:known].to_numpy('datetime64[ns]'),
+                                      self._arrays['dates'][:known])
+                or not np.allclose(history[SPOT].to_numpy('float64')[:known],
+                                   self._arrays['spot'][:known], equal_nan=True)
+                or not np.allclose(history[CONTRACTS].to_numpy('float64')[:known],
+                                   self._arrays['futures'][:known], equal_nan=True)):
+            return self.fit(history)
+        for date, spot, futures in zip(history.index[known:], history[SPOT].to_numpy('float64')[known:],
+                                       history[CONTRACTS].to_numpy('float64')[known:]):
+            self.append(date, spot, futures)
+        return self
+
+    def _signal(self, rows):
+        """Trailing z-score of spot ending at prefix rows ``rows``."""
+        prefix = self._arrays['prefix']
+        sums = prefix[:, rows] - prefix[:, np.maximum(rows - self.window, 0)]
+        count = sums[2]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = sums[0] / count
+            std = np.sqrt(np.maximum((sums[1] - count * mean ** 2) / (count - 1), 0.0))
+            z = (self._arrays['spot'][rows - 1] - self._offset - mean) / std
+        return np.where((count >= self.min_observations) & (std > 0), z, np.nan)
+
+    # ------------------------------------------
+    # Views
+    # ------------------------------------------
+
+    def _row(self, date):
+        """Index of the last day on or before ``date`` (-1 if none)."""
+        date = pd.Timestamp(date)
+        if date == date.normalize():
+            date += pd.Timedelta(days=1) - pd.Timedelta(1, 'ns')
+        return int(np.searchsorted(self._arrays['dates'][:self._size], np.datetime64(date, 'ns'),
+                                   side='right')) - 1
+
+    def table(self, start=None, end=None):
+        """Curve levels and signals for every day in ``[start, end]``."""
+        a = self._arrays
+        lo = 0 if start is None else self._row(pd.Timestamp(start) - pd.Timedelta(1, 'ns')) + 1
+        hi = self._size if end is None else self._row(end) + 1
+        spot, curve = a['spot'][lo:hi], a['curve'][lo:hi]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            roll = (curve[:, 0] - spot) / spot * 100
+        frame = pd.DataFrame(curve, columns=[f'CM_{t}D' for t in self.tenors],
+                             index=pd.DatetimeIndex(a['dates'][lo:hi], name='Date'))
+        frame.insert(0, SPOT, spot)
+        frame['Front_Days'] = a['days'][lo:hi, 0].astype(int)
+        frame['Roll_Yield_1M_pct'] = roll
+        frame['Slope'] = curve[:, -1] - curve[:, 0]
+        frame['Term_Structure_Regime'] = classify(roll).to_numpy()
+        frame['Mean_Reversion_Signal'] = a['signal'][lo:hi]
+        return frame
+
+    def snapshot(self, date=None):
+        """``(date, curve)`` for the last day on or before ``date``.
+
+        ``curve`` has one row per point: spot, each listed contract at its
+        maturity and each constant-maturity tenor.
+        """
+        i = self._size - 1 if date is None else self._row(date)
+        if i < 0:
+            return None, pd.DataFrame(columns=['Point', 'Days', 'Level', 'Kind'])
+        a = self._arrays
+        curve = pd.DataFrame({
+            'Point': ['Spot'] + [c.removeprefix('VIX_').removesuffix('_Future') for c in CONTRACTS]
+                     + [f'CM {t}D' for t in self.tenors],
+            'Days': np.concatenate([[0.0], a['days'][i], self.tenors]),
+            'Level': np.concatenate([[a['spot'][i]], a['futures'][i], a['curve'][i]]),
+            'Kind': ['Spot'] + ['Futures'] * len(CONTRACTS) + ['Constant Maturity'] * len(self.tenors),
+        })
+        return pd.Timestamp(a['dates'][i]), curve
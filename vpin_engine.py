@@ -0,0 +1,240 @@
+"""VPIN from raw trade prints with bulk-volume classification.
+
+Prints (``Timestamp``, ``Price``, ``Volume``) are aggregated into time bars.
+Each bar's volume is split into buy and sell volume by bulk-volume
+classification, ``buy = volume * Phi(dP / sigma)``, where ``sigma`` is an
+EWMA estimate of the bar price change volatility known before the bar.
+
+Classified volume is poured into equal-volume buckets.  With cumulative
+volume ``C`` and cumulative buy volume ``B`` per bar, the buy volume of a
+bucket is ``B`` interpolated at its two volume boundaries, so a batch of any
+number of bars is bucketed with one ``np.interp`` call, bars straddling a
+boundary included.  VPIN is the mean absolute order imbalance
+``|buy - sell| / V`` over the last ``window`` buckets.
+
+``VpinEngine`` carries the open bar, the partly filled bucket, the EWMA
+and the last ``window`` imbalances between calls, so the same state serves
+three entry points that give identical buckets:
+
+- ``push`` for one live print at a time
+- ``process`` for a DataFrame chunk of prints
+- ``backfill`` for a CSV or Parquet file read in fixed-size record batches,
+  which keeps memory flat however many prints the file holds
+"""
+
+from collections import deque
+
+import numpy as np
+import pandas as pd
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
+
+from greeks_engine import norm_cdf
+
+DEFAULT_BAR = '1min'
+DEFAULT_WINDOW = 50
+BUCKETS_PER_DAY = 50
+SIGMA_LAMBDA = 0.94
+CHUNK_ROWS = 1_000_000
+
+TOXICITY_LEVELS = ['Low', 'Normal', 'High']
+TOXICITY_BINS = [0.35, 0.55]
+HIGH_TOXICITY = TOXICITY_BINS[-1]
+
+BUCKET_COLUMNS = ['Buy_Volume', 'Sell_Volume', 'Order_Imbalance', 'VPIN', 'Toxicity_Regime']
+
+
+def toxicity_regime(vpin):
+    """``Toxicity_Regime`` labels (ordered categorical) for VPIN values."""
+    return pd.cut(pd.Series(vpin), [-np.inf] + TOXICITY_BINS + [np.inf], labels=TOXICITY_LEVELS)
+
+
+def daily_toxicity(buckets):
+    """Roll buckets up to the ``order_flow_toxicity`` daily columns."""
+    day = buckets.index.normalize()
+    grouped = buckets.groupby(day)
+    volume = grouped['Buy_Volume'].sum() + grouped['Sell_Volume'].sum()
+    daily = pd.DataFrame({
+        'VPIN': grouped['VPIN'].last(),
+        'Buy_Volume_Pct': grouped['Buy_Volume'].sum() / volume * 100,
+        'Sell_Volume_Pct': grouped['Sell_Volume'].sum() / volume * 100,
+    })
+    daily['Volume_Imbalance'] = daily['Buy_Volume_Pct'] - daily['Sell_Volume_Pct']
+    daily['Toxicity_Regime'] = toxicity_regime(daily['VPIN']).to_numpy()
+    daily.index.name = 'Date'
+    return daily
+
+
+class VpinEngine:
+    """Volume-bucketed VPIN with state carried across prints and chunks."""
+
+    def __init__(self, bucket_volume, window=DEFAULT_WINDOW, bar=DEFAULT_BAR, lam=SIGMA_LAMBDA):
+        self.bucket_volume = float(bucket_volume)
+        self.window = window
+        self.bar = pd.Timedelta(bar)
+        self.lam = lam
+        self._last_close = np.nan
+        self._variance = np.nan
+        self._bucket_fill = 0.0
+        self._bucket_buy = 0.0
+        self._imbalances = deque(maxlen=window)
+        self._open_bar = None  # [bar_start, close, volume]
+
+    # ------------------------------------------
+    # Entry points
+    # ------------------------------------------
+
+    def push(self, timestamp, price, volume):
+        """Add one print; returns the buckets completed by the bar it closed, or None.
+
+        Prints inside the open bar only update its close and volume.
+        """
+        start = pd.Timestamp(timestamp).floor(self.bar)
+        if self._open_bar is not None and start == self._open_bar[0]:
+            self._open_bar[1] = price
+            self._open_bar[2] += volume
+            return None
+        completed = self._close_bar() if self._open_bar is not None else None
+        self._open_bar = [start, price, volume]
+        return completed
+
+    def process(self, prints):
+        """Add a chunk of time-ordered prints; returns the completed buckets.
+
+        The last bar of the chunk stays open, since the next chunk may add
+        prints to it.
+        """
+        if prints.empty:
+            return self._empty()
+        start = prints['Timestamp'].dt.floor(self.bar)
+        bars = prints.groupby(start.to_numpy(), sort=True).agg(
+            close=('Price', 'last'), volume=('Volume', 'sum'))
+        starts = bars.index
+        closes = bars['close'].to_numpy('float64')
+        volumes = bars['volume'].to_numpy('float64', copy=True)
+
+        if self._open_bar is not None:
+            if starts[0] == self._open_bar[0]:
+                volumes[0] += self._open_bar[2]
+            else:
+                starts = starts.insert(0, self._open_bar[0])
+                closes = np.concatenate([[self._open_bar[1]], closes])
+                volumes = np.concatenate([[self._open_bar[2]], volumes])
+        self._open_bar = [starts[-1], closes[-1], volumes[-1]]
+        return self._bucket(starts[:-1] + self.bar, closes[:-1], volumes[:-1])
+
+    def flush(self):
+        """Close the open bar (end of session or end of file)."""
+        return self._close_bar() if self._open_bar is not None else self._empty()
+
+    def backfill(self, path, chunk_rows=CHUNK_ROWS):
+        """Buckets for every print in a CSV or Parquet file, read in batches."""
+        parts = [self.process(chunk) for chunk in read_prints(path, chunk_rows)]
+        parts.append(self.flush())
+        parts = [part for part in parts if len(part)]
+        return pd.concat(parts) if parts else self._empty()
+
+    # ------------------------------------------
+    # Bucketing
+    # ------------------------------------------
+
+    def _close_bar(self):
+        start, close, volume = self._open_bar
+        self._open_bar = None
+        return self._bucket(pd.DatetimeIndex([start + self.bar]), np.array([close], 'float64'),
+                            np.array([volume], 'float64'))
+
+    def _bucket(self, ends, closes, volumes):
+        if len(closes) == 0:
+            return self._empty()
+
+        # Bulk-volume classification against the EWMA vol known before each bar
+        change = np.diff(closes, prepend=self._last_close)
+        change = np.where(np.isnan(change), 0.0, change)
+        variance = self._ewma(change * change)
+        prior = np.concatenate([[self._variance], variance[:-1]])
+        z = np.where(prior > 0, change / np.sqrt(np.where(prior > 0, prior, 1.0)), 0.0)
+        buy = volumes * norm_cdf(z)
+        self._last_close = closes[-1]
+        self._variance = variance[-1]
+
+        # Buckets are the volume boundaries crossed by this batch
+        cum_volume = self._bucket_fill + np.cumsum(volumes)
+        cum_buy = self._bucket_buy + np.cumsum(buy)
+        V = self.bucket_volume
+        # Tolerance so a batch ending exactly on a boundary closes that bucket
+        count = int(cum_volume[-1] / V + 1e-9)
+        if count == 0:
+            self._bucket_fill, self._bucket_buy = cum_volume[-1], cum_buy[-1]
+            return self._empty()
+        xs = np.concatenate([[0.0, self._bucket_fill], cum_volume])
+        ys = np.concatenate([[0.0, self._bucket_buy], cum_buy])
+        bounds = V * np.arange(count + 1)
+        at_bounds = np.interp(bounds, xs, ys)
+        bucket_buy = np.diff(at_bounds)
+        self._bucket_fill = max(cum_volume[-1] - bounds[-1], 0.0)
+        self._bucket_buy = cum_buy[-1] - at_bounds[-1]
+
+        imbalance = np.abs(2 * bucket_buy - V) / V
+        carried = np.array(self._imbalances)
+        series = np.concatenate([carried, imbalance])
+        vpin = pd.Series(series).rolling(self.window, min_periods=1).mean().to_numpy()[len(carried):]
+        self._imbalances.extend(imbalance)
+
+        ends = ends[np.minimum(np.searchsorted(cum_volume, bounds[1:], side='left'), len(ends) - 1)]
+        frame = pd.DataFrame({
+            'Buy_Volume': bucket_buy, 'Sell_Volume': V - bucket_buy,
+            'Order_Imbalance': imbalance, 'VPIN': vpin,
+        }, index=pd.DatetimeIndex(ends, name='Bucket_End'))
+        frame['Toxicity_Regime'] = toxicity_regime(vpin).to_numpy()
+        return frame
+
+    def _ewma(self, squared):
+        # Seeded with the carried variance so chunks continue the recursion
+        if np.isnan(self._variance):
+            return pd.Series(squared).ewm(alpha=1 - self.lam, adjust=False).mean().to_numpy()
+        seeded = np.concatenate([[self._variance], squared])
+        return pd.Series(seeded).ewm(alpha=1 - self.lam, adjust=False).mean().to_numpy()[1:]
+
+    def _empty(self):
+        frame = pd.DataFrame({name: pd.Series(dtype='float64') for name in BUCKET_COLUMNS[:-1]},
+                             index=pd.DatetimeIndex([], name='Bucket_End'))
+        frame['Toxicity_Regime'] = pd.Categorical([], categories=TOXICITY_LEVELS, ordered=True)
+        return frame
+
+
+# ==========================================
+# PRINT FILES
+# ==========================================
+
+def read_prints(path, chunk_rows=CHUNK_ROWS):
+    """Yield ``Timestamp``/``Price``/``Volume`` frames of about ``chunk_rows`` rows."""
+    columns = ['Timestamp', 'Price', 'Volume']
+    if path.endswith('.parquet'):
+        batches = pq.ParquetFile(path).iter_batches(batch_size=chunk_rows, columns=columns)
+    else:
+        batches = pv.open_csv(path, read_options=pv.ReadOptions(block_size=chunk_rows * 48),
+                              convert_options=pv.ConvertOptions(include_columns=columns))
+    for batch in batches:
+        yield batch.to_pandas(date_as_object=False)
+
+
+def estimate_bucket_volume(path, buckets_per_day=BUCKETS_PER_DAY, chunk_rows=CHUNK_ROWS):
+    """Average daily volume / ``buckets_per_day``, from one pass over the file."""
+    total, days = 0.0, set()
+    for chunk in read_prints(path, chunk_rows):
+        total += float(chunk['Volume'].sum())
+        days.update(chunk['Timestamp'].dt.normalize().unique())
+    return total / max(len(days), 1) / buckets_per_day
+
+
+if __name__ == '__main__':
+    import sys
+
+    if len(sys.argv) not in (3, 4):
+        sys.exit("usage: python vpin_engine.py prints.(csv|parquet) out.csv [bucket_volume]")
+    source, target = sys.argv[1], sys.argv[2]
+    size = float(sys.argv[3]) if len(sys.argv) == 4 else estimate_bucket_volume(source)
+    buckets = VpinEngine(size).backfill(source)
+    daily_toxicity(buckets).to_csv(target)
+    print(f"{len(buckets):,} buckets of {size:,.0f} shares -> {target}")